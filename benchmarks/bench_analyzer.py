@@ -0,0 +1,56 @@
+# benchmarks/bench_analyzer.py - per-call overhead of the shared analyzer
+"""
+Compare building a fresh analyzer (graph build + compile) for every feedback
+against reusing the process-wide analyzer from core.utils.get_analyzer().
+Both run the workflow uncached; the last line shows a warm result-cache hit.
+
+Usage:
+    python benchmarks/bench_analyzer.py [--calls 500]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.utils import EnhancedFeedbackAnalyzer, get_analyzer  # noqa: E402
+
+SAMPLES = [
+    "The product is very good",
+    "The product is not good at all",
+    "I love this store!",
+    "This is terrible, never buying again",
+    "It's okay, nothing special",
+    "Not bad for the price",
+    "Waste of money, completely useless",
+]
+
+
+def run(label, analyze, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        analyze(SAMPLES[i % len(SAMPLES)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {calls / elapsed:>10.1f} calls/s {elapsed / calls * 1e6:>10.1f} us/call")
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    # Keep the per-node INFO logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    shared = get_analyzer()
+    fresh = run("fresh analyzer per call", lambda text: EnhancedFeedbackAnalyzer().run_workflow(text), args.calls)
+    reused = run("shared analyzer", shared.run_workflow, args.calls)
+    print(f"per-call overhead removed: {(fresh - reused) * 1e6:.1f} us ({fresh / reused:.1f}x faster)")
+    run("shared analyzer, cached", shared.analyze_feedback, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_batch.py - batch API vs. single-text calls in a loop
+"""
+Score the same corpus with analyze_feedback_sentiment() in a loop and with
+analyze_feedback_sentiment_batch(), starting from a cold result cache each
+time. The corpus mixes repeated short messages ("ok", "salamat po") with
+one-off feedback, like real traffic.
+
+Usage:
+    python benchmarks/bench_batch.py [--size 2000] [--repeat-share 0.4]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.utils import (  # noqa: E402
+    analyze_feedback_sentiment, analyze_feedback_sentiment_batch, get_analyzer,
+)
+
+COMMON = ["ok", "salamat po", "good", "Good!", "thank you", "not bad", "ang ganda", "sulit"]
+WORDS = ("the rice was good bad not very great service slow fast price mahal mura "
+         "tindera mabait love hate okay terrible store po naman").split()
+
+
+def corpus(size, repeat_share, seed=42):
+    rnd = random.Random(seed)
+    return [
+        rnd.choice(COMMON) if rnd.random() < repeat_share
+        else " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 25)))
+        for _ in range(size)
+    ]
+
+
+def timed(label, fn, texts):
+    get_analyzer().cache.clear()
+    start = time.perf_counter()
+    fn(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {len(texts) / elapsed:>10.1f} texts/s {elapsed * 1e3:>10.1f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--repeat-share", type=float, default=0.4)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    texts = corpus(args.size, args.repeat_share)
+    get_analyzer()
+
+    loop = timed("single in a loop", lambda batch: [analyze_feedback_sentiment(t) for t in batch], texts)
+    batch = timed("batch", analyze_feedback_sentiment_batch, texts)
+    print(f"batch speedup: {loop / batch:.2f}x ({len(set(texts))} distinct of {len(texts)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_imports.py - cold-start import time (python -X importtime)
+"""
+Measure what a fresh process pays before it can do any work, which is what a
+free-tier dyno pays on every boot, deploy and max_requests restart. Each
+scenario runs in new interpreters (--runs of them) under ``-X importtime``:
+
+  setup      django.setup(): migrate, collectstatic, create_admin, workers
+  web        main.wsgi plus the URLconf (views, serializers, DRF): one web worker
+  analyzer   web + core.utils.warm_up() (regex tables, first run; langgraph too
+             when SENTIMENT_ENGINE=langgraph)
+
+Prints the median wall time, the summed import time and the slowest top-level
+imports, and shows whether langgraph was loaded.
+
+Usage:
+    python benchmarks/bench_imports.py [--runs 5] [--top 8] [--only setup web]
+                                       [--output imports.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "setup": "import django; django.setup()",
+    "web": "import main.wsgi; from django.urls import get_resolver; get_resolver().url_patterns",
+    "analyzer": ("import main.wsgi; from django.urls import get_resolver; get_resolver().url_patterns; "
+                 "from core.utils import warm_up; warm_up()"),
+}
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from ``-X importtime`` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run_once(code):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"scenario failed:\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def measure(code, runs, top):
+    walls, totals, last = [], [], None
+    for _ in range(runs):
+        wall, rows = run_once(code)
+        walls.append(wall)
+        totals.append(sum(self_us for _, self_us, _, _ in rows))
+        last = rows
+    slowest = sorted((row for row in last if row[3] == 0), key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "runs": runs,
+        "wall_ms": round(statistics.median(walls) * 1e3, 1),
+        "import_ms": round(statistics.median(totals) / 1e3, 1),
+        "modules": len(last),
+        "langgraph_loaded": any(name == "langgraph" for name, _, _, _ in last),
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative / 1e3, 1)}
+                    for name, _, cumulative, _ in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only:
+        result = results[name] = measure(SCENARIOS[name], args.runs, args.top)
+        print(f"{name:<10} wall {result['wall_ms']:>8.1f} ms   imports {result['import_ms']:>8.1f} ms   "
+              f"{result['modules']} modules   langgraph {'yes' if result['langgraph_loaded'] else 'no'}")
+        for row in result["slowest"]:
+            print(f"    {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_llm.py - LLM path: client per call vs. shared pool vs. async
+"""
+Run the LLM analysis path against the local fake OpenAI server (no network):
+
+  client per call  a new OpenAI client for every text (the old behaviour)
+  shared client    analyze_with_llm() one text at a time over the pooled client
+  batch threads    analyze_with_llm_batch(), several feedbacks per prompt
+  micro-batched    analyze_with_llm() from many threads, merged by LLMBatcher
+  async            asyncio.gather() over analyze_with_llm_async()
+
+Each line also shows requests and prompt characters per analyzed row.
+
+Usage:
+    python benchmarks/bench_llm.py [--size 200] [--latency-ms 50] [--concurrency 8] [--batch-items 10]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_openai  # noqa: E402
+
+
+def timed(label, fn, texts, analyzer, server):
+    analyzer.cache.clear()
+    stats = server.stats
+    requests, chars = stats["requests"], stats["prompt_chars"]
+    start = time.perf_counter()
+    results = fn(texts)
+    elapsed = time.perf_counter() - start
+    assert all(r.get("source") == "llm" for r in results), "some calls fell back to rules"
+    print(f"{label:<16} {len(texts) / elapsed:>10.1f} texts/s {elapsed * 1e3:>10.1f} ms "
+          f"{(stats['requests'] - requests) / len(texts):>6.2f} req/row "
+          f"{(stats['prompt_chars'] - chars) / len(texts):>7.0f} prompt chars/row")
+    return elapsed
+
+
+def client_per_call(texts):
+    from openai import OpenAI
+    from core import llm
+    from core.utils import LLM_MODEL
+
+    results = []
+    for text in texts:
+        client = OpenAI(api_key=os.environ["OPENROUTER_API_KEY"], base_url=llm.llm_setting("BASE_URL"))
+        response = client.chat.completions.create(**llm._request(LLM_MODEL, text))
+        results.append(llm.parse_reply(response.choices[0].message.content))
+        client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-items", type=int, default=10)
+    args = parser.parse_args()
+
+    server, url = fake_openai.start(latency=args.latency_ms / 1000)
+    os.environ["OPENROUTER_BASE_URL"] = url
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake")
+    os.environ["LLM_BATCH_CONCURRENCY"] = str(args.concurrency)
+
+    from core import llm
+    from core.utils import get_analyzer
+    llm.DEFAULTS["CONCURRENCY"] = args.concurrency
+    llm.BATCH_DEFAULTS["MAX_ITEMS"] = args.batch_items
+
+    logging.disable(logging.CRITICAL)
+    analyzer = get_analyzer()
+    texts = [f"feedback number {i}: the rice was {'not ' if i % 3 else ''}good" for i in range(args.size)]
+
+    async def gather(batch):
+        return await asyncio.gather(*(analyzer.analyze_with_llm_async(t) for t in batch))
+
+    def threaded(batch):
+        with ThreadPoolExecutor(max_workers=args.concurrency * args.batch_items) as pool:
+            return list(pool.map(analyzer.analyze_with_llm, batch))
+
+    base = timed("client per call", client_per_call, texts, analyzer, server)
+    timed("shared client", lambda batch: [analyzer.call_llm(t) for t in batch], texts, analyzer, server)
+    timed("batch threads", analyzer.analyze_with_llm_batch, texts, analyzer, server)
+    timed("micro-batched", threaded, texts, analyzer, server)
+    fast = timed("async", lambda batch: asyncio.run(gather(batch)), texts, analyzer, server)
+    print(f"async speedup over client per call: {base / fast:.1f}x "
+          f"({args.latency_ms:.0f} ms simulated latency, {args.concurrency} in flight)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
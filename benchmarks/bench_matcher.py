@@ -0,0 +1,71 @@
+# benchmarks/bench_matcher.py - lexicon size vs. scan cost
+"""
+Time one lexicon scan as the keyword list grows, comparing the single-pass
+LexiconMatcher against one re.search per lexicon entry (the old node loops).
+
+Usage:
+    python benchmarks/bench_matcher.py [--sizes 40 500 2000 5000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.matcher import LexiconMatcher  # noqa: E402
+from core.utils import EnhancedFeedbackAnalyzer  # noqa: E402
+
+TEXT = ("Hindi ko ma-recommend, the rice was not so good pero ang bait ng tindera, "
+        "salamat po! Medyo mahal but overall it's okay naman.").lower()
+
+
+def build_lexicon(size, seed=7):
+    base = EnhancedFeedbackAnalyzer()
+    rnd = random.Random(seed)
+    positive = dict(base.positive_keywords)
+    negative = dict(base.negative_keywords)
+    while len(positive) + len(negative) < size:
+        word = ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(4, 10)))
+        (positive if rnd.random() < 0.5 else negative)[word] = round(rnd.uniform(0.3, 0.9), 2)
+    return base, positive, negative
+
+
+def naive_scan(base, positive, negative):
+    tables = [
+        [re.compile(p) for p, _, _ in base.negation_patterns],
+        [re.compile(p) for p in base.positive_phrases],
+        [re.compile(p) for p in base.negative_phrases],
+        [re.compile(rf'\b{k}\b') for k in positive],
+        [re.compile(rf'\b{k}\b') for k in negative],
+    ]
+    return lambda text: [[r for r in table if r.search(text)] for table in tables]
+
+
+def timeit(scan, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        scan(TEXT)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[40, 500, 2000, 5000])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'keywords':>8} {'per-pattern us':>15} {'single-pass us':>15}")
+    for size in args.sizes:
+        base, positive, negative = build_lexicon(size)
+        matcher = LexiconMatcher(base.negation_patterns, base.positive_phrases,
+                                 base.negative_phrases, positive, negative)
+        old = timeit(naive_scan(base, positive, negative), max(1, args.rounds * 40 // size))
+        new = timeit(matcher.scan, args.rounds)
+        print(f"{size:>8} {old:>15.1f} {new:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/compare.py - diff two benchmark suite results
+"""
+Compare two JSON files written by ``benchmarks/suite.py`` (e.g. two commits).
+Throughput and p95 are shown as new/old; cases whose throughput moved by more
+than --threshold percent are flagged.
+
+Usage:
+    python benchmarks/compare.py OLD.json NEW.json [--threshold 10]
+"""
+import argparse
+import json
+
+
+def ratio(new, old):
+    return new / old if old else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10, help="Percent change worth flagging")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"old: {old['meta']['commit']} ({old['meta']['timestamp']})")
+    print(f"new: {new['meta']['commit']} ({new['meta']['timestamp']})")
+    print(f"{'case':<24} {'old items/s':>12} {'new items/s':>12} {'x':>7} {'p95 x':>7}")
+
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if not (a and b):
+            print(f"{name:<24} only in {'new' if b else 'old'}")
+            continue
+        if "items_per_s" not in a or "items_per_s" not in b:
+            continue
+        speed = ratio(b["items_per_s"], a["items_per_s"])
+        p95 = ratio(b["p95_us"], a["p95_us"]) if "p95_us" in a and "p95_us" in b else float("nan")
+        flag = ""
+        if abs(speed - 1) * 100 >= args.threshold:
+            flag = "  faster" if speed > 1 else "  SLOWER"
+        print(f"{name:<24} {a['items_per_s']:>12.1f} {b['items_per_s']:>12.1f} {speed:>7.2f} {p95:>7.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
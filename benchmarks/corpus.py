@@ -0,0 +1,68 @@
+# benchmarks/corpus.py - seeded synthetic feedback for the benchmark suite
+"""
+Reproducible store feedback: the same seed always yields the same corpus.
+
+Every item has a language mix (``english`` or ``taglish``), a length bucket
+(``short`` 1-6 words, ``medium`` 7-40, ``long`` 60-250, which is past the
+analyzer's 1000-character cut) and a flag for negation-heavy text ("not
+good", "not bad", "hindi ... pero ...").
+"""
+import random
+
+POSITIVE = ["good", "great", "excellent", "awesome", "love", "perfect", "best", "happy",
+            "nice", "fine", "okay", "satisfied", "recommend", "pleased"]
+NEGATIVE = ["bad", "terrible", "awful", "horrible", "worst", "hate", "poor", "useless",
+            "disappointed", "waste", "broken"]
+NEUTRAL = ["the", "rice", "store", "service", "price", "delivery", "item", "was", "is", "and",
+           "today", "yesterday", "again", "my", "order", "tindera", "sukli", "bayad"]
+TAGALOG = ["po", "naman", "talaga", "sobrang", "ang", "ganda", "sulit", "mahal", "mura",
+           "salamat", "medyo", "pero", "kasi", "ng", "sa", "yung", "mabait", "bagal", "hindi"]
+NEGATIONS = ["not good", "not so good", "not great", "not nice", "no good", "never good",
+             "not bad", "not that bad", "not too bad", "hindi masarap pero not bad",
+             "not excellent", "hate it", "love it", "very bad", "very good"]
+OPENERS = ["", "Hi! ", "Ate, ", "Honestly ", "Grabe, ", "Salamat po. "]
+ENDINGS = ["", ".", "!", "!!", "?", " po.", " naman.", " haha"]
+
+LENGTHS = {"short": (1, 6), "medium": (7, 40), "long": (60, 250)}
+DEFAULT_MIX = {"short": 0.4, "medium": 0.5, "long": 0.1}
+
+
+def _words(rnd, count, taglish, negation):
+    vocab = NEUTRAL + (TAGALOG * 2 if taglish else [])
+    words = []
+    while len(words) < count:
+        roll = rnd.random()
+        if negation and roll < 0.25:
+            words.extend(rnd.choice(NEGATIONS).split())
+        elif roll < 0.45:
+            words.append(rnd.choice(POSITIVE if rnd.random() < 0.55 else NEGATIVE))
+        else:
+            words.append(rnd.choice(vocab))
+    return words[:max(count, 1)]
+
+
+def generate(size: int, seed: int = 42, taglish_share: float = 0.5, negation_share: float = 0.3,
+             lengths: dict = None):
+    """``size`` items of ``{"text", "lang", "length", "negation"}``"""
+    rnd = random.Random(seed)
+    lengths = lengths or DEFAULT_MIX
+    buckets, weights = zip(*lengths.items())
+    items = []
+    for _ in range(size):
+        length = rnd.choices(buckets, weights)[0]
+        taglish = rnd.random() < taglish_share
+        negation = rnd.random() < negation_share
+        words = _words(rnd, rnd.randint(*LENGTHS[length]), taglish, negation)
+        if rnd.random() < 0.3:
+            words[0] = words[0].capitalize()
+        items.append({
+            "text": rnd.choice(OPENERS) + " ".join(words) + rnd.choice(ENDINGS),
+            "lang": "taglish" if taglish else "english",
+            "length": length,
+            "negation": negation,
+        })
+    return items
+
+
+def texts(size: int, seed: int = 42, **kwargs):
+    return [item["text"] for item in generate(size, seed, **kwargs)]
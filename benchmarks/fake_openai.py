@@ -0,0 +1,92 @@
+# benchmarks/fake_openai.py - local OpenAI-compatible server for LLM benchmarks
+"""
+Answers POST /v1/chat/completions with a canned sentiment verdict after a fixed
+delay, over HTTP/1.1 keep-alive, so the LLM path can be load-tested offline.
+Numbered multi-feedback prompts get a JSON array back. ``server.stats``
+counts requests and prompt characters.
+
+Usage:
+    python benchmarks/fake_openai.py [--port 8765] [--latency-ms 50]
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 OPENROUTER_API_KEY=x ...
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def verdict(text):
+    sentiment = "NEGATIVE" if "not" in text.lower() else "POSITIVE"
+    return {"sentiment": sentiment, "confidence": 0.9, "reasoning": "fake server"}
+
+
+def answer(prompt):
+    numbered = re.findall(r'^(\d+)\. (".*")$', prompt, re.MULTILINE)
+    if numbered:
+        return json.dumps([dict(id=int(i), **verdict(json.loads(text))) for i, text in numbered])
+    return json.dumps(verdict(prompt))
+
+
+def make_handler(latency, stats):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = request.get("messages", [{}])[-1].get("content", "")
+            with stats["lock"]:
+                stats["requests"] += 1
+                stats["prompt_chars"] += len(prompt)
+            time.sleep(latency)
+            body = json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": answer(prompt)},
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start(port=0, latency=0.05):
+    """Serve in a daemon thread; returns (server, base_url)"""
+    stats = {"lock": threading.Lock(), "requests": 0, "prompt_chars": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, stats))
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server, url = start(args.port, args.latency_ms / 1000)
+    print(f"Fake OpenAI server on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
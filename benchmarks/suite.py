@@ -0,0 +1,227 @@
+# benchmarks/suite.py - sentiment engine benchmark suite with JSON output
+"""
+Runs offline on a plain Linux box (the LLM cases use the local fake server)
+and writes one JSON file per run, so two commits can be compared with
+``benchmarks/compare.py``.
+
+Cases (throughput plus p50/p95/p99 latency per call, or per batch):
+
+  analyze_feedback.cold   rule workflow, empty result cache
+  analyze_feedback.warm   same texts again, served from the cache
+  node.<name>             each LangGraph node function called directly
+  engine.<name>           run_workflow() (uncached) on the fast and the langgraph engine
+  batch                   analyze_feedback_batch() over --batch-size chunks
+  llm.single              call_llm() one at a time (pooled client, guarded)
+  llm.batched             analyze_with_llm_batch() (several feedbacks per prompt)
+  llm.async               analyze_with_llm_async() under asyncio.gather()
+
+Usage:
+    python benchmarks/suite.py [--size 2000] [--seed 42] [--only analyze node engine batch llm]
+                               [--llm-latency-ms 20] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus  # noqa: E402
+import fake_openai  # noqa: E402
+
+GROUPS = ("analyze", "node", "engine", "batch", "llm")
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies, items, elapsed):
+    """latencies in seconds (one per call); items = texts processed in ``elapsed`` seconds"""
+    ordered = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "seconds": round(elapsed, 6),
+        "items_per_s": round(items / elapsed, 2) if elapsed else None,
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "p50_us": round(percentile(ordered, 50) * 1e6, 2),
+        "p95_us": round(percentile(ordered, 95) * 1e6, 2),
+        "p99_us": round(percentile(ordered, 99) * 1e6, 2),
+    }
+
+
+def measure(fn, inputs, items=None):
+    """Call ``fn`` on each input; ``items`` is the number of texts covered (default: one per call)"""
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for value in inputs:
+        t0 = clock()
+        fn(value)
+        latencies.append(clock() - t0)
+    return summarize(latencies, len(latencies) if items is None else items, clock() - start)
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return rev, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def analyze_cases(analyzer, texts):
+    analyzer.cache.clear()
+    yield "analyze_feedback.cold", measure(analyzer.analyze_feedback, texts)
+    yield "analyze_feedback.warm", measure(analyzer.analyze_feedback, texts)
+
+
+def node_cases(analyzer, texts):
+    initial = [{
+        "feedback_text": text, "sentiment": "", "confidence": 0.0, "reasoning": "",
+        "error": "", "analysis_complete": False, "matches": None,
+    } for text in texts]
+    preprocessed = [analyzer.preprocess_node(state) for state in initial]
+    patterned = [analyzer.pattern_analysis_node(state) for state in preprocessed]
+    # Only rows the pattern node left open reach the keyword node in the graph
+    open_rows = [state for state in patterned if not state.get("analysis_complete")] or patterned
+    keyworded = [analyzer.keyword_analysis_node(state) for state in open_rows]
+
+    yield "node.preprocess", measure(analyzer.preprocess_node, initial)
+    yield "node.pattern_analysis", measure(analyzer.pattern_analysis_node, preprocessed)
+    yield "node.keyword_analysis", measure(analyzer.keyword_analysis_node, open_rows)
+    yield "node.finalize", measure(analyzer.finalize_node, keyworded)
+
+
+def engine_cases(texts):
+    from core.utils import EnhancedFeedbackAnalyzer
+    for engine in ("fast", "langgraph"):
+        yield f"engine.{engine}", measure(EnhancedFeedbackAnalyzer(engine=engine).run_workflow, texts)
+
+
+def batch_cases(analyzer, texts, batch_size):
+    chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    analyzer.cache.clear()
+    result = measure(analyzer.analyze_feedback_batch, chunks, items=len(texts))
+    result["batch_size"] = batch_size
+    yield "batch", result
+
+
+def llm_cases(analyzer, texts, concurrency):
+    distinct = list(dict.fromkeys(texts))
+
+    analyzer.cache.clear()
+    yield "llm.single", measure(analyzer.call_llm, distinct)
+
+    analyzer.cache.clear()
+    start = time.perf_counter()
+    analyzer.analyze_with_llm_batch(distinct)
+    elapsed = time.perf_counter() - start
+    yield "llm.batched", {
+        "calls": 1, "items": len(distinct), "seconds": round(elapsed, 6),
+        "items_per_s": round(len(distinct) / elapsed, 2),
+    }
+
+    async def timed(text):
+        t0 = time.perf_counter()
+        await analyzer.analyze_with_llm_async(text)
+        return time.perf_counter() - t0
+
+    async def gather():
+        return await asyncio.gather(*(timed(text) for text in distinct))
+
+    analyzer.cache.clear()
+    start = time.perf_counter()
+    latencies = asyncio.run(gather())
+    result = summarize(latencies, len(distinct), time.perf_counter() - start)
+    result["concurrency"] = concurrency
+    yield "llm.async", result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000, help="Corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--llm-size", type=int, default=200, help="Texts sent through the LLM cases")
+    parser.add_argument("--llm-latency-ms", type=float, default=20, help="Fake server response delay")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    server = None
+    if "llm" in args.only:
+        # Point the LLM client at the fake server before core.llm reads its defaults
+        server, url = fake_openai.start(latency=args.llm_latency_ms / 1000)
+        os.environ["OPENROUTER_BASE_URL"] = url
+        os.environ.setdefault("OPENROUTER_API_KEY", "fake")
+
+    from core import llm
+    from core.utils import get_analyzer
+    llm.DEFAULTS["CONCURRENCY"] = args.llm_concurrency
+
+    logging.disable(logging.CRITICAL)
+    analyzer = get_analyzer()
+    texts = corpus.texts(args.size, args.seed)
+
+    cases = []
+    if "analyze" in args.only:
+        cases.append(analyze_cases(analyzer, texts))
+    if "node" in args.only:
+        cases.append(node_cases(analyzer, texts))
+    if "engine" in args.only:
+        cases.append(engine_cases(texts))
+    if "batch" in args.only:
+        cases.append(batch_cases(analyzer, texts, args.batch_size))
+    if "llm" in args.only:
+        cases.append(llm_cases(analyzer, texts[:args.llm_size], args.llm_concurrency))
+
+    results = {}
+    print(f"{'case':<24} {'items/s':>12} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    for group in cases:
+        for name, result in group:
+            results[name] = result
+            print(f"{name:<24} {result['items_per_s'] or 0:>12.1f} "
+                  + " ".join(f"{result.get(k, float('nan')):>10.1f}" for k in ("p50_us", "p95_us", "p99_us")))
+    if server is not None:
+        results["llm.requests"] = {"requests": server.stats["requests"],
+                                   "prompt_chars": server.stats["prompt_chars"]}
+        server.shutdown()
+
+    revision, dirty = git_revision()
+    report = {
+        "meta": {
+            "commit": revision,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "analyzer_version": analyzer.version,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{revision or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
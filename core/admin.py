@@ -1,14 +1,63 @@
 # main/core/admin.py - UPDATED
-from django.contrib import admin
-from .models import Feedback
+from itertools import islice
+
+from django.contrib import admin, messages
+from .models import Feedback, Product, SentimentJob
+from .pagination import EstimatedCountPaginator
+from .search import full_text_available, search_feedback
+from .tasks import queue_sentiment_batch
+
+REANALYZE_CHUNK = 500
+
+
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filter by username typed into a box (suggestions come from the admin
+    autocomplete endpoint) instead of a sidebar listing every user.
+    """
+    title = 'user'
+    parameter_name = 'user'
+    template = 'admin/core/user_autocomplete_filter.html'
+
+    def lookups(self, request, model_admin):
+        # Only the active choice: Django hides filters without lookups
+        return [(self.value(), self.value())] if self.value() else [('', '')]
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'parameter_name': self.parameter_name,
+            'clear_url': changelist.get_query_string(remove=[self.parameter_name]),
+            'hidden_params': {
+                key: value for key, value in changelist.get_filters_params().items()
+                if key != self.parameter_name
+            },
+        }
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__username=self.value())
+        return queryset
+
 
 @admin.register(Feedback)
 class FeedbackAdmin(admin.ModelAdmin):
     # Show sentiment in admin list
     list_display = ('user', 'message_preview', 'sentiment', 'confidence', 'created_at', 'analyzed_at')
-    list_filter = ('sentiment', 'created_at', 'user')
-    search_fields = ('user__username', 'message')
-    readonly_fields = ('created_at', 'analyzed_at')
+    list_filter = ('sentiment', 'analysis_tier', UserAutocompleteFilter)
+    list_select_related = ('user',)
+    # Message search goes through the full-text index (see get_search_results); use the user filter for usernames
+    search_fields = ('message',)
+    search_help_text = 'Words in the message'
+    # Verdicts only change through analysis (see the re-analyze action), which keeps the rollups in step
+    readonly_fields = ('sentiment', 'confidence', 'created_at', 'analyzed_at')
+    autocomplete_fields = ('user',)
+    # Backed by the (-created_at, -id) index
+    date_hierarchy = 'created_at'
+    # Planner estimates instead of COUNT(*) on big tables, and no second count for filtered pages
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['reanalyze_selected']
     
     # Add fields for detailed view
     fieldsets = (
@@ -16,7 +65,7 @@ class FeedbackAdmin(admin.ModelAdmin):
             'fields': ('user', 'message')
         }),
         ('Sentiment Analysis', {
-            'fields': ('sentiment', 'confidence', 'reasoning', 'analyzed_at')
+            'fields': ('sentiment', 'confidence', 'reasoning', 'analysis_tier', 'analyzed_at')
         }),
         ('Timestamps', {
             'fields': ('created_at',)
@@ -25,4 +74,49 @@ class FeedbackAdmin(admin.ModelAdmin):
     
     def message_preview(self, obj):
         return obj.message[:100] + "..." if len(obj.message) > 100 else obj.message
-    message_preview.short_description = 'Message'
\ No newline at end of file
+    message_preview.short_description = 'Message'
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not full_text_available(queryset):
+            return super().get_search_results(request, queryset, search_term)
+        # Keep the changelist ordering; ranking isn't needed here
+        return search_feedback(queryset, search_term, rank=False), False
+
+    @admin.action(description='Re-analyze selected feedback')
+    def reanalyze_selected(self, request, queryset):
+        # Queue in chunks; the analysis itself runs on the pool or the sentiment workers
+        queued = dropped = 0
+        ids = queryset.values_list('id', flat=True).order_by().iterator(chunk_size=REANALYZE_CHUNK)
+        for chunk in iter(lambda: list(islice(ids, REANALYZE_CHUNK)), []):
+            if queue_sentiment_batch(chunk):
+                queued += len(chunk)
+            else:
+                dropped += len(chunk)
+        if queued:
+            self.message_user(request, f"🔄 Queued {queued} feedback(s) for re-analysis", messages.SUCCESS)
+        if dropped:
+            # The pool's "pending" full policy refuses work instead of waiting
+            self.message_user(
+                request,
+                f"⚠️ {dropped} feedback(s) were not queued: the analysis queue is full. Try again later, "
+                f"or use manage.py reanalyze_feedback for large selections.",
+                messages.WARNING,
+            )
+
+
+@admin.register(SentimentJob)
+class SentimentJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'feedback_id', 'status', 'attempts', 'run_after', 'locked_by', 'updated_at')
+    list_filter = ('status',)
+    raw_id_fields = ('feedback',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    # Saving here clears the catalog cache behind GET /api/products/ (see core.catalog)
+    list_display = ('name', 'category', 'price', 'tag', 'is_active', 'sort_order', 'updated_at')
+    list_editable = ('price', 'is_active', 'sort_order')
+    list_filter = ('category', 'is_active')
+    search_fields = ('name', 'tag')
+    readonly_fields = ('created_at', 'updated_at')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Connect the signals that clear the catalog, token and feedback list caches
+        # and take deleted feedback out of the sentiment rollups
+        from . import authentication, catalog, feedback_cache, rollups  # noqa: F401
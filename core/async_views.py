@@ -0,0 +1,221 @@
+# main/core/async_views.py - ASYNC (ASGI) AUTH & FEEDBACK VIEWS
+"""
+Native async versions of LoginView, RegisterView and FeedbackView. The URLs
+use them when ``ASYNC_API`` is on and main.asgi runs under uvicorn (see
+README).
+
+DRF's APIView is sync-only, so these are plain Django async views. They keep
+the same request and response shapes, token authentication, throttles and
+feedback list cache. On the event loop:
+- database access uses the async ORM
+- password hashing, throttles and the feedback list cache (the cache API is
+  sync) run in a worker thread
+- a new feedback is analyzed by a task (core.tasks.analyze_sentiment_async)
+- GET /api/feedback/events/ streams from an async generator
+
+A slow client or an LLM call therefore holds a coroutine, not a worker process.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import CachedTokenAuthentication, QueryStringTokenAuthentication
+from .models import Feedback
+from .pagination import FeedbackCursorPagination
+from .serializers import FeedbackSerializer, LoginSerializer, RegisterSerializer
+from .tasks import analyze_sentiment_async
+from .throttling import AuthIPThrottle, AuthUsernameThrottle, FeedbackIPThrottle, FeedbackUserThrottle
+from .views import conditional_response
+from . import events, feedback_cache
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of APIView: JSON/form body in ``request.data``,
+    token authentication, throttles, and DRF exceptions turned into the same
+    JSON error responses.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    throttle_classes = []
+    login_required = False
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated API, like APIView: no CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        try:
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            request.data = self.parse_body(request)
+            await self.perform_authentication(request)
+            # Throttle state lives in the cache, which is sync-only
+            await sync_to_async(self.check_throttles)(request)
+            return await handler(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    @staticmethod
+    def parse_body(request):
+        if request.method not in ("POST", "PUT", "PATCH"):
+            return {}
+        if request.content_type == "application/json":
+            try:
+                return json.loads(request.body or b"{}")
+            except ValueError as e:
+                raise exceptions.ParseError(f"JSON parse error - {e}")
+        return request.POST
+
+    async def perform_authentication(self, request):
+        request.user, request.auth = AnonymousUser(), None
+        for authentication_class in self.authentication_classes:
+            result = await authentication_class().aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                break
+        if self.login_required and not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    def get_throttles(self, request):
+        return [throttle() for throttle in self.throttle_classes]
+
+    def check_throttles(self, request):
+        waits = [throttle.wait() for throttle in self.get_throttles(request)
+                 if not throttle.allow_request(request, self)]
+        if waits:
+            raise exceptions.Throttled(max(waits))
+
+    @staticmethod
+    def handle_exception(exc):
+        response = JsonResponse(
+            exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail},
+            status=exc.status_code, safe=False,
+        )
+        if isinstance(exc, exceptions.Throttled) and exc.wait is not None:
+            response["Retry-After"] = str(int(exc.wait))
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response["WWW-Authenticate"] = CachedTokenAuthentication.keyword
+        return response
+
+
+async def authenticate_async(username: str, password: str):
+    """
+    ModelBackend.authenticate() with the hashing in a worker thread
+    (Django's aauthenticate() verifies the password on the event loop)
+    """
+    user = await User._default_manager.filter(**{User.USERNAME_FIELD: username}).afirst()
+    if user is None:
+        # Hash anyway, so the response time doesn't tell whether the username exists
+        await asyncio.to_thread(make_password, password)
+        return None
+
+    is_correct, must_update = await asyncio.to_thread(verify_password, password, user.password)
+    if not is_correct or not user.is_active:
+        return None
+    if must_update:
+        user.password = await asyncio.to_thread(make_password, password)
+        await user.asave(update_fields=["password"])
+    return user
+
+
+# ✅ REGISTER (async)
+class AsyncRegisterView(AsyncAPIView):
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
+
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        # The unique-username validator queries the database
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+
+        data = serializer.validated_data
+        user = User(username=User.normalize_username(data['username']),
+                    email=User.objects.normalize_email(data['email']))
+        user.password = await asyncio.to_thread(make_password, data['password'])
+        try:
+            await user.asave()
+        except IntegrityError:
+            return JsonResponse({"username": ["A user with that username already exists."]}, status=400)
+
+        token, _ = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({"token": token.key, "username": user.username}, status=201)
+
+
+# ✅ LOGIN (async)
+class AsyncLoginView(AsyncAPIView):
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
+
+    async def post(self, request):
+        serializer = LoginSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        user = await authenticate_async(serializer.validated_data['username'],
+                                        serializer.validated_data['password'])
+        if not user:
+            return JsonResponse({"error": "Invalid credentials"}, status=401)
+
+        token, _ = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({"token": token.key, "username": user.username})
+
+
+# ✅ FEEDBACK (async) - analysis runs as a task on this worker's event loop
+class AsyncFeedbackView(AsyncAPIView):
+    login_required = True
+
+    def get_throttles(self, request):
+        # Submissions start analysis work; polling the list is left alone
+        if request.method == "POST":
+            return [FeedbackUserThrottle(), FeedbackIPThrottle()]
+        return []
+
+    async def post(self, request):
+        serializer = FeedbackSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        # The async ORM has no transaction.atomic(): with the database queue backend
+        # the job row is written right after the feedback commits, not with it
+        feedback = await Feedback.objects.acreate(user=request.user, **serializer.validated_data)
+        await analyze_sentiment_async(feedback.id)
+        return JsonResponse(FeedbackSerializer(feedback).data, status=201)
+
+    async def get(self, request):
+        key = await sync_to_async(feedback_cache.page_key)(request.user.id, request.build_absolute_uri())
+        cached = await sync_to_async(feedback_cache.get_page)(key)
+        if cached is not None:
+            data, last_modified = cached
+        else:
+            paginator = FeedbackCursorPagination()
+            feedbacks = Feedback.objects.filter(user=request.user).only('id', 'message', 'created_at', 'analyzed_at')
+            page = await paginator.apaginate_queryset(feedbacks, Request(request))
+            data = paginator.get_paginated_data(FeedbackSerializer(page, many=True).data)
+            last_modified = max((f.analyzed_at or f.created_at for f in page), default=None)
+            await sync_to_async(feedback_cache.set_page)(key, data, last_modified)
+
+        response = JsonResponse(data, encoder=JSONEncoder)
+        return conditional_response(request, response, last_modified, data=data)
+
+
+# ✅ FEEDBACK EVENTS (async) - an open stream is a coroutine, not a worker
+class AsyncFeedbackEventsView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication, QueryStringTokenAuthentication]
+    login_required = True
+
+    async def get(self, request):
+        after = events.parse_last_event_id(request.headers.get("Last-Event-ID"))
+        return events.event_stream_response(events.astream(request.user.id, after))
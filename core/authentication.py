@@ -0,0 +1,225 @@
+# main/core/authentication.py - CACHED TOKEN AUTHENTICATION
+"""
+Drop-in replacement for DRF's ``TokenAuthentication``. It skips the
+token+user query on warm requests.
+
+A token, with its user attached, is cached in two places:
+- a per-process LRU with a short TTL
+- optionally, a shared Django cache (``TOKEN_AUTH_CACHE["SHARED_CACHE"]``
+  names an alias in CACHES), so gunicorn workers warm each other
+
+Some changes evict the token from this process's LRU and from the shared
+tier: deleting a token, deleting the user, deactivating them or changing
+their password (any User save except the login timestamp). Other workers
+drop their LRU copy when its TTL runs out. Queryset ``update()`` sends no
+signals; call ``invalidate_user()`` after one.
+"""
+import copy
+import hashlib
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from .cache import LRUCache, get_setting
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MAX_ENTRIES": 10000,
+    "TTL": 60,
+    "SHARED_CACHE": None,
+    "SHARED_TTL": 300,
+}
+
+
+def token_cache_setting(name: str):
+    config = get_setting("TOKEN_AUTH_CACHE", {}) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+class TokenCache:
+    """token key -> Token (with ``user`` loaded); process LRU in front of an optional shared cache"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60, shared_alias: str = None, shared_ttl: int = 300):
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.shared_alias = shared_alias
+        self.shared_ttl = shared_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "TokenCache":
+        return cls(
+            max_entries=token_cache_setting("MAX_ENTRIES"),
+            ttl=token_cache_setting("TTL"),
+            shared_alias=token_cache_setting("SHARED_CACHE"),
+            shared_ttl=token_cache_setting("SHARED_TTL"),
+        )
+
+    @property
+    def shared(self):
+        if not self.shared_alias:
+            return None
+        from django.core.cache import caches
+        return caches[self.shared_alias]
+
+    @staticmethod
+    def shared_key(key: str) -> str:
+        # Never put raw tokens in a cache other processes (or a Redis dump) can read
+        return "authtoken:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        token = self.memory.get(key)
+        if token is not None or self.shared is None:
+            return token
+        try:
+            token = self.shared.get(self.shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared token cache read failed: {e}")
+            return None
+        if token is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        self.memory.set(key, token)
+        return token
+
+    def set(self, key: str, token):
+        self.memory.set(key, token)
+        if self.shared is not None:
+            try:
+                self.shared.set(self.shared_key(key), token, self.shared_ttl)
+            except Exception as e:
+                logger.warning(f"Shared token cache write failed: {e}")
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(self.shared_key(key))
+            except Exception as e:
+                logger.warning(f"Shared token cache delete failed: {e}")
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        if self.shared_alias:
+            lookups = self.shared_hits + self.shared_misses
+            stats.update(
+                shared_cache=self.shared_alias,
+                shared_hits=self.shared_hits,
+                shared_misses=self.shared_misses,
+                shared_hit_ratio=round(self.shared_hits / lookups, 4) if lookups else 0.0,
+            )
+        return stats
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache.from_settings()
+                metrics.register("token_auth_cache", _token_cache.stats)
+    return _token_cache
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that answers warm requests from ``TokenCache`` without a query"""
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cached = cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(key, token)
+            return user, token
+        return self._from_cache(cached)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views: a token in this process's LRU is checked without leaving the loop"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        cached = get_token_cache().memory.get(key)
+        if cached is not None:
+            return self._from_cache(cached)
+        # Shared tier and database
+        return await sync_to_async(self.authenticate_credentials)(key)
+
+    @staticmethod
+    def _from_cache(cached):
+        # Cached objects are shared between requests (and threads): hand out copies
+        token = copy.copy(cached)
+        token.user = copy.copy(cached.user)
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+
+
+def invalidate_user(user_id):
+    """Evict every cached token of ``user_id``"""
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        get_token_cache().delete(key)
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="core.authentication.token_deleted")
+def _token_deleted(instance, **kwargs):
+    get_token_cache().delete(instance.key)
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="core.authentication.user_saved")
+def _user_saved(instance, created, update_fields=None, **kwargs):
+    # Every login saves last_login; that can't change what the token grants
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_user(instance.pk)
+
+
+class QueryStringTokenAuthentication(CachedTokenAuthentication):
+    """
+    Token from ``?token=`` for EventSource, which can't send an Authorization
+    header. Only for the events stream: URLs end up in access logs.
+    """
+    query_param = "token"
+
+    def authenticate(self, request):
+        key = self.get_query_token(request)
+        if key is None:
+            return None
+        return self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        key = self.get_query_token(request)
+        if key is None:
+            return None
+        cached = get_token_cache().memory.get(key)
+        if cached is not None:
+            return self._from_cache(cached)
+        return await sync_to_async(self.authenticate_credentials)(key)
+
+    def get_query_token(self, request):
+        return getattr(request, "query_params", request.GET).get(self.query_param) or None
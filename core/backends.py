@@ -0,0 +1,155 @@
+# main/core/backends.py - ANALYSIS BACKEND REGISTRY + TIERED ROUTER
+"""
+Sentiment backends by name, and a router that tries them cheapest first.
+
+A backend is any object with ``analyze(text)``, ``analyze_batch(texts)`` and
+``available()``. ``TieredRouter`` runs the first tier on everything and hands
+a row to the next tier only when the verdict is uncertain (confidence below
+``threshold``, or NEUTRAL when ``escalate_neutral``). Every result records
+the tier that answered it under ``"tier"``. Later tiers must tag their own
+answers with ``"source": <tier name>``; anything else (e.g. the LLM quietly
+falling back to rules) leaves the earlier tier's verdict in place.
+
+Settings (``SENTIMENT_TIERS``): TIERS, CONFIDENCE_THRESHOLD, ESCALATE_NEUTRAL, USE_LLM.
+"""
+import os
+import threading
+from typing import Dict, List
+
+from .cache import get_setting
+
+DEFAULTS = {
+    "TIERS": ["rules", "llm"],
+    "CONFIDENCE_THRESHOLD": 0.7,
+    "ESCALATE_NEUTRAL": True,
+    "USE_LLM": False,
+}
+
+_backends = {}
+
+
+def tier_setting(name: str):
+    return get_setting("SENTIMENT_TIERS", {}).get(name, DEFAULTS[name])
+
+
+def register_backend(name: str, backend):
+    """Make ``backend`` routable as ``name`` (re-registering replaces it)"""
+    _backends[name] = backend
+
+
+def get_backend(name: str):
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown sentiment backend {name!r}; registered: {sorted(_backends)}")
+
+
+class RulesBackend:
+    """The LangGraph rule workflow: microseconds on a cache hit, milliseconds otherwise"""
+
+    def available(self) -> bool:
+        return True
+
+    def analyze(self, text: str) -> Dict:
+        from .utils import get_analyzer
+        return get_analyzer().analyze_feedback(text)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        from .utils import get_analyzer
+        return get_analyzer().analyze_feedback_batch(texts)
+
+
+class LLMBackend:
+    """The OpenRouter model; only available with an API key"""
+
+    def available(self) -> bool:
+        return bool(os.getenv("OPENROUTER_API_KEY"))
+
+    def analyze(self, text: str) -> Dict:
+        from .utils import get_analyzer
+        return get_analyzer().analyze_with_llm(text)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        from .utils import get_analyzer
+        return get_analyzer().analyze_with_llm_batch(texts)
+
+
+register_backend("rules", RulesBackend())
+register_backend("llm", LLMBackend())
+
+
+class TieredRouter:
+    def __init__(self, tiers: List[str], threshold: float = 0.7, escalate_neutral: bool = True):
+        if not tiers:
+            raise ValueError("TieredRouter needs at least one tier")
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self.escalate_neutral = escalate_neutral
+        self._lock = threading.Lock()
+        self.routed = 0
+        # Rows handed past the first tier, whether or not the next tier answered
+        self.escalated = 0
+        self.answered = {tier: 0 for tier in self.tiers}
+
+    @classmethod
+    def from_settings(cls) -> "TieredRouter":
+        return cls(
+            tiers=tier_setting("TIERS"),
+            threshold=tier_setting("CONFIDENCE_THRESHOLD"),
+            escalate_neutral=tier_setting("ESCALATE_NEUTRAL"),
+        )
+
+    def needs_escalation(self, result: Dict) -> bool:
+        if not result.get("success", True):
+            return True
+        if self.escalate_neutral and result.get("sentiment") == "NEUTRAL":
+            return True
+        return result.get("confidence", 0.0) < self.threshold
+
+    def analyze(self, text: str, max_tier: int = None) -> Dict:
+        return self.analyze_batch([text], max_tier)[0]
+
+    def analyze_batch(self, texts: List[str], max_tier: int = None) -> List[Dict]:
+        """
+        Analyze ``texts`` through the tiers; ``max_tier`` caps how many are tried
+        (1 = first tier only). Unavailable tiers are skipped; when none is left
+        the rules backend answers, so every row always gets a result.
+        """
+        tiers = [tier for tier in self.tiers[:max_tier] if get_backend(tier).available()] or ["rules"]
+        results = [None] * len(texts)
+        todo = list(range(len(texts)))
+        escalated = 0
+
+        for depth, tier in enumerate(tiers):
+            if depth:
+                escalated += len(todo)
+            answers = get_backend(tier).analyze_batch([texts[i] for i in todo])
+            last = depth == len(tiers) - 1
+            unsure = []
+            for i, answer in zip(todo, answers):
+                if depth and answer.get("source") != tier:
+                    continue
+                results[i] = dict(answer, tier=tier)
+                if not last and self.needs_escalation(answer):
+                    unsure.append(i)
+            todo = unsure
+            if not todo:
+                break
+
+        with self._lock:
+            self.routed += len(texts)
+            self.escalated += escalated
+            for result in results:
+                self.answered[result["tier"]] = self.answered.get(result["tier"], 0) + 1
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tiers": self.tiers,
+                "threshold": self.threshold,
+                "routed": self.routed,
+                "escalated": self.escalated,
+                "escalation_rate": self.escalated / self.routed if self.routed else 0.0,
+                "answered": dict(self.answered),
+            }
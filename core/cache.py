@@ -0,0 +1,213 @@
+# main/core/cache.py - IN-PROCESS LRU/TTL CACHE + SENTIMENT RESULT CACHE
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def get_setting(name: str, default=None):
+    """Read a Django setting, falling back to ``default`` when Django isn't configured"""
+    try:
+        from django.conf import settings
+        if settings.configured:
+            return getattr(settings, name, default)
+    except ImportError:
+        pass
+    return default
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SentimentCache:
+    """
+    Two-tier cache for analysis results.
+
+    Tier 1 is a per-process LRUCache. Tier 2 (optional, ``PERSISTENT``) is the
+    ``SentimentCacheEntry`` table, so warm results survive restarts and are
+    shared between gunicorn workers. Every ``PURGE_EVERY`` writes, the writing
+    process deletes expired rows and rows of other analyzer versions.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 86400, persistent: bool = False,
+                 purge_every: int = 1000):
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.ttl = ttl
+        self.persistent = persistent
+        self.purge_every = purge_every
+        self.db_hits = 0
+        self.db_misses = 0
+        self.db_writes = 0
+        self.db_purged = 0
+
+    @classmethod
+    def from_settings(cls) -> "SentimentCache":
+        config = get_setting("SENTIMENT_CACHE", {}) or {}
+        return cls(
+            max_entries=config.get("MAX_ENTRIES", 10000),
+            ttl=config.get("TTL", 86400),
+            persistent=config.get("PERSISTENT", False),
+            purge_every=config.get("PURGE_EVERY", 1000),
+        )
+
+    @staticmethod
+    def make_key(version: str, source: str, text: str) -> str:
+        return hashlib.sha256(f"{version}\x00{source}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        result = self.memory.get(key)
+        if result is not None:
+            return dict(result)
+        if not self.persistent:
+            return None
+
+        try:
+            from django.utils import timezone
+            from .models import SentimentCacheEntry
+
+            entry = SentimentCacheEntry.objects.filter(
+                key=key,
+                created_at__gte=timezone.now() - timedelta(seconds=self.ttl),
+            ).values("sentiment", "confidence", "reasoning", "source").first()
+        except Exception as e:
+            logger.warning(f"Sentiment cache DB read failed: {e}")
+            return None
+
+        if entry is None:
+            self.db_misses += 1
+            return None
+
+        self.db_hits += 1
+        result = {
+            "sentiment": entry["sentiment"],
+            "confidence": entry["confidence"],
+            "reasoning": entry["reasoning"],
+            "success": True,
+            "error": "",
+        }
+        if entry["source"] == "llm":
+            result["source"] = "llm"
+        self.memory.set(key, result)
+        return dict(result)
+
+    def set(self, key: str, result: dict, version: str = ""):
+        self.memory.set(key, dict(result))
+        if not self.persistent:
+            return
+
+        try:
+            from django.utils import timezone
+            from .models import SentimentCacheEntry
+
+            SentimentCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    "analyzer_version": version,
+                    "source": result.get("source", "rules"),
+                    "sentiment": result["sentiment"],
+                    "confidence": result["confidence"],
+                    "reasoning": result.get("reasoning", ""),
+                    "created_at": timezone.now(),
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Sentiment cache DB write failed: {e}")
+            return
+
+        self.db_writes += 1
+        if self.purge_every and self.db_writes % self.purge_every == 0:
+            self.purge(keep_version=version)
+
+    def purge(self, keep_version: str = None) -> int:
+        """Delete expired DB rows, and rows of any version but ``keep_version`` (if given)"""
+        try:
+            from django.db.models import Q
+            from django.utils import timezone
+            from .models import SentimentCacheEntry
+
+            stale = Q(created_at__lt=timezone.now() - timedelta(seconds=self.ttl))
+            if keep_version:
+                stale |= ~Q(analyzer_version=keep_version)
+            deleted, _ = SentimentCacheEntry.objects.filter(stale).delete()
+        except Exception as e:
+            logger.warning(f"Sentiment cache DB purge failed: {e}")
+            return 0
+        self.db_purged += deleted
+        return deleted
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "persistent": self.persistent,
+            "db_hits": self.db_hits,
+            "db_misses": self.db_misses,
+            "db_purged": self.db_purged,
+        }
@@ -0,0 +1,182 @@
+# main/core/catalog.py - PRODUCT CATALOG CACHE
+"""
+Response bodies for GET /api/products/, built once per category and kept in
+process memory.
+
+A cached page holds the serialized JSON plus its gzip encoding (and brotli,
+when the optional ``brotli`` package is installed). A hit therefore runs no
+query, no serialization and no compression. Each encoding has its own
+strong ETag, since a strong validator names exact bytes.
+
+Saving or deleting a Product clears this process's cache right away and
+again on commit. Other workers see the change when their entries expire
+(``PRODUCT_CATALOG["CACHE_TTL"]``). Queryset ``update()``/``delete()`` send
+no signals, so call ``invalidate()`` after those.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .cache import LRUCache, get_setting
+from .models import Product
+from . import metrics
+
+DEFAULTS = {
+    "CACHE_TTL": 300,
+    "MAX_AGE": 60,
+    "MIN_COMPRESS_BYTES": 512,
+}
+
+CATEGORIES = frozenset(value for value, _ in Product.CATEGORY_CHOICES)
+FIELDS = ('id', 'name', 'category', 'price', 'description', 'icon', 'color', 'tag')
+
+# Server preference when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+
+def catalog_setting(name: str):
+    config = get_setting("PRODUCT_CATALOG", {}) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+class CatalogPage:
+    """One category's response body in every available encoding"""
+
+    __slots__ = ("count", "bodies", "etags")
+
+    def __init__(self, body: bytes, count: int, min_compress: int = 512):
+        self.count = count
+        self.bodies = {"identity": body}
+        if len(body) >= min_compress:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def negotiate(self, accept_encoding: str) -> str:
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+def accepted_encodings(header: str) -> set:
+    """Content codings the client accepts (``q=0`` means refused)"""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+_pages = None
+_pages_lock = threading.Lock()
+# Bumped by invalidate(); a page built from rows read before a bump is not cached
+_generation = 0
+
+
+def get_cache() -> LRUCache:
+    global _pages
+    if _pages is None:
+        with _pages_lock:
+            if _pages is None:
+                _pages = LRUCache(max_entries=len(CATEGORIES) + 1, ttl=catalog_setting("CACHE_TTL"))
+                metrics.register("product_catalog", _pages.stats)
+    return _pages
+
+
+def build_page(category: str = "") -> CatalogPage:
+    products = Product.objects.filter(is_active=True)
+    if category:
+        products = products.filter(category=category)
+    rows = list(products.order_by('sort_order', 'id').values(*FIELDS))
+    body = json.dumps(
+        {"category": category or "all", "count": len(rows), "products": rows},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    return CatalogPage(body, len(rows), catalog_setting("MIN_COMPRESS_BYTES"))
+
+
+def get_page(category: str = "") -> CatalogPage:
+    """Cached page for ``category`` ("" = every category)"""
+    cache = get_cache()
+    key = category or "all"
+    page = cache.get(key)
+    if page is None:
+        generation = _generation
+        page = build_page(category)
+        if generation == _generation:
+            cache.set(key, page)
+    return page
+
+
+def invalidate():
+    global _generation
+    with _pages_lock:
+        _generation += 1
+    get_cache().clear()
+
+
+@receiver((post_save, post_delete), sender=Product, dispatch_uid="core.catalog.invalidate")
+def _product_changed(**kwargs):
+    invalidate()
+    # A concurrent request may have re-cached the old rows before the commit
+    transaction.on_commit(invalidate)
+
+
+def page_response(request, page: CatalogPage) -> HttpResponse:
+    """The page in the best encoding the client accepts, or a 304 if its ETag is current"""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        # If-None-Match uses the weak comparison, so W/"x" matches "x"
+        client_etags = {etag.removeprefix("W/") for etag in parse_etags(if_none_match)}
+        for etag in page.etags.values():
+            if etag in client_etags or "*" in client_etags:
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return _cache_headers(response)
+
+    encoding = page.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    response = HttpResponse(page.bodies[encoding], content_type="application/json; charset=utf-8")
+    response["ETag"] = page.etags[encoding]
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    response["Content-Length"] = str(len(page.bodies[encoding]))
+    return _cache_headers(response)
+
+
+def _cache_headers(response):
+    # Public data: shared caches may keep it, keyed by encoding
+    patch_cache_control(response, public=True, max_age=catalog_setting("MAX_AGE"))
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
@@ -0,0 +1,353 @@
+# main/core/events.py - FEEDBACK ANALYSIS EVENTS (SSE PUB/SUB)
+"""
+Pushes "your feedback was analyzed" events to GET /api/feedback/events/.
+
+Writers call ``publish_results()`` / ``publish_errors()`` from
+``core.rollups``, the one place every sentiment result is saved. The
+broker that carries the events comes from ``FEEDBACK_EVENTS["BROKER"]``:
+
+- ``inprocess`` (default): events reach streams served by the same
+  process. That is enough when analysis runs on the web workers' own pool
+  or event loop (SENTIMENT_QUEUE_BACKEND = "thread").
+- ``postgres``: events go out as ``NOTIFY`` inside the writer's
+  transaction, so they are only sent if it commits. Every web process
+  runs one ``LISTEN`` thread and fans them out to its local streams. That
+  covers several gunicorn workers and separate run_sentiment_worker
+  processes.
+
+An event's id is the (analyzed_at, id) cursor of its feedback. A client
+that reconnects with ``Last-Event-ID`` gets everything analyzed after it
+replayed from the database, whatever the broker missed in between.
+Failures (ERROR rows have no analyzed_at) are only sent live.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+from django.db import connections, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import BaseRenderer
+
+from .cache import get_setting
+from .models import Feedback
+from .pagination import decode_cursor, encode_cursor
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BROKER": "inprocess",
+    "HEARTBEAT_SECONDS": 15,
+    # Streams end after this long and the browser reconnects with Last-Event-ID
+    "MAX_STREAM_SECONDS": 300,
+    "RETRY_MS": 3000,
+    "QUEUE_SIZE": 100,
+    "REPLAY_LIMIT": 500,
+}
+
+CHANNEL = "feedback_events"
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_CHUNK = 40
+
+
+def events_setting(name: str):
+    config = get_setting("FEEDBACK_EVENTS", {}) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+def result_event(feedback_id: int, analyzed_at, state: str = "ANALYZED") -> dict:
+    return {
+        "id": encode_cursor(analyzed_at, feedback_id) if analyzed_at else None,
+        "feedback": feedback_id,
+        "state": state,
+        "analyzed_at": analyzed_at.isoformat() if analyzed_at else None,
+    }
+
+
+class Subscription:
+    """One stream's inbox; ``loop`` set = consumed by a coroutine, else by a (sync) thread"""
+
+    def __init__(self, user_id, loop=None, maxsize: int = 100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize) if loop else queue.Queue(maxsize)
+        # Events were dropped: the stream should end so the client resyncs via Last-Event-ID
+        self.overflowed = False
+
+    def put(self, event: dict):
+        if self.loop is None:
+            self._put(event)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Loop already closed; the stream is gone
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            self.overflowed = True
+            metrics.incr("feedback_events.dropped")
+
+    def get(self, timeout: float):
+        """Next event, or None after ``timeout`` seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Fan-out to this process's subscribers, after the publishing transaction commits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id, loop=None) -> Subscription:
+        subscription = Subscription(user_id, loop, maxsize=events_setting("QUEUE_SIZE"))
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, events_by_user: Dict[int, List[dict]]):
+        transaction.on_commit(lambda: self.deliver(events_by_user))
+
+    def deliver(self, events_by_user: Dict[int, List[dict]]):
+        with self._lock:
+            targets = {user_id: list(self._subscribers.get(user_id, ())) for user_id in events_by_user}
+        for user_id, events in events_by_user.items():
+            for subscription in targets[user_id]:
+                for event in events:
+                    subscription.put(event)
+        metrics.incr("feedback_events.published", sum(len(events) for events in events_by_user.values()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "broker": type(self).__name__,
+                "users": len(self._subscribers),
+                "streams": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            }
+
+
+class PostgresBroker(InProcessBroker):
+    """NOTIFY on publish; one LISTEN thread per process delivers to the local subscribers"""
+
+    def __init__(self, alias: str = "default"):
+        super().__init__()
+        self.alias = alias
+        self._listener_pid = None
+
+    def publish(self, events_by_user: Dict[int, List[dict]]):
+        # Transactional: NOTIFY is sent on commit and dropped on rollback
+        with connections[self.alias].cursor() as cursor:
+            for user_id, events in events_by_user.items():
+                for start in range(0, len(events), NOTIFY_CHUNK):
+                    payload = json.dumps({"user": user_id, "events": events[start:start + NOTIFY_CHUNK]})
+                    cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+
+    def subscribe(self, user_id, loop=None) -> Subscription:
+        self._ensure_listening()
+        return super().subscribe(user_id, loop)
+
+    def _ensure_listening(self):
+        # Threads don't survive fork: start lazily in whichever process serves streams
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            threading.Thread(target=self._listen, name="feedback-events-listener", daemon=True).start()
+            self._listener_pid = os.getpid()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                self._listen_once()
+            except Exception as e:
+                logger.warning(f"Feedback events LISTEN failed, retrying in {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _listen_once(self):
+        # A dedicated connection outside Django's pool: it sits in LISTEN for the process lifetime
+        db = connections[self.alias]
+        raw = db.Database.connect(**db.get_connection_params())
+        raw.autocommit = True
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            while True:
+                if select.select([raw], [], [], 30) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    message = json.loads(raw.notifies.pop(0).payload)
+                    self.deliver({message["user"]: message["events"]})
+        finally:
+            raw.close()
+
+
+BROKERS = {
+    "inprocess": InProcessBroker,
+    "postgres": PostgresBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                name = events_setting("BROKER")
+                if name not in BROKERS:
+                    raise ValueError(f"FEEDBACK_EVENTS BROKER must be one of {sorted(BROKERS)}, got {name!r}")
+                _broker = BROKERS[name]()
+                metrics.register("feedback_events", _broker.stats)
+    return _broker
+
+
+def publish_results(rows: Iterable[tuple]):
+    """``rows``: (feedback_id, user_id, analyzed_at) of freshly saved results; call inside the writer's transaction"""
+    events_by_user = defaultdict(list)
+    for feedback_id, user_id, analyzed_at in rows:
+        events_by_user[user_id].append(result_event(feedback_id, analyzed_at))
+    if events_by_user:
+        get_broker().publish(dict(events_by_user))
+
+
+def publish_errors(rows: Iterable[tuple]):
+    """``rows``: (feedback_id, user_id) of feedback marked ERROR"""
+    events_by_user = defaultdict(list)
+    for feedback_id, user_id in rows:
+        events_by_user[user_id].append(result_event(feedback_id, None, state="ERROR"))
+    if events_by_user:
+        get_broker().publish(dict(events_by_user))
+
+
+def parse_last_event_id(value: str):
+    """(analyzed_at, id) from a Last-Event-ID header, or None if absent or not one of ours"""
+    if not value:
+        return None
+    try:
+        return decode_cursor(value)
+    except NotFound:
+        return None
+
+
+def replay_after(user_id, after) -> List[dict]:
+    """Results analyzed after the ``after`` cursor (oldest first, at most REPLAY_LIMIT)"""
+    analyzed_at, pk = after
+    rows = (
+        Feedback.objects.filter(user_id=user_id, sentiment__in=('POSITIVE', 'NEGATIVE', 'NEUTRAL'))
+        .filter(Q(analyzed_at__gt=analyzed_at) | Q(analyzed_at=analyzed_at, id__gt=pk))
+        .order_by('analyzed_at', 'id')
+        .values_list('id', 'analyzed_at')[:events_setting("REPLAY_LIMIT")]
+    )
+    return [result_event(feedback_id, at) for feedback_id, at in rows]
+
+
+def format_event(event: dict) -> str:
+    lines = [f"id: {event['id']}"] if event.get("id") else []
+    lines += ["event: sentiment", f"data: {json.dumps(event)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _is_newer(event: dict, after) -> bool:
+    if after is None or not event.get("id"):
+        return True
+    return decode_cursor(event["id"]) > after
+
+
+def stream(user_id, after=None):
+    """
+    SSE body for sync (WSGI) servers; ``after`` is parse_last_event_id().
+    Each open stream holds a worker, so MAX_STREAM_SECONDS must stay under
+    the gunicorn timeout.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f"retry: {events_setting('RETRY_MS')}\n\n"
+        if after:
+            # Subscribed first, so nothing committed during the replay is missed
+            for event in replay_after(user_id, after):
+                yield format_event(event)
+        deadline = time.monotonic() + events_setting("MAX_STREAM_SECONDS")
+        while time.monotonic() < deadline and not subscription.overflowed:
+            event = subscription.get(timeout=min(events_setting("HEARTBEAT_SECONDS"), deadline - time.monotonic()))
+            if event is None:
+                yield ": heartbeat\n\n"
+            elif _is_newer(event, after):
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def astream(user_id, after=None):
+    """stream() for ASGI servers: an open stream is a coroutine, not a worker"""
+    broker = get_broker()
+    subscription = broker.subscribe(user_id, loop=asyncio.get_running_loop())
+    try:
+        yield f"retry: {events_setting('RETRY_MS')}\n\n"
+        if after:
+            for event in await sync_to_async(replay_after)(user_id, after):
+                yield format_event(event)
+        deadline = time.monotonic() + events_setting("MAX_STREAM_SECONDS")
+        while time.monotonic() < deadline and not subscription.overflowed:
+            event = await subscription.aget(timeout=min(events_setting("HEARTBEAT_SECONDS"),
+                                                        deadline - time.monotonic()))
+            if event is None:
+                yield ": heartbeat\n\n"
+            elif _is_newer(event, after):
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF accept ``Accept: text/event-stream``; only error bodies go through it"""
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode("utf-8") if data is not None else b""
+
+
+def event_stream_response(body) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx (and Render's proxy) would otherwise buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,100 @@
+# main/core/feedback_cache.py - PER-USER FEEDBACK LIST CACHE
+"""
+Cached pages of GET /api/feedback/, so a repeat poll runs no query and no
+serializer.
+
+Every user has a generation counter in the cache, and page keys include
+it. Anything that changes what a user's list shows bumps the counter:
+- saving or deleting feedback (signals)
+- bulk creating feedback (``FeedbackBulkView``)
+- saving a sentiment result (``core.rollups``, which uses bulk_update)
+
+Old pages are never read again and expire on their own. A change bumps the
+counter right away and again after commit, so a reader that cached
+pre-commit rows under the new generation is superseded.
+
+Uses the ``default`` alias from CACHES (locmem unless configured). Only a
+shared backend (file, Redis) lets a bump in one worker reach the others.
+Otherwise a worker can serve its own stale page for up to
+``FEEDBACK_LIST_CACHE_TTL`` seconds.
+"""
+import hashlib
+import logging
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import get_setting
+from .models import Feedback
+
+logger = logging.getLogger(__name__)
+
+
+def list_ttl() -> int:
+    return get_setting("FEEDBACK_LIST_CACHE_TTL", 300)
+
+
+def _generation_key(user_id) -> str:
+    return f"feedback:gen:{user_id}"
+
+
+def generation(user_id) -> int:
+    key = _generation_key(user_id)
+    value = cache.get(key)
+    if value is None:
+        # Start from the clock, not 1: if the counter was evicted, pages cached
+        # under its old values must not become readable again
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump(user_ids: Iterable[int]):
+    for user_id in set(user_ids):
+        key = _generation_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Missing counter: nothing can be cached under it yet
+            cache.add(key, time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"Feedback list cache bump failed for user {user_id}: {e}")
+
+
+def invalidate(user_ids: Iterable[int]):
+    """Bump now and again on commit: a reader may re-cache pre-commit rows in between"""
+    user_ids = set(user_ids)
+    if user_ids:
+        bump(user_ids)
+        transaction.on_commit(lambda: bump(user_ids))
+
+
+def page_key(user_id, url: str) -> str:
+    # The URL carries cursor/page_size, and the host the next/previous links are built on
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return f"feedback:list:{user_id}:{generation(user_id)}:{digest}"
+
+
+def get_page(key: str):
+    """(data, last_modified) or None"""
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Feedback list cache read failed: {e}")
+        return None
+
+
+def set_page(key: str, data, last_modified):
+    try:
+        cache.set(key, (data, last_modified), list_ttl())
+    except Exception as e:
+        logger.warning(f"Feedback list cache write failed: {e}")
+
+
+@receiver((post_save, post_delete), sender=Feedback, dispatch_uid="core.feedback_cache.feedback_changed")
+def _feedback_changed(instance, **kwargs):
+    invalidate([instance.user_id])
@@ -0,0 +1,135 @@
+# main/core/jobs.py - DURABLE SENTIMENT JOB QUEUE
+"""
+Database-backed analysis jobs.
+
+Jobs are SentimentJob rows written in the same transaction as the feedback
+they analyze. Workers (``manage.py run_sentiment_worker``) claim batches under
+a lease: on Postgres with ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent
+workers never block on each other, elsewhere (SQLite) with a compare-and-set
+UPDATE per row. A job whose lease runs out (worker crashed or was killed
+mid-batch) goes back to QUEUED; failures are retried with exponential backoff
+until ``MAX_ATTEMPTS``, after which the feedback is marked ERROR.
+"""
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Feedback, SentimentJob
+
+DEFAULTS = {
+    "MAX_ATTEMPTS": 5,
+    "LEASE_SECONDS": 300,
+    "BACKOFF_SECONDS": 10,
+    "MAX_BACKOFF_SECONDS": 3600,
+}
+
+
+def job_setting(name: str):
+    return getattr(settings, "SENTIMENT_JOBS", {}).get(name, DEFAULTS[name])
+
+
+def enqueue_sentiment_jobs(feedback_ids: Iterable[int]) -> List[SentimentJob]:
+    """Create QUEUED jobs; they become visible to workers when the caller's transaction commits"""
+    return SentimentJob.objects.bulk_create(
+        [SentimentJob(feedback_id=feedback_id) for feedback_id in feedback_ids]
+    )
+
+
+def enqueue_pending_feedback() -> int:
+    """Queue every PENDING feedback that has no live job (e.g. left over from the thread pool)"""
+    live = SentimentJob.objects.filter(status__in=['QUEUED', 'RUNNING']).values('feedback_id')
+    ids = list(
+        Feedback.objects.filter(sentiment='PENDING')
+        .exclude(id__in=live)
+        .values_list('id', flat=True)
+    )
+    with transaction.atomic():
+        enqueue_sentiment_jobs(ids)
+    return len(ids)
+
+
+def requeue_expired_jobs() -> int:
+    """Put RUNNING jobs whose lease has run out back in the queue (or fail them if out of attempts)"""
+    now = timezone.now()
+    expired = SentimentJob.objects.filter(status='RUNNING', lease_expires_at__lt=now)
+    failed = expired.filter(attempts__gte=job_setting("MAX_ATTEMPTS"))
+    for job in failed.only('id', 'feedback_id'):
+        fail_job(job, "Lease expired on final attempt")
+    return expired.update(
+        status='QUEUED', run_after=now, lease_expires_at=None, locked_by='',
+        last_error="Lease expired", updated_at=now,
+    )
+
+
+def claim_jobs(worker_id: str, batch_size: int, lease_seconds: int = None) -> List[SentimentJob]:
+    """Claim up to ``batch_size`` due jobs for ``worker_id`` and return them with their feedback"""
+    now = timezone.now()
+    lease_expires_at = now + timedelta(seconds=lease_seconds or job_setting("LEASE_SECONDS"))
+    due = SentimentJob.objects.filter(status='QUEUED', run_after__lte=now).order_by('run_after', 'id')
+    claim = dict(
+        status='RUNNING', attempts=F('attempts') + 1, lease_expires_at=lease_expires_at,
+        locked_by=worker_id, updated_at=now,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            SentimentJob.objects.filter(id__in=ids).update(**claim)
+    else:
+        # No row locks: only the worker whose UPDATE still sees QUEUED wins the row
+        ids = []
+        for job_id in due.values_list('id', flat=True)[:batch_size * 2]:
+            if len(ids) >= batch_size:
+                break
+            if SentimentJob.objects.filter(id=job_id, status='QUEUED').update(**claim):
+                ids.append(job_id)
+
+    return list(
+        SentimentJob.objects.filter(id__in=ids, locked_by=worker_id, status='RUNNING')
+        .select_related('feedback')
+        .order_by('id')
+    )
+
+
+def complete_job(job: SentimentJob):
+    SentimentJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status='DONE', lease_expires_at=None, last_error='', updated_at=timezone.now(),
+    )
+
+
+def fail_job(job: SentimentJob, error) -> bool:
+    """Record a failed attempt; returns True if the job will be retried"""
+    from .tasks import mark_analysis_failed
+
+    now = timezone.now()
+    attempts = SentimentJob.objects.filter(id=job.id).values_list('attempts', flat=True).first() or 0
+    if attempts < job_setting("MAX_ATTEMPTS"):
+        backoff = min(
+            job_setting("BACKOFF_SECONDS") * 2 ** max(attempts - 1, 0),
+            job_setting("MAX_BACKOFF_SECONDS"),
+        )
+        SentimentJob.objects.filter(id=job.id).update(
+            status='QUEUED', run_after=now + timedelta(seconds=backoff), lease_expires_at=None,
+            locked_by='', last_error=str(error)[:1000], updated_at=now,
+        )
+        return True
+
+    SentimentJob.objects.filter(id=job.id).update(
+        status='FAILED', lease_expires_at=None, last_error=str(error)[:1000], updated_at=now,
+    )
+    mark_analysis_failed(job.feedback_id, error)
+    return False
+
+
+def release_jobs(jobs: Iterable[SentimentJob]):
+    """Hand claimed-but-unprocessed jobs back to the queue (graceful worker shutdown)"""
+    SentimentJob.objects.filter(
+        id__in=[job.id for job in jobs], status='RUNNING',
+    ).update(
+        status='QUEUED', attempts=F('attempts') - 1, lease_expires_at=None, locked_by='',
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,473 @@
+# main/core/llm.py - SHARED, CONNECTION-POOLED OPENROUTER CLIENTS
+"""
+One long-lived OpenAI-compatible client per process (sync) and per event loop
+(async), each on an httpx pool with keep-alive, so LLM calls reuse warm TLS
+connections instead of handshaking for every feedback. A semaphore caps the
+number of requests in flight.
+
+``LLMBatcher`` packs feedbacks that arrive close together into one numbered
+prompt, so the instructions are paid for once per batch instead of once per
+row.
+
+Settings (``LLM_CLIENT``): BASE_URL, TIMEOUT, CONNECT_TIMEOUT,
+MAX_CONNECTIONS, MAX_KEEPALIVE, CONCURRENCY, MAX_RETRIES.
+Settings (``LLM_BATCH``): MAX_ITEMS, MAX_WAIT_MS, TOKENS_PER_ITEM.
+Settings (``LLM_RESILIENCE``): DEADLINE_SECONDS, HEDGE, HEDGE_PERCENTILE,
+HEDGE_MIN_DELAY_MS, BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Callable, Dict, List, Optional
+
+from . import metrics
+from .cache import get_setting
+from .resilience import CircuitBreaker, Guard
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("POSITIVE", "NEGATIVE", "NEUTRAL")
+
+DEFAULTS = {
+    "BASE_URL": os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    "TIMEOUT": 30.0,
+    "CONNECT_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 20,
+    "MAX_KEEPALIVE": 10,
+    "CONCURRENCY": 8,
+    "MAX_RETRIES": 1,
+}
+
+BATCH_DEFAULTS = {
+    "MAX_ITEMS": 10,
+    "MAX_WAIT_MS": 50,
+    "TOKENS_PER_ITEM": 80,
+}
+
+RESILIENCE_DEFAULTS = {
+    "DEADLINE_SECONDS": 8.0,
+    "HEDGE": "off",
+    "HEDGE_PERCENTILE": 95,
+    "HEDGE_MIN_DELAY_MS": 200,
+    "BREAKER_FAILURES": 5,
+    "BREAKER_COOLDOWN_SECONDS": 30,
+}
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_semaphore = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def llm_setting(name: str):
+    return get_setting("LLM_CLIENT", {}).get(name, DEFAULTS[name])
+
+
+def batch_setting(name: str):
+    return get_setting("LLM_BATCH", {}).get(name, BATCH_DEFAULTS[name])
+
+
+def resilience_setting(name: str):
+    return get_setting("LLM_RESILIENCE", {}).get(name, RESILIENCE_DEFAULTS[name])
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "llm",
+        failure_threshold=resilience_setting("BREAKER_FAILURES"),
+        cooldown=resilience_setting("BREAKER_COOLDOWN_SECONDS"),
+    )
+
+
+def make_guard(name: str, breaker: CircuitBreaker) -> Guard:
+    return Guard(
+        name, breaker,
+        deadline=resilience_setting("DEADLINE_SECONDS"),
+        hedge=resilience_setting("HEDGE"),
+        hedge_percentile=resilience_setting("HEDGE_PERCENTILE"),
+        hedge_min_delay=resilience_setting("HEDGE_MIN_DELAY_MS") / 1000,
+        # Room for a hedge per in-flight call
+        threads=llm_setting("CONCURRENCY") * 2,
+    )
+
+
+def _http_options():
+    import httpx
+
+    return dict(
+        timeout=httpx.Timeout(llm_setting("TIMEOUT"), connect=llm_setting("CONNECT_TIMEOUT")),
+        limits=httpx.Limits(
+            max_connections=llm_setting("MAX_CONNECTIONS"),
+            max_keepalive_connections=llm_setting("MAX_KEEPALIVE"),
+        ),
+    )
+
+
+def get_llm_client():
+    """The process-wide sync client (rebuilt after a fork: sockets can't be shared across processes)"""
+    global _client, _client_pid, _semaphore
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                import httpx
+                from openai import OpenAI
+
+                _client = OpenAI(
+                    api_key=os.getenv("OPENROUTER_API_KEY"),
+                    base_url=llm_setting("BASE_URL"),
+                    max_retries=llm_setting("MAX_RETRIES"),
+                    http_client=httpx.Client(**_http_options()),
+                )
+                _semaphore = threading.BoundedSemaphore(llm_setting("CONCURRENCY"))
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_llm_client():
+    """
+    The async client and semaphore for the running event loop.
+
+    httpx async pools are bound to the loop that opened them, so each loop gets
+    its own; they are dropped with the loop.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENROUTER_API_KEY"),
+            base_url=llm_setting("BASE_URL"),
+            max_retries=llm_setting("MAX_RETRIES"),
+            http_client=httpx.AsyncClient(**_http_options()),
+        )
+        entry = _async_clients[loop] = (client, asyncio.Semaphore(llm_setting("CONCURRENCY")))
+    return entry
+
+
+def reset_llm_clients():
+    """Forget the shared clients (settings changed, tests)"""
+    global _client, _client_pid
+    with _lock:
+        _client = None
+        _client_pid = None
+        _async_clients.clear()
+
+
+def build_prompt(feedback_text: str) -> str:
+    return f"""Analyze this feedback sentiment:
+
+"{feedback_text}"
+
+Return ONLY a JSON object with this exact format:
+{{
+    "sentiment": "POSITIVE", "NEGATIVE", or "NEUTRAL",
+    "confidence": 0.0 to 1.0,
+    "reasoning": "Brief explanation"
+}}"""
+
+
+def parse_reply(content: str) -> Dict:
+    """Turn the model's reply into an analysis result; raises ValueError if it isn't usable"""
+    content = content.strip()
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        content = json_match.group(0)
+
+    return _to_result(json.loads(content))
+
+
+def _to_result(verdict: dict) -> Dict:
+    return {
+        "sentiment": verdict.get("sentiment", "NEUTRAL").upper(),
+        "confidence": min(1.0, max(0.0, float(verdict.get("confidence", 0.5)))),
+        "reasoning": verdict.get("reasoning", "LLM analysis"),
+        "success": True,
+        "source": "llm",
+    }
+
+
+def build_batch_prompt(texts: List[str]) -> str:
+    numbered = "\n".join(f"{i}. {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(texts, 1))
+    return f"""Analyze the sentiment of each numbered feedback:
+
+{numbered}
+
+Return ONLY a JSON array with one object per feedback, in the same order:
+[
+    {{"id": 1, "sentiment": "POSITIVE", "NEGATIVE", or "NEUTRAL", "confidence": 0.0 to 1.0, "reasoning": "Brief explanation"}}
+]"""
+
+
+def parse_batch_reply(content: str, count: int) -> List[Optional[Dict]]:
+    """
+    Map a batch reply back to its feedbacks.
+
+    Returns one result per feedback, or None where the answer is missing,
+    duplicated or malformed; a reply that isn't a JSON array is all None.
+    """
+    results = [None] * count
+    array_match = re.search(r'\[.*\]', content, re.DOTALL)
+    try:
+        verdicts = json.loads(array_match.group(0) if array_match else content)
+    except ValueError:
+        return results
+    if not isinstance(verdicts, list):
+        return results
+
+    for position, verdict in enumerate(verdicts):
+        if not isinstance(verdict, dict):
+            continue
+        try:
+            index = int(verdict.get("id", position + 1)) - 1
+            result = _to_result(verdict)
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if 0 <= index < count and results[index] is None and result["sentiment"] in SENTIMENTS:
+            results[index] = result
+    return results
+
+
+def _request(model: str, feedback_text: str, timeout: float = None) -> Dict:
+    request = dict(
+        model=model,
+        messages=[{"role": "user", "content": build_prompt(feedback_text)}],
+        temperature=0.1,
+        max_tokens=200,
+    )
+    if timeout is not None:
+        # Abandoned (timed-out or out-hedged) requests shouldn't outlive the budget by much
+        request["timeout"] = timeout
+    return request
+
+
+def complete(model: str, feedback_text: str, timeout: float = None) -> Dict:
+    """Blocking LLM verdict over the shared client"""
+    client = get_llm_client()
+    with _semaphore:
+        response = client.chat.completions.create(**_request(model, feedback_text, timeout))
+    return parse_reply(response.choices[0].message.content)
+
+
+def complete_many(model: str, texts: List[str], timeout: float = None) -> List[Optional[Dict]]:
+    """One request for several feedbacks; None marks the ones the reply didn't answer usably"""
+    client = get_llm_client()
+    request = dict(
+        model=model,
+        messages=[{"role": "user", "content": build_batch_prompt(texts)}],
+        temperature=0.1,
+        max_tokens=batch_setting("TOKENS_PER_ITEM") * len(texts) + 50,
+    )
+    if timeout is not None:
+        request["timeout"] = timeout
+    with _semaphore:
+        response = client.chat.completions.create(**request)
+    return parse_batch_reply(response.choices[0].message.content or "", len(texts))
+
+
+async def complete_async(model: str, feedback_text: str, timeout: float = None) -> Dict:
+    """Non-blocking LLM verdict; at most CONCURRENCY requests in flight per loop"""
+    client, semaphore = get_async_llm_client()
+    async with semaphore:
+        response = await client.chat.completions.create(**_request(model, feedback_text, timeout))
+    return parse_reply(response.choices[0].message.content)
+
+
+class LLMBatcher:
+    """
+    Micro-batcher in front of the LLM.
+
+    ``analyze()`` queues a feedback and waits; a collector thread ships what
+    has queued up once ``max_items`` are waiting or ``max_wait`` seconds after
+    the first one arrived, as one ``complete_many()`` request. Items the reply
+    doesn't answer (malformed or partial JSON, request error) go to
+    ``fallback`` concurrently, so a bad batch never fails its neighbours.
+
+    With a ``guard``, its deadline bounds the whole batch, fallbacks included:
+    items still unanswered when it passes get ``rules`` (default: ``fallback``)
+    instead, and ``analyze()`` stops waiting after ``max_wait`` plus the deadline.
+    """
+
+    def __init__(self, model: str, fallback: Callable[[str], Dict], max_items: int = 10,
+                 max_wait: float = 0.05, concurrency: int = 4, guard: Guard = None,
+                 rules: Callable[[str], Dict] = None):
+        self.model = model
+        self.fallback = fallback
+        self.rules = rules or fallback
+        self.guard = guard
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._executor = None
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+        self.late = 0
+
+    @classmethod
+    def from_settings(cls, model: str, fallback: Callable[[str], Dict], guard: Guard = None,
+                      rules: Callable[[str], Dict] = None) -> "LLMBatcher":
+        return cls(
+            model, fallback,
+            max_items=batch_setting("MAX_ITEMS"),
+            max_wait=batch_setting("MAX_WAIT_MS") / 1000,
+            concurrency=llm_setting("CONCURRENCY"),
+            guard=guard,
+            rules=rules,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 1
+
+    def _ensure_started(self):
+        # Threads don't survive fork: (re)start lazily in whichever process submits
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm-batch")
+            threading.Thread(target=self._collect, name="llm-batcher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def analyze(self, text: str) -> Dict:
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts: List[str]) -> List[Dict]:
+        """Queue ``texts`` alongside other callers' (they share prompts) and wait for all of them"""
+        futures = [self.submit(text) for text in texts]
+        deadline = None if self.guard is None else time.monotonic() + self.max_wait + self.guard.deadline
+        results = []
+        for text, future in zip(texts, futures):
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results.append(future.result(timeout=timeout))
+            except FutureTimeout:
+                # Queued behind busy batches past the budget: answer now, drop the late reply
+                with self._lock:
+                    self.late += 1
+                metrics.incr("llm_batch.late")
+                results.append(self._answer(self.rules, text))
+        return results
+
+    def _collect(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._ship, batch)
+
+    def _ship(self, batch):
+        results = self.send([text for text, _ in batch])
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def send(self, texts: List[str]) -> List[Dict]:
+        """Analyze ``texts`` (at most max_items) with one request plus single-call fallbacks"""
+        started = time.monotonic()
+        try:
+            if len(texts) == 1:
+                results = [None]
+            elif self.guard is None:
+                results = complete_many(self.model, texts)
+            else:
+                # A "fallback" hedge would turn a slow batch into N single calls: only hedge with a re-send
+                results = self.guard.run(
+                    lambda: complete_many(self.model, texts, timeout=self.guard.deadline),
+                    lambda: [None] * len(texts),
+                    hedge="request" if self.guard.hedge == "request" else "off",
+                )
+        except Exception as e:
+            logger.error(f"LLM batch of {len(texts)} failed: {e}")
+            results = [None] * len(texts)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        with self._lock:
+            self.batches += 1
+            self.items += len(texts)
+            self.fallbacks += len(missing) if len(texts) > 1 else 0
+        metrics.incr("llm_batch.requests")
+        metrics.incr("llm_batch.items", len(texts))
+
+        if missing:
+            self._fall_back(texts, results, missing, started)
+        return results
+
+    def _fall_back(self, texts: List[str], results: List, missing: List[int], started: float):
+        """Fill ``results[i]`` for ``missing`` with concurrent fallbacks, then ``rules`` for the late ones"""
+        remaining = None if self.guard is None else started + self.guard.deadline - time.monotonic()
+        late = missing
+        if remaining is None or remaining > 0:
+            pool = ThreadPoolExecutor(max_workers=min(self.concurrency, len(missing)),
+                                      thread_name_prefix="llm-fallback")
+            futures = {pool.submit(self._answer, self.fallback, texts[i]): i for i in missing}
+            # Stragglers finish (within their own deadline) in the background; their answers are dropped
+            pool.shutdown(wait=False)
+            done, _ = wait(futures, timeout=remaining)
+            late = []
+            for future, i in futures.items():
+                if future in done:
+                    results[i] = future.result()
+                else:
+                    late.append(i)
+
+        if late:
+            with self._lock:
+                self.late += len(late)
+            metrics.incr("llm_batch.late", len(late))
+        for i in late:
+            results[i] = self._answer(self.rules, texts[i])
+
+    @staticmethod
+    def _answer(analyze: Callable[[str], Dict], text: str) -> Dict:
+        try:
+            return analyze(text)
+        except Exception as e:
+            logger.error(f"LLM fallback failed: {e}")
+            return {
+                "sentiment": "NEUTRAL",
+                "confidence": 0.5,
+                "reasoning": f"Analysis failed: {str(e)}",
+                "success": False,
+                "error": str(e),
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_items": self.max_items,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "fallbacks": self.fallbacks,
+                "late": self.late,
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+            }
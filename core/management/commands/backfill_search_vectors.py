@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+
+from core.models import Feedback
+from core.search import SEARCH_CONFIG
+
+
+class Command(BaseCommand):
+    help = "Fill Feedback.search_vector for rows written before the search trigger existed (Postgres)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Ids per UPDATE")
+        parser.add_argument("--all", action="store_true", help="Recompute every row, not just empty ones")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Full-text search vectors are only maintained on PostgreSQL")
+
+        bounds = Feedback.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds["low"] is None:
+            self.stdout.write(self.style.WARNING("⚠️ No feedback to backfill"))
+            return
+
+        # Short id-range UPDATEs: each commits on its own, so row locks are brief and progress is kept
+        step = options["batch_size"]
+        only_empty = "" if options["all"] else " AND search_vector IS NULL"
+        sql = (
+            f"UPDATE core_feedback SET search_vector = to_tsvector('{SEARCH_CONFIG}', message) "
+            f"WHERE id >= %s AND id < %s{only_empty}"
+        )
+        started = time.monotonic()
+        rows = 0
+        for low in range(bounds["low"], bounds["high"] + 1, step):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [low, low + step])
+                rows += cursor.rowcount
+            self.stdout.write(f"📊 ids < {low + step}: {rows} row(s) updated")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Backfilled {rows} search vector(s) in {time.monotonic() - started:.1f}s"
+        ))
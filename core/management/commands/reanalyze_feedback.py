@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.models import Feedback
+from core.tasks import save_analysis_results
+from core.utils import analyze_feedback_sentiment_batch, get_analyzer
+
+def filtered_feedback(filters: dict):
+    """Feedback matching the command's filters (rebuilt in every worker process)"""
+    queryset = Feedback.objects.all()
+    if filters["sentiment"]:
+        queryset = queryset.filter(sentiment__in=filters["sentiment"])
+    if filters["since"]:
+        queryset = queryset.filter(created_at__gte=_start_of_day(filters["since"]))
+    if filters["until"]:
+        queryset = queryset.filter(created_at__lt=_start_of_day(filters["until"]) + timedelta(days=1))
+    if filters["analyzer_version"] is not None:
+        queryset = queryset.filter(analyzer_version=filters["analyzer_version"])
+    if filters["outdated"]:
+        queryset = queryset.exclude(analyzer_version=get_analyzer().version)
+    return queryset
+
+
+def _start_of_day(value: str):
+    return timezone.make_aware(datetime.combine(parse_date(value), datetime.min.time()))
+
+
+def _init_worker(log_level):
+    import django
+    from django.apps import apps
+
+    # Forked workers inherit loaded apps; spawned ones (macOS/Windows) need setup
+    if not apps.ready:
+        django.setup()
+    logging.getLogger("core.utils").setLevel(log_level)
+    connections.close_all()
+
+
+def reanalyze_range(filters: dict, low: int, high: int, chunk_size: int, batch_size: int) -> tuple:
+    """Re-analyze matching feedback with low <= id < high; returns (rows written, rows whose analysis failed)"""
+    rows = (
+        filtered_feedback(filters)
+        .filter(id__gte=low, id__lt=high)
+        .only('id', 'message')
+        .order_by('id')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    written = failed = 0
+    batch = []
+    for feedback in rows:
+        batch.append(feedback)
+        if len(batch) >= batch_size:
+            failed += _write_batch(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        failed += _write_batch(batch)
+        written += len(batch)
+    return written - failed, failed
+
+
+def _write_batch(batch) -> int:
+    results = analyze_feedback_sentiment_batch([feedback.message for feedback in batch])
+    # Moves each row from its old rollup bucket to the new one; failed rows keep their verdict
+    return save_analysis_results(batch, results)
+
+
+class Command(BaseCommand):
+    help = "Re-run sentiment analysis over existing feedback in parallel, resumable from a checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sentiment", nargs="+", choices=[c[0] for c in Feedback.SENTIMENT_CHOICES],
+                            help="Only rows with these sentiments")
+        parser.add_argument("--since", help="Only rows created on or after this date (YYYY-MM-DD)")
+        parser.add_argument("--until", help="Only rows created on or before this date (YYYY-MM-DD)")
+        parser.add_argument("--analyzer-version", help="Only rows analyzed by this analyzer version")
+        parser.add_argument("--outdated", action="store_true",
+                            help="Only rows not analyzed by the current analyzer version")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+        parser.add_argument("--range-size", type=int, default=10000, help="Ids per unit of work")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per query")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk_update")
+        parser.add_argument("--checkpoint", default="reanalyze_feedback.checkpoint.json",
+                            help="Progress file used to resume an interrupted run")
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+        parser.add_argument("--dry-run", action="store_true", help="Only count matching rows")
+
+    def handle(self, *args, **options):
+        if options["verbosity"] < 2:
+            # Per-node INFO lines for every row would swamp the progress output
+            logging.getLogger("core.utils").setLevel(logging.WARNING)
+
+        for name in ("since", "until"):
+            if options[name] and not parse_date(options[name]):
+                raise CommandError(f"--{name} must be a date (YYYY-MM-DD)")
+
+        filters = {
+            "sentiment": sorted(options["sentiment"] or []),
+            "since": options["since"],
+            "until": options["until"],
+            "analyzer_version": options["analyzer_version"],
+            "outdated": options["outdated"],
+        }
+        queryset = filtered_feedback(filters)
+
+        if options["dry_run"]:
+            self.stdout.write(f"🔎 {queryset.count()} feedback(s) match")
+            return
+
+        bounds = queryset.aggregate(low=Min('id'), high=Max('id'))
+        if bounds["low"] is None:
+            self.stdout.write(self.style.WARNING("⚠️ No feedback matches these filters"))
+            return
+
+        # Ranges are aligned to multiples of the step so they stay identical across resumes
+        step = options["range_size"]
+        first = bounds["low"] // step * step
+        ranges = [(low, low + step) for low in range(first, bounds["high"] + 1, step)]
+
+        checkpoint = self.load_checkpoint(options["checkpoint"], filters, options["restart"])
+        done = {tuple(r) for r in checkpoint["done"]}
+        todo = [r for r in ranges if r not in done]
+        if done:
+            self.stdout.write(f"↩️ Resuming: {len(ranges) - len(todo)}/{len(ranges)} id ranges already done")
+
+        workers = options["workers"]
+        if connection.vendor == "sqlite" and workers > 1:
+            self.stdout.write(self.style.WARNING("⚠️ SQLite allows one writer at a time, using 1 worker"))
+            workers = 1
+
+        self.stdout.write(f"🚀 Re-analyzing {len(todo)} id range(s) with {workers} worker(s)")
+        args = (options["chunk_size"], options["batch_size"])
+        started = time.monotonic()
+        rows = 0
+        # Checkpoints from before failures were counted have no "failed"
+        checkpoint.setdefault("failed", 0)
+
+        def record(id_range, counts):
+            nonlocal rows
+            written, failed = counts
+            rows += written + failed
+            checkpoint["done"].append(list(id_range))
+            checkpoint["rows"] += written
+            checkpoint["failed"] += failed
+            self.save_checkpoint(options["checkpoint"], checkpoint)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"📊 {len(checkpoint['done'])}/{len(ranges)} ranges, {checkpoint['rows']} rows, "
+                f"{checkpoint['failed']} failed, {rows / elapsed if elapsed else 0:.0f} rows/s"
+            )
+
+        if workers == 1:
+            for id_range in todo:
+                record(id_range, reanalyze_range(filters, *id_range, *args))
+        else:
+            # Children must not share the parent's DB connection
+            connections.close_all()
+            log_level = logging.getLogger("core.utils").level
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(log_level,)) as pool:
+                futures = {pool.submit(reanalyze_range, filters, *id_range, *args): id_range
+                           for id_range in todo}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+
+        elapsed = time.monotonic() - started
+        if os.path.exists(options["checkpoint"]):
+            os.remove(options["checkpoint"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Re-analyzed {rows} feedback(s) in {elapsed:.1f}s "
+            f"({rows / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+        if checkpoint["failed"]:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ {checkpoint['failed']} analysis(es) failed; those rows kept their previous verdict "
+                f"(PENDING ones are now ERROR). Re-run the command to retry them."
+            ))
+
+    def load_checkpoint(self, path, filters, restart):
+        if restart or not os.path.exists(path):
+            return {"filters": filters, "done": [], "rows": 0, "failed": 0}
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("filters") != filters:
+            raise CommandError(f"Checkpoint {path} was written for different filters; use --restart")
+        return checkpoint
+
+    def save_checkpoint(self, path, checkpoint):
+        # Write-then-rename so an interrupt never leaves a truncated checkpoint
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, path)
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-day sentiment rollups from the Feedback table"
+
+    def handle(self, *args, **options):
+        # Writers that commit while this runs are overwritten: run it when analysis is quiet
+        self.stdout.write("🔄 Rebuilding sentiment rollups...")
+        started = time.monotonic()
+        rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {rows} rollup row(s) in {time.monotonic() - started:.1f}s"
+        ))
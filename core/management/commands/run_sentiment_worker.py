@@ -0,0 +1,83 @@
+import os
+import signal
+import socket
+import time
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import (
+    claim_jobs, complete_job, enqueue_pending_feedback, fail_job,
+    release_jobs, requeue_expired_jobs,
+)
+from core.rollups import save_sentiment_results
+from core.tasks import SENTIMENT_FIELDS, apply_sentiment_result, failed_analysis
+from core.utils import analyze_feedback_sentiment_batch
+
+
+class Command(BaseCommand):
+    help = "Process durable sentiment analysis jobs (SENTIMENT_QUEUE_BACKEND=database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20, help="Jobs claimed per round trip")
+        parser.add_argument("--lease", type=int, default=None, help="Lease length in seconds")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Sleep when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Exit when no jobs are due")
+        parser.add_argument("--enqueue-pending", action="store_true",
+                            help="First queue PENDING feedback that has no job yet")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        if options["enqueue_pending"]:
+            count = enqueue_pending_feedback()
+            self.stdout.write(f"📥 Queued {count} pending feedback(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"🚀 Sentiment worker {worker_id} started"))
+        while not self.stopping:
+            close_old_connections()
+            requeued = requeue_expired_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"⚠️ Requeued {requeued} job(s) with expired leases"))
+
+            jobs = claim_jobs(worker_id, options["batch_size"], options["lease"])
+            if not jobs:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.process(jobs)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Sentiment worker {worker_id} stopped"))
+
+    def process(self, jobs):
+        # Score the whole claimed batch at once, then save row by row so one bad row can't fail the rest
+        results = analyze_feedback_sentiment_batch([job.feedback.message for job in jobs])
+        for index, (job, result) in enumerate(zip(jobs, results)):
+            if self.stopping:
+                release_jobs(jobs[index:])
+                return
+            try:
+                # The analyzer reports failures in the result (a NEUTRAL placeholder) instead of
+                # raising: retry those with backoff rather than saving the placeholder as the verdict
+                if failed_analysis(result):
+                    raise RuntimeError(failed_analysis(result))
+                apply_sentiment_result(job.feedback, result)
+                save_sentiment_results([job.feedback], SENTIMENT_FIELDS)
+                complete_job(job)
+            except Exception as e:
+                retry = fail_job(job, e)
+                self.stdout.write(self.style.ERROR(
+                    f"❌ Job {job.id} (feedback {job.feedback_id}) failed: {e}"
+                    + (" - will retry" if retry else " - giving up")
+                ))
+                self.stdout.write(traceback.format_exc())
+
+    def stop(self, signum, frame):
+        self.stdout.write(self.style.WARNING("⏹️ Stopping after the current job..."))
+        self.stopping = True
@@ -0,0 +1,120 @@
+# main/core/matcher.py - SINGLE-PASS LEXICON MATCHER
+"""
+One matcher for every lexicon entry the rule engine checks.
+
+The text is tokenized once with ``\\w+``. Each token is looked up in a hash
+table of keywords, and in a table of regex rules keyed on their leading
+literal word (``\\bnot\\s+...`` is only tried where the token ``not`` starts).
+Cost per analysis therefore depends on the text, not on the lexicon size.
+Rules without a usable leading word are searched the old way.
+
+``scan()`` returns every hit per group in lexicon order, so callers can keep
+the "first rule in the list wins" and summation-order semantics of the
+per-pattern ``re.search`` loops it replaces.
+"""
+import re
+from typing import Dict, List
+
+NEGATION = "negation"
+POSITIVE_PHRASE = "positive_phrase"
+NEGATIVE_PHRASE = "negative_phrase"
+POSITIVE_KEYWORD = "positive_keyword"
+NEGATIVE_KEYWORD = "negative_keyword"
+
+GROUPS = (NEGATION, POSITIVE_PHRASE, NEGATIVE_PHRASE, POSITIVE_KEYWORD, NEGATIVE_KEYWORD)
+
+_WORD_RE = re.compile(r'\w+')
+
+# A pattern can be anchored when it starts with \b<word> followed by \b or a
+# mandatory \s: any match must then begin exactly where the token <word> begins.
+_ANCHOR_RE = re.compile(r'\\b(\w+)(?=\\b|\\s(?![*?{]))')
+_KEYWORD_RE = re.compile(r'\w+')
+
+
+def _anchor_of(pattern: str):
+    """Return the leading literal word of ``pattern``, or None if it has none"""
+    anchor = _ANCHOR_RE.match(pattern)
+    if not anchor:
+        return None
+    # A top-level alternation can match without the leading word
+    depth = 0
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return None
+    return anchor.group(1)
+
+
+class LexiconMatcher:
+    def __init__(self, negation_patterns, positive_phrases, negative_phrases,
+                 positive_keywords, negative_keywords):
+        # group -> payloads in lexicon order (what scan() hands back)
+        self.rules: Dict[str, list] = {group: [] for group in GROUPS}
+        # token -> [(group, index)] for plain single-word keywords
+        self.keywords: Dict[str, list] = {}
+        # token -> [(group, index, regex)] for rules anchored on a leading word
+        self.anchored: Dict[str, list] = {}
+        # [(group, index, regex)] for rules that need a full search
+        self.floating: List[tuple] = []
+
+        for pattern, sentiment, confidence in negation_patterns:
+            self._add_pattern(NEGATION, pattern, (pattern, sentiment, confidence))
+        for phrase in positive_phrases:
+            self._add_pattern(POSITIVE_PHRASE, phrase, phrase)
+        for phrase in negative_phrases:
+            self._add_pattern(NEGATIVE_PHRASE, phrase, phrase)
+        for keyword, weight in positive_keywords.items():
+            self._add_keyword(POSITIVE_KEYWORD, keyword, weight)
+        for keyword, weight in negative_keywords.items():
+            self._add_keyword(NEGATIVE_KEYWORD, keyword, weight)
+
+    def _add_pattern(self, group, pattern, payload):
+        index = len(self.rules[group])
+        self.rules[group].append(payload)
+
+        anchor = _anchor_of(pattern)
+        regex = re.compile(pattern)
+        if anchor:
+            self.anchored.setdefault(anchor, []).append((group, index, regex))
+        else:
+            self.floating.append((group, index, regex))
+
+    def _add_keyword(self, group, keyword, weight):
+        if not _KEYWORD_RE.fullmatch(keyword):
+            # Multi-word or punctuated entries keep the old \b...\b semantics
+            self._add_pattern(group, rf'\b{keyword}\b', (keyword, weight))
+            return
+        index = len(self.rules[group])
+        self.rules[group].append((keyword, weight))
+        self.keywords.setdefault(keyword, []).append((group, index))
+
+    def scan(self, text: str) -> Dict[str, list]:
+        """Find every lexicon hit in ``text`` in one pass, grouped and in lexicon order"""
+        found = {group: set() for group in GROUPS}
+        keywords = self.keywords
+        anchored = self.anchored
+
+        for token in _WORD_RE.finditer(text):
+            word = token.group()
+            for group, index in keywords.get(word, ()):
+                found[group].add(index)
+            for group, index, regex in anchored.get(word, ()):
+                if regex.match(text, token.start()):
+                    found[group].add(index)
+
+        for group, index, regex in self.floating:
+            if regex.search(text):
+                found[group].add(index)
+
+        return {
+            group: [self.rules[group][index] for index in sorted(indexes)]
+            for group, indexes in found.items()
+        }
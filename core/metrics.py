@@ -0,0 +1,40 @@
+# main/core/metrics.py - PROCESS-LOCAL METRICS REGISTRY
+"""
+Counters and stats providers for this worker process.
+
+Components either bump a named counter with ``incr()`` or register a
+callable returning a dict of their current stats (cache hit ratios, queue
+depth, ...). ``snapshot()`` collects everything for the metrics endpoint.
+"""
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def incr(name: str, amount: int = 1):
+    with _lock:
+        _counters[name] += amount
+
+
+def register(name: str, provider: Callable[[], dict]):
+    """Expose ``provider()`` under ``name`` in every snapshot (re-registering replaces it)"""
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        providers = dict(_providers)
+
+    result = {"counters": counters}
+    for name, provider in providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {"error": str(e)}
+    return result
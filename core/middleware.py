@@ -0,0 +1,37 @@
+# main/core/middleware.py - ASYNC-CAPABLE STATIC FILES
+"""
+WhiteNoise's middleware is sync-only. Under an ASGI server, one sync
+middleware makes Django adapt the whole chain and run every request
+through a single sync thread, async views included. This subclass lets
+Django keep the chain async. Static files are still looked up in memory
+(or on disk with autorefresh) and served exactly as before. Under WSGI
+nothing changes.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Development only: walks the static directories
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
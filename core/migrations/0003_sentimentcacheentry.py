@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_feedback_analyzed_at_feedback_confidence_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('analyzer_version', models.CharField(max_length=64)),
+                ('source', models.CharField(default='rules', max_length=16)),
+                ('sentiment', models.CharField(choices=[('POSITIVE', 'Positive'), ('NEGATIVE', 'Negative'), ('NEUTRAL', 'Neutral'), ('PENDING', 'Pending Analysis'), ('ERROR', 'Analysis Failed')], max_length=10)),
+                ('confidence', models.FloatField()),
+                ('reasoning', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_sentimentjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='analyzer_version',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_feedback_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='analysis_tier',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:13
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keep in sync with core.search.SEARCH_CONFIG
+TRIGGER_SQL = """
+CREATE TRIGGER core_feedback_search_vector_update
+BEFORE INSERT OR UPDATE OF message ON core_feedback
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.simple', message);
+"""
+INDEX_SQL = "CREATE INDEX CONCURRENTLY IF NOT EXISTS feedback_search_gin ON core_feedback USING gin (search_vector);"
+
+
+def create_search_trigger(apps, schema_editor):
+    # Postgres only: SQLite (tests, local dev) searches with icontains instead
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(TRIGGER_SQL)
+    # CONCURRENTLY: don't block feedback writes while the index builds on a big table
+    schema_editor.execute(INDEX_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS feedback_search_gin;")
+    schema_editor.execute("DROP TRIGGER IF EXISTS core_feedback_search_vector_update ON core_feedback;")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_feedback_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
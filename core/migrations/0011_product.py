@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_feedback_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('category', models.CharField(choices=[('snacks', 'Snacks'), ('drinks', 'Drinks'), ('stationery', 'Stationery'), ('meals', 'Meals'), ('hygiene', 'Hygiene'), ('accessories', 'Accessories')], max_length=20)),
+                ('price', models.CharField(max_length=32)),
+                ('description', models.TextField(blank=True, default='')),
+                ('icon', models.CharField(blank=True, default='fas fa-box', max_length=100)),
+                ('color', models.CharField(default='#3B82F6', max_length=7)),
+                ('tag', models.CharField(blank=True, default='', max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('sort_order', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['sort_order', 'id'],
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['category', 'sort_order', 'id'], name='product_category_idx')],
+            },
+        ),
+    ]
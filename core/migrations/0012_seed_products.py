@@ -0,0 +1,197 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:16
+
+from django.db import migrations
+
+# The catalog that used to be hardcoded in static/app.js
+# (name, category, price, description, icon, color, tag)
+PRODUCTS = [
+    (
+        'Assorted Biscuits Pack',
+        'snacks',
+        '₱25',
+        'Mix of cream-filled, wafer, and cracker biscuits. Perfect for quick snacks between classes.',
+        'fas fa-cookie-bite fa-bounce',
+        '#F59E0B',
+        'Bestseller',
+    ),
+    (
+        'Crispy Potato Chips',
+        'snacks',
+        '₱35',
+        'Crunchy potato chips in BBQ, Cheese, and Sour Cream flavors.',
+        'fas fa-pizza-slice fa-shake',
+        '#DC2626',
+        'Popular',
+    ),
+    (
+        'Energy Drinks',
+        'drinks',
+        '₱50',
+        'Boost your energy for late-night studying. Red Bull, Monster, and local brands available.',
+        'fas fa-battery-full fa-beat',
+        '#DC2626',
+        'Energy Boost',
+    ),
+    (
+        'Cold Refreshments',
+        'drinks',
+        '₱20-₱35',
+        'Soft drinks, juices, iced tea, and bottled water. Stay refreshed!',
+        'fas fa-glass-whiskey fa-beat',
+        '#3B82F6',
+        'Chilled',
+    ),
+    (
+        'Premium Ballpens Set',
+        'stationery',
+        '₱25',
+        'Set of 3 smooth-writing ballpens in different colors for notes.',
+        'fas fa-pen fa-fade',
+        '#10B981',
+        'Study Essential',
+    ),
+    (
+        'Pencils & Erasers',
+        'stationery',
+        '₱15',
+        'Wooden pencils with quality erasers. Essential for exams.',
+        'fas fa-pencil-alt fa-beat-fade',
+        '#8B5CF6',
+        'Must-have',
+    ),
+    (
+        'Study Notebooks',
+        'stationery',
+        '₱40-₱60',
+        'Different sizes and types for all your academic needs.',
+        'fas fa-book fa-flip',
+        '#EC4899',
+        'Academic',
+    ),
+    (
+        'Instant Noodles',
+        'meals',
+        '₱18',
+        'Quick and delicious meals for busy study sessions.',
+        'fas fa-bowl-food fa-spin-pulse',
+        '#F97316',
+        'Quick Meal',
+    ),
+    (
+        'Bottled Water',
+        'drinks',
+        '₱15',
+        'Pure drinking water to keep you hydrated throughout the day.',
+        'fas fa-bottle-water fa-beat',
+        '#06B6D4',
+        'Hydration',
+    ),
+    (
+        'Coffee & Hot Drinks',
+        'drinks',
+        '₱30-₱55',
+        '3-in-1 coffee sachets, hot chocolate, and instant cappuccino for those long study nights.',
+        'fas fa-mug-saucer fa-bounce',
+        '#92400E',
+        'Wake-Up Call',
+    ),
+    (
+        'Highlighters Pack',
+        'stationery',
+        '₱30',
+        'Bright highlighters in different colors for effective studying.',
+        'fas fa-highlighter fa-fade',
+        '#FBBF24',
+        'Study Aid',
+    ),
+    (
+        'Cup Noodles',
+        'meals',
+        '₱25',
+        'Ready-to-eat cup noodles, just add hot water!',
+        'fas fa-mug-hot fa-beat-fade',
+        '#DC2626',
+        'Instant',
+    ),
+    (
+        'Sandwich & Burgers',
+        'meals',
+        '₱45-₱75',
+        'Freshly made sandwiches and burgers. Perfect lunch for busy students.',
+        'fas fa-burger fa-shake',
+        '#F59E0B',
+        'Fresh Meals',
+    ),
+    (
+        'Hand Sanitizer & Wipes',
+        'hygiene',
+        '₱35-₱50',
+        'Keep your hands clean and germ-free. Alcohol-based sanitizers and antibacterial wipes.',
+        'fas fa-pump-soap fa-beat',
+        '#10B981',
+        'Stay Safe',
+    ),
+    (
+        'Tissue Packs',
+        'hygiene',
+        '₱15',
+        'Pocket tissue packs and facial tissues. Essential for everyday use.',
+        'fas fa-box-tissue fa-fade',
+        '#8B5CF6',
+        'Daily Essential',
+    ),
+    (
+        'Phone Charger Cables',
+        'accessories',
+        '₱80-₱150',
+        'USB-C, Lightning, and Micro-USB charging cables. Keep your devices powered up!',
+        'fas fa-charging-station fa-beat-fade',
+        '#3B82F6',
+        'Tech Essential',
+    ),
+    (
+        'Earphones & Headphones',
+        'accessories',
+        '₱150-₱350',
+        'Quality earphones and headphones for music and online classes.',
+        'fas fa-headphones fa-spin',
+        '#EC4899',
+        'Audio Gear',
+    ),
+    (
+        'Power Bank',
+        'accessories',
+        '₱400-₱800',
+        'Portable power banks 10,000mAh - 20,000mAh. Never run out of battery!',
+        'fas fa-battery-three-quarters fa-bounce',
+        '#10B981',
+        'Power Up',
+    ),
+]
+
+
+def seed_products(apps, schema_editor):
+    Product = apps.get_model('core', 'Product')
+    if Product.objects.exists():
+        return
+    Product.objects.bulk_create([
+        Product(name=name, category=category, price=price, description=description,
+                icon=icon, color=color, tag=tag, sort_order=position * 10)
+        for position, (name, category, price, description, icon, color, tag) in enumerate(PRODUCTS, start=1)
+    ])
+
+
+def unseed_products(apps, schema_editor):
+    Product = apps.get_model('core', 'Product')
+    Product.objects.filter(name__in=[row[0] for row in PRODUCTS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_products, unseed_products),
+    ]
@@ -1,6 +1,8 @@
 # main/core/models.py - UPDATED
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Feedback(models.Model):
     SENTIMENT_CHOICES = [
@@ -23,12 +25,134 @@ class Feedback(models.Model):
     confidence = models.FloatField(default=0.0)
     reasoning = models.TextField(blank=True, null=True)
     analyzed_at = models.DateTimeField(null=True, blank=True)
+    analyzer_version = models.CharField(max_length=64, blank=True, default='')
+    # Backend that produced the verdict ("rules", "llm", ...; see core.backends)
+    analysis_tier = models.CharField(max_length=16, blank=True, default='')
+    # tsvector of message, maintained by a Postgres trigger (see core.search); unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Backs the per-user, newest-first keyset pagination of /api/feedback/
+            models.Index(fields=['user', '-created_at', '-id'], name='feedback_user_created_idx'),
+            # Admin changelist: newest-first ordering and the created_at date hierarchy
+            models.Index(fields=['-created_at', '-id'], name='feedback_created_idx'),
+        ]
     
     def __str__(self):
         # Show sentiment in admin display
-        return f"{self.user.username} - {self.sentiment} - {self.message[:50]}"
\ No newline at end of file
+        return f"{self.user.username} - {self.sentiment} - {self.message[:50]}"
+
+
+class SentimentCacheEntry(models.Model):
+    """Persistent tier of the sentiment result cache (see core.cache.SentimentCache)"""
+    key = models.CharField(max_length=64, unique=True)
+    analyzer_version = models.CharField(max_length=64)
+    source = models.CharField(max_length=16, default='rules')
+    sentiment = models.CharField(max_length=10, choices=Feedback.SENTIMENT_CHOICES)
+    confidence = models.FloatField()
+    reasoning = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return f"{self.analyzer_version} - {self.sentiment} ({self.confidence:.2f})"
+
+
+class SentimentJob(models.Model):
+    """Durable analysis job, claimed by run_sentiment_worker under a time-limited lease"""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='sentiment_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='sentimentjob_claim_idx'),
+            models.Index(fields=['status', 'lease_expires_at'], name='sentimentjob_lease_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Job {self.id} - feedback {self.feedback_id} - {self.status} (attempt {self.attempts})"
+
+
+class SentimentRollup(models.Model):
+    """
+    Sentiment count and confidence sum per day (feedback creation date).
+    Rows with a user are per-user buckets; user=NULL rows are the overall
+    totals. Maintained by core.rollups.
+    """
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='sentiment_rollups')
+    sentiment = models.CharField(max_length=10, choices=Feedback.SENTIMENT_CHOICES)
+    count = models.IntegerField(default=0)
+    confidence_sum = models.FloatField(default=0.0)
+    
+    class Meta:
+        constraints = [
+            # NULLs never collide in a plain unique constraint, so overall rows need their own
+            models.UniqueConstraint(fields=['day', 'user', 'sentiment'], condition=models.Q(user__isnull=False),
+                                    name='sentimentrollup_user_day_uniq'),
+            models.UniqueConstraint(fields=['day', 'sentiment'], condition=models.Q(user__isnull=True),
+                                    name='sentimentrollup_overall_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='sentimentrollup_user_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.user_id or 'all'} - {self.sentiment}: {self.count}"
+
+
+class Product(models.Model):
+    """Store catalog item, served by GET /api/products/ (cached per category, see core.catalog)"""
+    CATEGORY_CHOICES = [
+        ('snacks', 'Snacks'),
+        ('drinks', 'Drinks'),
+        ('stationery', 'Stationery'),
+        ('meals', 'Meals'),
+        ('hygiene', 'Hygiene'),
+        ('accessories', 'Accessories'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    # Display price as shown on the store page, e.g. "₱25" or "₱20-₱35"
+    price = models.CharField(max_length=32)
+    description = models.TextField(blank=True, default='')
+    # Font Awesome classes, e.g. "fas fa-cookie-bite fa-bounce"
+    icon = models.CharField(max_length=100, blank=True, default='fas fa-box')
+    color = models.CharField(max_length=7, default='#3B82F6')
+    tag = models.CharField(max_length=50, blank=True, default='')
+    is_active = models.BooleanField(default=True)
+    sort_order = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['sort_order', 'id']
+        indexes = [
+            # Backs GET /api/products/?category=, which only lists active products
+            models.Index(fields=['category', 'sort_order', 'id'], condition=models.Q(is_active=True),
+                         name='product_category_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.category}) - {self.price}"
@@ -0,0 +1,162 @@
+# main/core/pagination.py - KEYSET (CURSOR) PAGINATION FOR FEEDBACK + ESTIMATED ADMIN COUNTS
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(created_at, pk) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError(raw)
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise NotFound("Invalid cursor")
+
+
+class FeedbackCursorPagination(BasePagination):
+    """
+    Newest-first pages keyed on (created_at, id).
+
+    Each page is a range scan on the (user, -created_at, -id) index that starts
+    right after the previous page's last row, so page N costs the same as page 1
+    however many rows the user has. No COUNT(*) is run.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() with the async ORM"""
+        return self.set_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # One extra row tells us whether there is a next page
+        return queryset.order_by('-created_at', '-id')[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request) -> int:
+        default = getattr(settings, "FEEDBACK_PAGE_SIZE", 20)
+        maximum = getattr(settings, "FEEDBACK_MAX_PAGE_SIZE", 100)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            size = default
+        return max(1, min(size, maximum))
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return encode_cursor(last.created_at, last.id)
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "next_cursor": self.get_next_cursor(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator that asks the Postgres planner for the row count instead of
+    running COUNT(*), which reads the whole table (or filtered range) on every
+    page load. Estimates under ``exact_below`` rows are replaced by an exact
+    count, so small tables and narrow filters still show true totals. Other
+    databases always count exactly.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[getattr(queryset, "db", "default")]
+        if connection.vendor != "postgresql" or not hasattr(queryset, "query"):
+            return super().count
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+        except Exception:
+            return super().count
+        return estimate if estimate >= self.exact_below else super().count
+
+
+class FeedbackSearchPagination(BasePagination):
+    """
+    Page-numbered pages for ranked search results (rank order has no keyset to
+    resume from). One extra row stands in for COUNT(*), and the page number is
+    capped so deep OFFSETs can't be requested.
+    """
+    page_query_param = "page"
+    page_size_query_param = "page_size"
+    max_page = 50
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = FeedbackCursorPagination().get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound("Invalid page")
+        if not 1 <= self.page_number <= self.max_page:
+            raise NotFound(f"Page must be between 1 and {self.max_page}")
+
+        offset = (self.page_number - 1) * self.page_size
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size and self.page_number < self.max_page
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "page": self.page_number, "results": data})
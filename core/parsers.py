@@ -0,0 +1,44 @@
+# main/core/parsers.py - NDJSON PARSER FOR BULK FEEDBACK
+import json
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import BaseParser
+
+
+class TooManyItems(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Too many items in one request."
+    default_code = "too_many_items"
+
+
+def bulk_item_limit() -> int:
+    return getattr(settings, "FEEDBACK_BULK_MAX_ITEMS", 500)
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON: one object per line.
+
+    Lines are decoded as they are read and parsing stops as soon as the item
+    limit is passed, so an oversized upload is rejected without buffering it.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        limit = bulk_item_limit()
+        items = []
+
+        for line_number, raw in enumerate(stream, 1):
+            line = raw.decode(encoding).strip()
+            if not line:
+                continue
+            if len(items) >= limit:
+                raise TooManyItems(f"At most {limit} items per request.")
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise ParseError(f"Line {line_number}: invalid JSON ({e})")
+        return items
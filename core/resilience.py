@@ -0,0 +1,282 @@
+# main/core/resilience.py - DEADLINES, HEDGING AND CIRCUIT BREAKING FOR REMOTE CALLS
+"""
+Keeps a slow or dead dependency (the LLM) from tying up worker threads.
+
+``Guard.run(primary, fallback)`` gives ``primary`` a fixed deadline budget.
+When the deadline passes, or every attempt fails, ``fallback`` answers
+instead. If the call is still running at the recent p95 latency, the guard can
+hedge in one of two ways. With ``"request"`` it fires a second identical call
+and takes whichever answers first. With ``"fallback"`` it starts the fallback
+early and returns that if it finishes first. ``CircuitBreaker`` sends calls
+straight to the fallback for a cool-down after repeated failures or timeouts.
+Each guarded call reports exactly one outcome to the breaker, even when a
+fallback hedge answered first and the primary is still running.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, TypeVar
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HEDGE_MODES = ("off", "request", "fallback")
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failure_threshold`` consecutive failures; open ->
+    half-open after ``cooldown`` seconds, letting one probe call through;
+    the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.skipped = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            if self.state == "closed":
+                return True
+            self.skipped += 1
+        metrics.incr(f"{self.name}.breaker_skipped")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"{self.name} circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        """Neither outcome (e.g. the caller was cancelled): let the next call probe instead"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                if self.state == "closed":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+                logger.warning(f"{self.name} circuit open for {self.cooldown:.0f}s after {self.failures} failure(s)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "skipped": self.skipped,
+            }
+
+
+class LatencyWindow:
+    """The last ``size`` latencies, for percentile-based hedge delays"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 20):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Outcome:
+    """The one breaker verdict of a guarded call, whichever of its attempts settles it first"""
+
+    def __init__(self, breaker: CircuitBreaker, deadline_at: float):
+        self.breaker = breaker
+        self.deadline_at = deadline_at
+        self._lock = threading.Lock()
+        self.settled = False
+
+    def record(self, ok: bool) -> bool:
+        with self._lock:
+            if self.settled:
+                return False
+            self.settled = True
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return True
+
+
+class Guard:
+    def __init__(self, name: str, breaker: CircuitBreaker, deadline: float = 8.0, hedge: str = "off",
+                 hedge_percentile: float = 95, hedge_min_delay: float = 0.2, threads: int = 8):
+        if hedge not in HEDGE_MODES:
+            raise ValueError(f"hedge must be one of {HEDGE_MODES}, got {hedge!r}")
+        self.name = name
+        self.breaker = breaker
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.threads = threads
+        self.latency = LatencyWindow()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self.calls = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _ensure_started(self):
+        # Threads don't survive fork: (re)create lazily in whichever process calls
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix=self.name)
+            self._pid = os.getpid()
+
+    def hedge_delay(self) -> float:
+        p = self.latency.percentile(self.hedge_percentile)
+        return max(self.hedge_min_delay, p if p is not None else self.deadline / 2)
+
+    def _attempt(self, primary: Callable[[], T]) -> T:
+        started = time.monotonic()
+        result = primary()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    def _settle_later(self, outcome: Outcome, pending):
+        """A fallback hedge answered first: the primary attempts still decide, by the deadline at the latest"""
+        remaining = set(pending)
+        lock = threading.Lock()
+        timer = threading.Timer(max(0.0, outcome.deadline_at - time.monotonic()), outcome.record, (False,))
+        timer.daemon = True
+
+        def done(future):
+            with lock:
+                remaining.discard(future)
+                last = not remaining
+            if future.exception() is None and time.monotonic() <= outcome.deadline_at:
+                outcome.record(True)
+            elif last:
+                outcome.record(False)
+            if outcome.settled:
+                timer.cancel()
+
+        timer.start()
+        for future in pending:
+            future.add_done_callback(done)
+
+    def run(self, primary: Callable[[], T], fallback: Callable[[], T], hedge: str = None) -> T:
+        """``primary()`` within the deadline budget, else ``fallback()``"""
+        hedge = self.hedge if hedge is None else hedge
+        if not self.breaker.allow():
+            return fallback()
+
+        self._ensure_started()
+        with self._lock:
+            self.calls += 1
+        deadline_at = time.monotonic() + self.deadline
+        outcome = Outcome(self.breaker, deadline_at)
+        attempts = {self._executor.submit(self._attempt, primary): "primary"}
+        hedge_at = time.monotonic() + self.hedge_delay() if hedge != "off" else None
+        handed_off = False
+
+        try:
+            while attempts:
+                now = time.monotonic()
+                until = min(deadline_at, hedge_at) if hedge_at else deadline_at
+                done, _ = wait(attempts, timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    kind = attempts.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"{self.name} {kind} attempt failed: {e}")
+                        # The call failed once no primary attempt is left running
+                        if kind != "fallback" and all(other == "fallback" for other in attempts.values()):
+                            outcome.record(False)
+                        continue
+                    if kind == "fallback":
+                        # The primary is still running: it settles the breaker when it ends or times out
+                        handed_off = True
+                        if attempts:
+                            self._settle_later(outcome, list(attempts))
+                    else:
+                        outcome.record(True)
+                    if kind != "primary":
+                        with self._lock:
+                            self.hedge_wins += 1
+                        metrics.incr(f"{self.name}.hedge_wins.{kind}")
+                    return result
+
+                if hedge_at and time.monotonic() >= hedge_at and attempts:
+                    hedge_at = None
+                    with self._lock:
+                        self.hedges += 1
+                    metrics.incr(f"{self.name}.hedges")
+                    if hedge == "request":
+                        attempts[self._executor.submit(self._attempt, primary)] = "request"
+                    else:
+                        attempts[self._executor.submit(fallback)] = "fallback"
+                elif time.monotonic() >= deadline_at:
+                    with self._lock:
+                        self.timeouts += 1
+                    metrics.incr(f"{self.name}.timeouts")
+                    outcome.record(False)
+                    logger.warning(f"{self.name} gave up after the {self.deadline:.1f}s deadline")
+                    break
+        finally:
+            # Whatever happened, the breaker hears about this call (a half-open probe must be released)
+            if not handed_off:
+                outcome.record(False)
+
+        return fallback()
+
+    def stats(self) -> dict:
+        p = self.latency.percentile(self.hedge_percentile, min_samples=1)
+        with self._lock:
+            return {
+                "deadline_seconds": self.deadline,
+                "hedge": self.hedge,
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_win_rate": self.hedge_wins / self.hedges if self.hedges else 0.0,
+                f"p{self.hedge_percentile:g}_ms": p * 1000 if p is not None else None,
+                "breaker": self.breaker.stats(),
+            }
@@ -0,0 +1,175 @@
+# main/core/rollups.py - INCREMENTAL SENTIMENT ROLLUPS
+"""
+Per-day sentiment counts kept in step with Feedback.
+
+Every writer of a sentiment result goes through ``save_sentiment_results()``
+(or ``mark_sentiment_error()``). Inside one transaction, they lock the rows,
+read the sentiment being replaced, write the new one and move each feedback
+from its old bucket to its new one. Each change touches two rows: the
+per-user bucket and the overall bucket (``user=NULL``). Only final verdicts
+(``TRACKED``) are counted; PENDING and ERROR are not. Deleting a feedback
+(admin, queryset or a user's cascade) takes it out of its buckets from a
+``pre_delete`` handler, in the deleting transaction.
+``manage.py rebuild_sentiment_rollups`` recomputes everything from Feedback.
+Both also invalidate the owners' cached feedback lists (core.feedback_cache)
+and publish an analysis event to the owners' open streams (core.events).
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .events import publish_errors, publish_results
+from .feedback_cache import invalidate as invalidate_feedback_lists
+from .models import Feedback, SentimentRollup
+
+TRACKED = ('POSITIVE', 'NEGATIVE', 'NEUTRAL')
+
+
+def locked_sentiments(feedback_ids: Iterable[int]) -> Dict[int, tuple]:
+    """{id: (day, user_id, sentiment, confidence)} as stored now; call inside a transaction"""
+    queryset = Feedback.objects.filter(id__in=list(feedback_ids))
+    if connection.features.has_select_for_update:
+        queryset = queryset.select_for_update()
+    return {
+        row['id']: (timezone.localdate(row['created_at']), row['user_id'], row['sentiment'], row['confidence'])
+        for row in queryset.order_by('id').values('id', 'created_at', 'user_id', 'sentiment', 'confidence')
+    }
+
+
+def rollup_deltas(before: Dict[int, tuple], after: Dict[int, tuple]) -> Dict[tuple, list]:
+    """
+    ``before``: locked_sentiments(); ``after``: {id: (sentiment, confidence)}.
+    Returns {(day, user_id, sentiment): [count, confidence_sum]} for the
+    per-user and the overall (user_id None) buckets.
+    """
+    deltas = defaultdict(lambda: [0, 0.0])
+    for feedback_id, (day, user_id, old_sentiment, old_confidence) in before.items():
+        new_sentiment, new_confidence = after.get(feedback_id, (old_sentiment, old_confidence))
+        for owner in (user_id, None):
+            if old_sentiment in TRACKED:
+                bucket = deltas[(day, owner, old_sentiment)]
+                bucket[0] -= 1
+                bucket[1] -= old_confidence
+            if new_sentiment in TRACKED:
+                bucket = deltas[(day, owner, new_sentiment)]
+                bucket[0] += 1
+                bucket[1] += new_confidence
+    return {key: delta for key, delta in deltas.items() if delta[0] or abs(delta[1]) > 1e-9}
+
+
+def apply_rollup_deltas(deltas: Dict[tuple, list], create: bool = True):
+    """Add ``deltas`` to their buckets; ``create=False`` only touches buckets that exist"""
+    # Sorted so concurrent writers take the bucket row locks in the same order
+    for (day, user_id, sentiment), (count, confidence_sum) in sorted(
+        deltas.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2])
+    ):
+        bucket = SentimentRollup.objects.filter(day=day, user_id=user_id, sentiment=sentiment)
+        change = dict(count=F('count') + count, confidence_sum=F('confidence_sum') + confidence_sum)
+        if bucket.update(**change) or not create:
+            continue
+        try:
+            with transaction.atomic():
+                SentimentRollup.objects.create(
+                    day=day, user_id=user_id, sentiment=sentiment,
+                    count=count, confidence_sum=confidence_sum,
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            bucket.update(**change)
+
+
+def save_sentiment_results(feedbacks: List[Feedback], fields: List[str]):
+    """bulk_update ``fields`` of analyzed feedbacks and move their rollup buckets, atomically"""
+    if not feedbacks:
+        return
+    with transaction.atomic():
+        before = locked_sentiments(feedback.id for feedback in feedbacks)
+        Feedback.objects.bulk_update(feedbacks, fields)
+        after = {feedback.id: (feedback.sentiment, feedback.confidence) for feedback in feedbacks}
+        apply_rollup_deltas(rollup_deltas(before, after))
+        invalidate_feedback_lists(user_id for _, user_id, _, _ in before.values())
+        publish_results(
+            (feedback.id, before[feedback.id][1], feedback.analyzed_at)
+            for feedback in feedbacks if feedback.id in before and feedback.sentiment in TRACKED
+        )
+
+
+def mark_sentiment_error(feedback_ids: Iterable[int], reasoning: str, only_pending: bool = False) -> int:
+    """Set sentiment=ERROR (a reanalysis that failed takes the row out of its bucket)"""
+    with transaction.atomic():
+        queryset = Feedback.objects.filter(id__in=list(feedback_ids))
+        if only_pending:
+            queryset = queryset.filter(sentiment='PENDING')
+        before = locked_sentiments(queryset.values_list('id', flat=True))
+        updated = Feedback.objects.filter(id__in=list(before)).update(sentiment='ERROR', reasoning=reasoning)
+        apply_rollup_deltas(rollup_deltas(before, {feedback_id: ('ERROR', 0.0) for feedback_id in before}))
+        invalidate_feedback_lists(user_id for _, user_id, _, _ in before.values())
+        publish_errors((feedback_id, user_id) for feedback_id, (_, user_id, _, _) in before.items())
+    return updated
+
+
+@receiver(pre_delete, sender=Feedback, dispatch_uid="core.rollups.feedback_deleted")
+def _feedback_deleted(instance, **kwargs):
+    # Read the stored verdict under the row lock: the instance may predate a reanalysis
+    before = locked_sentiments([instance.id])
+    # No new buckets here: a cascading user delete has already collected theirs
+    apply_rollup_deltas(rollup_deltas(before, {feedback_id: (None, 0.0) for feedback_id in before}), create=False)
+
+
+def rebuild_rollups() -> int:
+    """Recompute every bucket from Feedback; returns the number of rollup rows written"""
+    per_user = (
+        Feedback.objects.filter(sentiment__in=TRACKED)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'user_id', 'sentiment')
+        .annotate(count=Count('id'), confidence_sum=Sum('confidence'))
+        .order_by()
+    )
+    overall = defaultdict(lambda: [0, 0.0])
+    rows = []
+    for row in per_user.iterator():
+        rows.append(SentimentRollup(
+            day=row['day'], user_id=row['user_id'], sentiment=row['sentiment'],
+            count=row['count'], confidence_sum=row['confidence_sum'] or 0.0,
+        ))
+        bucket = overall[(row['day'], row['sentiment'])]
+        bucket[0] += row['count']
+        bucket[1] += row['confidence_sum'] or 0.0
+    rows += [
+        SentimentRollup(day=day, user_id=None, sentiment=sentiment, count=count, confidence_sum=confidence_sum)
+        for (day, sentiment), (count, confidence_sum) in overall.items()
+    ]
+
+    with transaction.atomic():
+        SentimentRollup.objects.all().delete()
+        SentimentRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def sentiment_stats(user_id, since, until) -> dict:
+    """Per-day and total counts/average confidence from the rollups alone (user_id None = everyone)"""
+    rows = (
+        SentimentRollup.objects.filter(user_id=user_id, day__gte=since, day__lte=until, count__gt=0)
+        .order_by('day', 'sentiment')
+        .values_list('day', 'sentiment', 'count', 'confidence_sum')
+    )
+    days = {}
+    totals = {sentiment: [0, 0.0] for sentiment in TRACKED}
+    for day, sentiment, count, confidence_sum in rows:
+        days.setdefault(day, {})[sentiment] = _summary(count, confidence_sum)
+        totals[sentiment][0] += count
+        totals[sentiment][1] += confidence_sum
+    return {
+        "days": [{"day": day.isoformat(), **counts} for day, counts in days.items()],
+        "totals": {sentiment: _summary(*total) for sentiment, total in totals.items()},
+    }
+
+
+def _summary(count, confidence_sum):
+    return {"count": count, "avg_confidence": round(confidence_sum / count, 4) if count else None}
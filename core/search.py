@@ -0,0 +1,49 @@
+# main/core/search.py - FEEDBACK FULL-TEXT SEARCH
+"""
+Message search that uses an index instead of ``ILIKE '%term%'`` scans.
+
+On Postgres, ``Feedback.search_vector`` is a tsvector kept current by a
+trigger on every INSERT/UPDATE (bulk_create and queryset updates included),
+indexed with GIN (migration 0010), and backfilled by
+``manage.py backfill_search_vectors``. Queries use the same text search
+configuration as the trigger, otherwise the index can't be used.
+
+Other databases (SQLite in tests and local dev) fall back to an
+``icontains`` match on every term, unranked.
+"""
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+
+# 'simple' (no stemming, no stop words): English-only stemming mangles Tagalog/Taglish feedback.
+# Must match the trigger in core/migrations/0010.
+SEARCH_CONFIG = "simple"
+
+
+def full_text_available(queryset) -> bool:
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def search_feedback(queryset, query: str, rank: bool = True):
+    """Filter ``queryset`` to feedback matching ``query``; annotates ``rank`` and orders by it when asked"""
+    query = query.strip()
+    if not query:
+        return queryset.none()
+
+    if full_text_available(queryset):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = queryset.filter(search_vector=search)
+        if rank:
+            queryset = queryset.annotate(rank=SearchRank(F('search_vector'), search)).order_by(
+                '-rank', '-created_at', '-id'
+            )
+        return queryset
+
+    condition = Q()
+    for term in query.split():
+        condition &= Q(message__icontains=term.strip('"'))
+    queryset = queryset.filter(condition)
+    if rank:
+        queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField())).order_by('-created_at', '-id')
+    return queryset
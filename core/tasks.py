@@ -1,51 +1,387 @@
 # main/core/tasks.py - UPDATED FOR PRODUCTION
+import asyncio
+import atexit
+import os
+import queue
 import threading
 import traceback  # ADD THIS LINE
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
 from .models import Feedback
-from .utils import analyze_feedback_sentiment
+from .rollups import mark_sentiment_error, save_sentiment_results
+from .utils import (
+    analyze_feedback_sentiment, analyze_feedback_sentiment_async, analyze_feedback_sentiment_batch, get_analyzer,
+)
 from django.utils import timezone
+from . import metrics
 
-def analyze_sentiment_background(feedback_id: int):
+FULL_POLICIES = ("block", "pending", "inline")
+
+# Fields written by apply_sentiment_result(), for bulk_update callers
+SENTIMENT_FIELDS = ['sentiment', 'confidence', 'reasoning', 'analyzed_at', 'analyzer_version', 'analysis_tier']
+
+
+def apply_sentiment_result(feedback: Feedback, result: dict):
+    """Copy an analysis result onto a feedback (the caller saves it)"""
+    feedback.sentiment = result['sentiment']
+    feedback.confidence = result['confidence']
+    feedback.reasoning = result['reasoning']
+    feedback.analyzed_at = timezone.now()
+    feedback.analyzer_version = get_analyzer().version
+    feedback.analysis_tier = result.get('tier', '')
+
+
+def failed_analysis(result: dict) -> str:
+    """Why the analysis failed, or "" (the analyzer reports failures as a NEUTRAL placeholder, not by raising)"""
+    if result.get('success', True):
+        return ""
+    return result.get('error') or result.get('reasoning') or "Analysis failed"
+
+
+def save_analysis_results(feedbacks: list, results: list) -> int:
+    """
+    Store the successful results; returns how many failed. A failed result never
+    replaces a stored verdict: the row keeps it, and only rows still PENDING become ERROR.
+    """
+    saved = []
+    failed = {}
+    for feedback, result in zip(feedbacks, results):
+        error = failed_analysis(result)
+        if error:
+            failed.setdefault(error, []).append(feedback.id)
+        else:
+            apply_sentiment_result(feedback, result)
+            saved.append(feedback)
+    # Updates the feedbacks' day sentiment rollups in the same transaction
+    save_sentiment_results(saved, SENTIMENT_FIELDS)
+    for error, feedback_ids in failed.items():
+        mark_sentiment_error(feedback_ids, f"Analysis failed: {error[:200]}", only_pending=True)
+    return sum(len(feedback_ids) for feedback_ids in failed.values())
+
+
+def analyze_and_save(feedback: Feedback):
     """
-    Run sentiment analysis in background thread
+    Analyze one feedback and store the result; raises on failure
     """
-    def task():
-        print(f"🔍 Starting LangGraph sentiment analysis for feedback {feedback_id}")
-        
+    print(f"📝 Feedback text preview: '{feedback.message[:100]}...'")
+
+    # Call LangGraph analysis function
+    result = analyze_feedback_sentiment(feedback.message)
+
+    print(f"📊 Analysis result: {result['sentiment']} (Confidence: {result['confidence']:.2f})")
+
+    if save_analysis_results([feedback], [result]):
+        print(f"⚠️ Analysis of feedback {feedback.id} failed, stored verdict kept: {failed_analysis(result)}")
+    else:
+        print(f"✅ Successfully saved sentiment for feedback {feedback.id}")
+
+
+def mark_analysis_failed(feedback_id: int, error: Exception):
+    """Mark a feedback as ERROR after its analysis gave up"""
+    try:
+        mark_sentiment_error([feedback_id], f"Analysis failed: {str(error)[:200]}")
+    except Exception as update_error:
+        print(f"❌ Could not update feedback {feedback_id} with error status: {update_error}")
+
+
+def run_sentiment_analysis(feedback_id: int):
+    """
+    Analyze one feedback and store the result (runs on a pool worker)
+    """
+    print(f"🔍 Starting LangGraph sentiment analysis for feedback {feedback_id}")
+
+    try:
+        analyze_and_save(Feedback.objects.get(id=feedback_id))
+
+    except Feedback.DoesNotExist:
+        print(f"⚠️ Feedback {feedback_id} not found in database")
+    except Exception as e:
+        print(f"❌ Error analyzing feedback {feedback_id}: {str(e)}")
+        print(traceback.format_exc())  # ADD THIS LINE
+
+        # Mark as error
+        mark_analysis_failed(feedback_id, e)
+
+
+def run_sentiment_analysis_batch(feedback_ids: list):
+    """
+    Analyze many feedbacks with one query, one batch analysis and one bulk_update
+    """
+    print(f"🔍 Starting LangGraph sentiment analysis for {len(feedback_ids)} feedbacks")
+
+    try:
+        feedbacks = list(Feedback.objects.filter(id__in=feedback_ids).only('id', 'message'))
+        results = analyze_feedback_sentiment_batch([feedback.message for feedback in feedbacks])
+        failed = save_analysis_results(feedbacks, results)
+
+        print(f"✅ Successfully saved sentiment for {len(feedbacks) - failed} feedbacks"
+              + (f", {failed} failed (stored verdicts kept)" if failed else ""))
+
+    except Exception as e:
+        print(f"❌ Error analyzing feedback batch {feedback_ids[:10]}...: {str(e)}")
+        print(traceback.format_exc())
         try:
-            feedback = Feedback.objects.get(id=feedback_id)
-            print(f"📝 Feedback text preview: '{feedback.message[:100]}...'")
-            
-            # Call LangGraph analysis function
-            result = analyze_feedback_sentiment(feedback.message)
-            
-            print(f"📊 Analysis result: {result['sentiment']} (Confidence: {result['confidence']:.2f})")
-            
-            # Update feedback with results
-            feedback.sentiment = result['sentiment']
-            feedback.confidence = result['confidence']
-            feedback.reasoning = result['reasoning']
-            feedback.analyzed_at = timezone.now()
-            feedback.save()
-            
-            print(f"✅ Successfully saved sentiment for feedback {feedback_id}")
-            
-        except Feedback.DoesNotExist:
-            print(f"⚠️ Feedback {feedback_id} not found in database")
-        except Exception as e:
-            print(f"❌ Error analyzing feedback {feedback_id}: {str(e)}")
-            print(traceback.format_exc())  # ADD THIS LINE
-            
-            # Mark as error
+            mark_sentiment_error(feedback_ids, f"Analysis failed: {str(e)[:200]}", only_pending=True)
+        except Exception as update_error:
+            print(f"❌ Could not update feedback batch with error status: {update_error}")
+
+
+def _run_item(item):
+    """Pool queue items are a single feedback id or a list of ids"""
+    if isinstance(item, list):
+        run_sentiment_analysis_batch(item)
+    else:
+        run_sentiment_analysis(item)
+
+
+class AnalysisPool:
+    """
+    Fixed-size pool of analysis threads fed by a bounded queue.
+
+    Thread count (and so DB connections) stays flat under load. When the queue
+    is full, ``full_policy`` decides: ``block`` waits up to ``block_timeout``
+    seconds for a slot, ``pending`` leaves the row PENDING, ``inline`` runs the
+    analysis in the calling thread.
+    """
+
+    def __init__(self, threads: int = 2, queue_size: int = 100,
+                 full_policy: str = "pending", block_timeout: float = 5.0):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"full_policy must be one of {FULL_POLICIES}, got {full_policy!r}")
+        self.threads = threads
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.block_timeout = block_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._workers = []
+        self._active = 0
+        self._closed = False
+
+    @classmethod
+    def from_settings(cls) -> "AnalysisPool":
+        config = getattr(settings, "SENTIMENT_WORKERS", {})
+        return cls(
+            threads=config.get("THREADS", 2),
+            queue_size=config.get("QUEUE_SIZE", 100),
+            full_policy=config.get("FULL_POLICY", "pending"),
+            block_timeout=config.get("BLOCK_TIMEOUT", 5.0),
+        )
+
+    def _ensure_started(self):
+        # Threads don't survive fork: (re)start lazily in whichever process submits
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._active = 0
+            self._closed = False
+            self._workers = [
+                threading.Thread(target=self._work, name=f"sentiment-worker-{i}", daemon=True)
+                for i in range(self.threads)
+            ]
+            for worker in self._workers:
+                worker.start()
+            self._pid = os.getpid()
+
+    def submit(self, feedback_id) -> bool:
+        """Queue a feedback id (or a list of ids, analyzed as one batch); returns False if left PENDING"""
+        if self._closed:
+            metrics.incr("analysis_pool.dropped")
+            print(f"⚠️ Analysis pool is shut down, feedback {feedback_id} left PENDING")
+            return False
+        self._ensure_started()
+        metrics.incr("analysis_pool.submitted")
+
+        try:
+            if self.full_policy == "block":
+                self._queue.put(feedback_id, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(feedback_id)
+            return True
+        except queue.Full:
+            pass
+
+        if self.full_policy == "inline":
+            metrics.incr("analysis_pool.inline")
+            _run_item(feedback_id)
+            return True
+
+        metrics.incr("analysis_pool.dropped")
+        print(f"⚠️ Analysis queue full ({self.queue_size}), feedback {feedback_id} left PENDING")
+        return False
+
+    def _work(self):
+        while True:
+            feedback_id = self._queue.get()
+            if feedback_id is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                self._active += 1
+            close_old_connections()
+            try:
+                _run_item(feedback_id)
+                metrics.incr("analysis_pool.completed")
+            except Exception:
+                metrics.incr("analysis_pool.failed")
+                print(traceback.format_exc())
+            finally:
+                close_old_connections()
+                with self._lock:
+                    self._active -= 1
+                self._queue.task_done()
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop accepting work, let queued items finish, report anything left behind"""
+        if self._pid != os.getpid() or self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            # Sentinels queue behind the real work so workers drain it first
             try:
-                Feedback.objects.filter(id=feedback_id).update(
-                    sentiment='ERROR',
-                    reasoning=f"Analysis failed: {str(e)[:200]}"
-                )
-            except Exception as update_error:
-                print(f"❌ Could not update feedback {feedback_id} with error status: {update_error}")
-    
-    # Start background thread
-    thread = threading.Thread(target=task)
-    thread.daemon = True
-    thread.start()
\ No newline at end of file
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        for worker in self._workers:
+            worker.join(timeout)
+
+        leftover = []
+        while True:
+            try:
+                feedback_id = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if feedback_id is not None:
+                leftover.append(feedback_id)
+        if leftover:
+            print(f"⚠️ Analysis pool shut down with {len(leftover)} feedback(s) left PENDING: {leftover}")
+
+    def stats(self) -> dict:
+        started = self._pid == os.getpid()
+        return {
+            "threads": self.threads,
+            "queue_size": self.queue_size,
+            "full_policy": self.full_policy,
+            "queue_depth": self._queue.qsize() if started else 0,
+            "active_workers": self._active if started else 0,
+            "alive_workers": sum(worker.is_alive() for worker in self._workers) if started else 0,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_analysis_pool() -> AnalysisPool:
+    """Return this process's analysis pool, creating it from settings on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisPool.from_settings()
+                metrics.register("analysis_pool", _pool.stats)
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def analyze_sentiment_background(feedback_id: int):
+    """
+    Schedule sentiment analysis for a feedback once the current transaction commits.
+
+    With SENTIMENT_QUEUE_BACKEND = "database" a durable SentimentJob row is
+    written in the caller's transaction, so it commits (or rolls back) together
+    with the feedback and a separate run_sentiment_worker process picks it up.
+    Otherwise the id goes to this process's AnalysisPool after commit, so a
+    worker never looks for a row that isn't visible yet.
+    """
+    if getattr(settings, "SENTIMENT_QUEUE_BACKEND", "thread") == "database":
+        from .jobs import enqueue_sentiment_jobs
+        enqueue_sentiment_jobs([feedback_id])
+    else:
+        transaction.on_commit(lambda: get_analysis_pool().submit(feedback_id))
+
+
+def analyze_sentiment_batch_background(feedback_ids: list):
+    """
+    Schedule analysis of many feedbacks as one unit of work (see analyze_sentiment_background)
+    """
+    feedback_ids = list(feedback_ids)
+    if not feedback_ids:
+        return
+    if getattr(settings, "SENTIMENT_QUEUE_BACKEND", "thread") == "database":
+        from .jobs import enqueue_sentiment_jobs
+        enqueue_sentiment_jobs(feedback_ids)
+    else:
+        transaction.on_commit(lambda: get_analysis_pool().submit(feedback_ids))
+
+
+def queue_sentiment_batch(feedback_ids: list) -> bool:
+    """
+    Queue already-committed feedbacks (e.g. an admin re-analysis) as one unit of
+    work right away; returns False if the pool's full policy dropped them
+    """
+    feedback_ids = list(feedback_ids)
+    if not feedback_ids:
+        return True
+    if getattr(settings, "SENTIMENT_QUEUE_BACKEND", "thread") == "database":
+        from .jobs import enqueue_sentiment_jobs
+        enqueue_sentiment_jobs(feedback_ids)
+        return True
+    return get_analysis_pool().submit(feedback_ids)
+
+
+# ==================== EVENT LOOP (ASYNC API VIEWS) ====================
+
+# Strong references: the loop only keeps weak ones to running tasks
+_loop_tasks = set()
+
+
+async def run_sentiment_analysis_async(feedback_id: int):
+    """
+    run_sentiment_analysis() as a coroutine: rules in a worker thread, the LLM awaited on the loop
+    """
+    try:
+        feedback = await Feedback.objects.only('id', 'message').aget(id=feedback_id)
+        result = await analyze_feedback_sentiment_async(feedback.message)
+        if await sync_to_async(save_analysis_results)([feedback], [result]):
+            metrics.incr("analysis_loop.failed")
+        else:
+            metrics.incr("analysis_loop.completed")
+
+    except Feedback.DoesNotExist:
+        print(f"⚠️ Feedback {feedback_id} not found in database")
+    except Exception as e:
+        metrics.incr("analysis_loop.failed")
+        print(f"❌ Error analyzing feedback {feedback_id}: {str(e)}")
+        print(traceback.format_exc())
+        await sync_to_async(mark_analysis_failed)(feedback_id, e)
+
+
+async def analyze_sentiment_async(feedback_id: int):
+    """
+    analyze_sentiment_background() for async views, called after the feedback is saved.
+
+    With the "thread" backend the analysis becomes a task on the running event
+    loop instead of a pool thread; at most SENTIMENT_WORKERS["QUEUE_SIZE"] run
+    at once, beyond that the row is left PENDING. Returns the task, or None.
+    """
+    if getattr(settings, "SENTIMENT_QUEUE_BACKEND", "thread") == "database":
+        await sync_to_async(analyze_sentiment_background)(feedback_id)
+        return None
+
+    limit = getattr(settings, "SENTIMENT_WORKERS", {}).get("QUEUE_SIZE", 100)
+    if len(_loop_tasks) >= limit:
+        metrics.incr("analysis_loop.dropped")
+        print(f"⚠️ {len(_loop_tasks)} analyses already running, feedback {feedback_id} left PENDING")
+        return None
+
+    task = asyncio.get_running_loop().create_task(run_sentiment_analysis_async(feedback_id))
+    _loop_tasks.add(task)
+    task.add_done_callback(_loop_tasks.discard)
+    metrics.incr("analysis_loop.submitted")
+    return task
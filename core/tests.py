@@ -1,3 +1,1184 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import tempfile
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import catalog, events, llm, metrics, tasks
+from .async_views import AsyncFeedbackEventsView, AsyncFeedbackView, AsyncLoginView, AsyncRegisterView
+from .authentication import TokenCache, get_token_cache
+from .backends import TieredRouter, register_backend
+from .cache import LRUCache, SentimentCache
+from .jobs import claim_jobs, enqueue_sentiment_jobs, fail_job, requeue_expired_jobs
+from .matcher import (
+    LexiconMatcher, NEGATION, POSITIVE_PHRASE, NEGATIVE_PHRASE,
+    POSITIVE_KEYWORD, NEGATIVE_KEYWORD,
+)
+from .models import Feedback, Product, SentimentCacheEntry, SentimentJob, SentimentRollup
+from .resilience import CircuitBreaker, Guard
+from .rollups import mark_sentiment_error, save_sentiment_results
+from .tasks import SENTIMENT_FIELDS, AnalysisPool, analyze_sentiment_background
+from .throttling import TokenBucketThrottle
+from .utils import (
+    AnalysisState, EnhancedFeedbackAnalyzer, analyze_feedback_sentiment,
+    analyze_feedback_sentiment_batch, get_analyzer,
+)
+
+WORDS = (
+    "not no never so that too good great excellent nice bad love it very hate "
+    "terrible awful horrible perfect awesome best fine okay worst poor useless "
+    "waste broken the product store price nothing goods salamat po ang ganda"
+).split()
+
+
+def random_corpus(size, seed=1):
+    rnd = random.Random(seed)
+    separators = [' ', ' ', '  ', '\t', ', ', '-', '', '! ']
+    return [
+        ''.join(rnd.choice(WORDS) + rnd.choice(separators) for _ in range(rnd.randint(0, 12)))
+        for _ in range(size)
+    ]
+
+
+class LexiconMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.lexicon = EnhancedFeedbackAnalyzer()
+        self.matcher = self.lexicon.matcher
+
+    def naive_scan(self, text):
+        """One re.search per lexicon entry, as the nodes used to do"""
+        lexicon = self.lexicon
+        return {
+            NEGATION: [rule for rule in lexicon.negation_patterns if re.search(rule[0], text)],
+            POSITIVE_PHRASE: [p for p in lexicon.positive_phrases if re.search(p, text)],
+            NEGATIVE_PHRASE: [p for p in lexicon.negative_phrases if re.search(p, text)],
+            POSITIVE_KEYWORD: [(k, w) for k, w in lexicon.positive_keywords.items()
+                               if re.search(rf'\b{k}\b', text)],
+            NEGATIVE_KEYWORD: [(k, w) for k, w in lexicon.negative_keywords.items()
+                               if re.search(rf'\b{k}\b', text)],
+        }
+
+    def test_single_pass_matches_per_pattern_search(self):
+        for text in random_corpus(3000):
+            text = text.lower()
+            self.assertEqual(self.matcher.scan(text), self.naive_scan(text), text)
+
+    def test_unanchored_and_multiword_entries(self):
+        matcher = LexiconMatcher(
+            [(r'\bnever\s*good\b', "NEGATIVE", 0.9), (r'\bmeh\b|\bso-so\b', "NEUTRAL", 0.5)],
+            [], [],
+            {'ang ganda': 0.8, 'good': 0.7},
+            {'walang kwenta': 0.9},
+        )
+        hits = matcher.scan("nevergood, so-so pero ang ganda, walang  kwenta")
+        self.assertEqual([rule[0] for rule in hits[NEGATION]], [r'\bnever\s*good\b', r'\bmeh\b|\bso-so\b'])
+        self.assertEqual(hits[POSITIVE_KEYWORD], [('ang ganda', 0.8)])
+        self.assertEqual(hits[NEGATIVE_KEYWORD], [])
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set("a", 1, ttl=-1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.hits, cache.misses, cache.expirations), (0, 1, 1))
+
+
+class SentimentCacheTests(TestCase):
+    def test_repeat_feedback_is_served_from_cache(self):
+        analyzer = EnhancedFeedbackAnalyzer()
+        first = analyzer.analyze_feedback("Salamat po, very good!")
+        with mock.patch.object(analyzer, "run_workflow") as run_workflow:
+            second = analyzer.analyze_feedback("  salamat po,   VERY GOOD! ")
+        run_workflow.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_persistent_tier_survives_a_new_process_cache(self):
+        key = SentimentCache.make_key("v1", "rules", "ok")
+        result = {"sentiment": "POSITIVE", "confidence": 0.8, "reasoning": "r", "success": True, "error": ""}
+        SentimentCache(persistent=True).set(key, result, version="v1")
+
+        fresh = SentimentCache(persistent=True)
+        self.assertEqual(fresh.get(key), result)
+        self.assertEqual(fresh.stats()["db_hits"], 1)
+        self.assertEqual(SentimentCacheEntry.objects.count(), 1)
+
+    def test_periodic_purge_drops_expired_and_old_version_rows(self):
+        result = {"sentiment": "POSITIVE", "confidence": 0.8, "reasoning": "r", "success": True, "error": ""}
+        cache = SentimentCache(ttl=60, persistent=True, purge_every=3)
+        cache.set(SentimentCache.make_key("v1", "rules", "old version"), result, version="v1")
+        cache.set(SentimentCache.make_key("v2", "rules", "expired"), result, version="v2")
+        SentimentCacheEntry.objects.filter(analyzer_version="v2").update(
+            created_at=timezone.now() - timedelta(seconds=120))
+
+        cache.set(SentimentCache.make_key("v2", "rules", "fresh"), result, version="v2")
+        self.assertEqual(list(SentimentCacheEntry.objects.values_list("analyzer_version", flat=True)), ["v2"])
+        self.assertEqual(cache.stats()["db_purged"], 2)
+
+
+class AnalysisPoolTests(SimpleTestCase):
+    def full_pool(self, policy):
+        # No worker threads, so the single queue slot stays occupied
+        pool = AnalysisPool(threads=0, queue_size=1, full_policy=policy, block_timeout=0.01)
+        self.assertTrue(pool.submit(1))
+        return pool
+
+    def test_pending_policy_leaves_row_for_later(self):
+        pool = self.full_pool("pending")
+        with mock.patch("core.tasks.run_sentiment_analysis") as run:
+            self.assertFalse(pool.submit(2))
+        run.assert_not_called()
+        self.assertEqual(pool.stats()["queue_depth"], 1)
+
+    def test_inline_policy_runs_in_caller(self):
+        pool = self.full_pool("inline")
+        with mock.patch("core.tasks.run_sentiment_analysis") as run:
+            self.assertTrue(pool.submit(2))
+        run.assert_called_once_with(2)
+
+    def test_block_policy_gives_up_after_timeout(self):
+        pool = self.full_pool("block")
+        self.assertFalse(pool.submit(2))
+
+    def test_workers_drain_queue(self):
+        pool = AnalysisPool(threads=2, queue_size=10)
+        with mock.patch("core.tasks.run_sentiment_analysis") as run:
+            for feedback_id in range(5):
+                pool.submit(feedback_id)
+            pool.shutdown()
+        self.assertEqual(sorted(call.args[0] for call in run.call_args_list), list(range(5)))
+        self.assertEqual(pool.stats()["alive_workers"], 0)
+
+
+@override_settings(SENTIMENT_QUEUE_BACKEND="database")
+class SentimentJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("juan", "juan@example.com", "pw")
+        self.feedback = Feedback.objects.create(user=self.user, message="Not bad for the price")
+
+    def test_thread_backend_submits_only_after_commit(self):
+        with override_settings(SENTIMENT_QUEUE_BACKEND="thread"), \
+                mock.patch("core.tasks.get_analysis_pool") as get_pool:
+            with self.captureOnCommitCallbacks(execute=True):
+                analyze_sentiment_background(self.feedback.id)
+                get_pool.return_value.submit.assert_not_called()
+        get_pool.return_value.submit.assert_called_once_with(self.feedback.id)
+
+    def test_claim_is_exclusive(self):
+        analyze_sentiment_background(self.feedback.id)
+        jobs = claim_jobs("w1", batch_size=10)
+        self.assertEqual([job.feedback_id for job in jobs], [self.feedback.id])
+        self.assertEqual((jobs[0].status, jobs[0].attempts), ("RUNNING", 1))
+        self.assertEqual(claim_jobs("w2", batch_size=10), [])
+
+    @override_settings(SENTIMENT_JOBS={"MAX_ATTEMPTS": 2, "BACKOFF_SECONDS": 10})
+    def test_failures_back_off_then_give_up(self):
+        enqueue_sentiment_jobs([self.feedback.id])
+        job = claim_jobs("w1", batch_size=1)[0]
+        self.assertTrue(fail_job(job, RuntimeError("boom")))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertGreater(job.run_after, timezone.now())
+
+        SentimentJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        job = claim_jobs("w1", batch_size=1)[0]
+        self.assertFalse(fail_job(job, RuntimeError("boom")))
+        self.feedback.refresh_from_db()
+        self.assertEqual(self.feedback.sentiment, "ERROR")
+
+    def test_expired_lease_is_requeued(self):
+        enqueue_sentiment_jobs([self.feedback.id])
+        claim_jobs("w1", batch_size=1, lease_seconds=60)
+        SentimentJob.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(requeue_expired_jobs(), 1)
+        self.assertEqual(len(claim_jobs("w2", batch_size=1)), 1)
+
+    def test_worker_command_processes_queue(self):
+        enqueue_sentiment_jobs([self.feedback.id])
+        call_command("run_sentiment_worker", "--once", stdout=io.StringIO())
+        self.feedback.refresh_from_db()
+        self.assertEqual(self.feedback.sentiment, "POSITIVE")
+        self.assertEqual(SentimentJob.objects.get().status, "DONE")
+
+    def test_worker_retries_failed_analysis_instead_of_saving_it(self):
+        enqueue_sentiment_jobs([self.feedback.id])
+        with mock.patch("core.utils.get_router", side_effect=RuntimeError("rules tier down")):
+            call_command("run_sentiment_worker", "--once", stdout=io.StringIO())
+        job = SentimentJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ("QUEUED", 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn("rules tier down", job.last_error)
+        self.feedback.refresh_from_db()
+        self.assertEqual(self.feedback.sentiment, "PENDING")
+        self.assertIsNone(self.feedback.analyzed_at)
+
+
+class ReanalyzeFeedbackCommandTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("maria", "maria@example.com", "pw")
+        self.feedbacks = Feedback.objects.bulk_create([
+            Feedback(user=user, message="I love this store!", sentiment="NEUTRAL"),
+            Feedback(user=user, message="Waste of money", sentiment="NEUTRAL"),
+            Feedback(user=user, message="ok lang", sentiment="ERROR"),
+        ])
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+
+    def reanalyze(self, *args):
+        call_command("reanalyze_feedback", "--workers", "1", "--range-size", "2",
+                     "--checkpoint", self.checkpoint, *args, stdout=io.StringIO())
+
+    def test_filters_and_writes_back(self):
+        self.reanalyze("--sentiment", "NEUTRAL")
+        rows = {f.message: f for f in Feedback.objects.all()}
+        self.assertEqual(rows["I love this store!"].sentiment, "POSITIVE")
+        self.assertEqual(rows["Waste of money"].sentiment, "NEGATIVE")
+        self.assertEqual(rows["Waste of money"].analyzer_version, get_analyzer().version)
+        self.assertEqual(rows["ok lang"].sentiment, "ERROR")
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resumes_from_checkpoint(self):
+        step = 2
+        done = [[f.id // step * step, f.id // step * step + step] for f in self.feedbacks[:1]]
+        filters = {"sentiment": [], "since": None, "until": None, "analyzer_version": None, "outdated": False}
+        with open(self.checkpoint, "w") as f:
+            json.dump({"filters": filters, "done": done, "rows": 1}, f)
+
+        self.reanalyze()
+        skipped = {pk for low, high in done for pk in range(low, high)}
+        for feedback in Feedback.objects.all():
+            self.assertEqual(feedback.analyzer_version != "", feedback.id not in skipped, feedback.message)
+
+    def test_failed_analysis_keeps_the_stored_verdict(self):
+        def analyze(texts):
+            return [{"sentiment": "NEUTRAL", "confidence": 0.5, "reasoning": "Workflow failed: boom",
+                     "success": False, "error": "boom"} if text == "Waste of money" else
+                    {"sentiment": "POSITIVE", "confidence": 0.9, "reasoning": "r", "success": True}
+                    for text in texts]
+
+        stdout = io.StringIO()
+        with mock.patch("core.management.commands.reanalyze_feedback.analyze_feedback_sentiment_batch", analyze):
+            call_command("reanalyze_feedback", "--workers", "1", "--checkpoint", self.checkpoint,
+                         "--sentiment", "NEUTRAL", stdout=stdout)
+        rows = {f.message: f for f in Feedback.objects.all()}
+        self.assertEqual(rows["I love this store!"].sentiment, "POSITIVE")
+        self.assertEqual((rows["Waste of money"].sentiment, rows["Waste of money"].analyzed_at), ("NEUTRAL", None))
+        self.assertIn("1 analysis(es) failed", stdout.getvalue())
+
+        # The pool's batch path: an analyzed row keeps its verdict, a new one becomes ERROR
+        pending = Feedback.objects.create(user=rows["ok lang"].user, message="Waste of money")
+        with mock.patch("core.tasks.analyze_feedback_sentiment_batch", analyze):
+            tasks.run_sentiment_analysis_batch([rows["Waste of money"].id, pending.id])
+        self.assertEqual(Feedback.objects.get(id=rows["Waste of money"].id).sentiment, "NEUTRAL")
+        pending.refresh_from_db()
+        self.assertEqual((pending.sentiment, pending.reasoning), ("ERROR", "Analysis failed: boom"))
+
+
+class BatchAnalysisTests(SimpleTestCase):
+    def test_batch_matches_single_calls_and_dedupes(self):
+        texts = ["I love this store!", "ok", "  OK ", "Not bad for the price", "ok"]
+        analyzer = get_analyzer()
+        analyzer.cache.clear()
+        with mock.patch.object(analyzer, "run_workflow", wraps=analyzer.run_workflow) as run_workflow:
+            results = analyze_feedback_sentiment_batch(texts)
+        self.assertEqual(run_workflow.call_count, 3)
+        self.assertEqual(results, [analyze_feedback_sentiment(text) for text in texts])
+
+
+class FeedbackBulkViewTests(TestCase):
+    def setUp(self):
+        # Fresh throttle buckets: uploads are charged per item
+        cache.clear()
+        self.user = User.objects.create_user("ana", "ana@example.com", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_json_array_with_per_item_errors(self):
+        with mock.patch("core.tasks.get_analysis_pool") as get_pool, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/feedback/bulk/", [
+                {"message": "Masarap!"}, {"message": ""}, {"message": "Sulit"},
+            ], format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 1))
+        self.assertEqual([item["index"] for item in response.data["results"]], [0, 1, 2])
+        self.assertIn("message", response.data["results"][1]["errors"])
+        ids = [response.data["results"][0]["id"], response.data["results"][2]["id"]]
+        get_pool.return_value.submit.assert_called_once_with(ids)
+        self.assertEqual(Feedback.objects.filter(user=self.user).count(), 2)
+
+    def test_ndjson_stream(self):
+        body = b'{"message": "ok"}\n\n{"message": "salamat po"}\n'
+        with mock.patch("core.tasks.get_analysis_pool"):
+            response = self.client.post("/api/feedback/bulk/", body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+
+    def test_empty_input_is_a_plain_400(self):
+        for body, content_type in ((b"[]", "application/json"), (b"\n\n", "application/x-ndjson"),
+                                   (b"", "application/x-ndjson")):
+            response = self.client.post("/api/feedback/bulk/", body, content_type=content_type)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn("error", response.data)
+        self.assertFalse(Feedback.objects.exists())
+
+    @override_settings(FEEDBACK_BULK_MAX_ITEMS=2)
+    def test_item_limit(self):
+        body = b'{"message": "a"}\n{"message": "b"}\n{"message": "c"}\n'
+        response = self.client.post("/api/feedback/bulk/", body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 413)
+        response = self.client.post("/api/feedback/bulk/", [{"message": "a"}] * 3, format="json")
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Feedback.objects.exists())
+
+
+@override_settings(FEEDBACK_PAGE_SIZE=2)
+class FeedbackListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("lito", "lito@example.com", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        created_at = timezone.now()
+        self.feedbacks = Feedback.objects.bulk_create(
+            [Feedback(user=self.user, message=f"feedback {i}") for i in range(5)]
+        )
+        # Same timestamp for all rows: the id tiebreaker must still page correctly
+        Feedback.objects.update(created_at=created_at)
+
+    def test_cursor_walks_every_row_once(self):
+        seen = []
+        url = "/api/feedback/"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, sorted((f.id for f in self.feedbacks), reverse=True))
+
+    def test_unchanged_page_returns_304(self):
+        response = self.client.get("/api/feedback/")
+        self.assertIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/api/feedback/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Feedback.objects.create(user=self.user, message="new one")
+        self.assertEqual(self.client.get("/api/feedback/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_bad_cursor_is_404(self):
+        self.assertEqual(self.client.get("/api/feedback/?cursor=nope").status_code, 404)
+
+
+def fake_llm_transport(calls, sentiment="POSITIVE"):
+    import httpx
+
+    def handler(request):
+        calls.append(json.loads(request.content)["messages"][0]["content"])
+        content = json.dumps({"sentiment": sentiment, "confidence": 0.8, "reasoning": "fake"})
+        return httpx.Response(200, json={
+            "id": "x", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+        })
+    return httpx.MockTransport(handler)
+
+
+class LLMClientTests(SimpleTestCase):
+    def setUp(self):
+        llm.reset_llm_clients()
+        self.addCleanup(llm.reset_llm_clients)
+        self.analyzer = EnhancedFeedbackAnalyzer()
+
+    @mock.patch.dict(os.environ, {"OPENROUTER_API_KEY": "x"})
+    def test_sync_client_is_shared(self):
+        self.assertIs(llm.get_llm_client(), llm.get_llm_client())
+
+    def test_async_calls_share_one_client_and_cache(self):
+        import httpx
+        from openai import AsyncOpenAI
+
+        calls = []
+
+        async def run():
+            client = AsyncOpenAI(api_key="x", base_url="http://llm.test/v1",
+                                 http_client=httpx.AsyncClient(transport=fake_llm_transport(calls)))
+            llm._async_clients[asyncio.get_running_loop()] = (client, asyncio.Semaphore(2))
+            return await asyncio.gather(*(
+                self.analyzer.analyze_with_llm_async(text) for text in ["nice", "also nice", "nice"]
+            ))
+
+        results = asyncio.run(run())
+        self.assertEqual([r["source"] for r in results], ["llm"] * 3)
+        self.assertEqual(results[0]["sentiment"], "POSITIVE")
+        self.assertGreaterEqual(len(calls), 2)
+
+    def test_async_failure_falls_back_to_rules(self):
+        async def run():
+            with mock.patch.object(llm, "complete_async", side_effect=RuntimeError("down")):
+                return await self.analyzer.analyze_with_llm_async("The product is very good")
+
+        result = asyncio.run(run())
+        self.assertNotEqual(result.get("source"), "llm")
+        self.assertEqual(result["sentiment"], "POSITIVE")
+
+    def test_cancelled_probe_is_released(self):
+        breaker = self.analyzer.llm_guard.breaker
+        breaker.failure_threshold, breaker.cooldown = 1, 0
+        breaker.record_failure()
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        async def run():
+            with mock.patch.object(llm, "complete_async", hang):
+                task = asyncio.create_task(self.analyzer.analyze_with_llm_async("The product is very good"))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(run())
+        self.assertEqual(breaker.stats()["state"], "half_open")
+        self.assertTrue(breaker.allow())
+
+
+class LLMBatcherTests(SimpleTestCase):
+    def test_parse_batch_reply_keeps_only_usable_answers(self):
+        reply = 'Sure! [{"id": 2, "sentiment": "negative", "confidence": 0.7, "reasoning": "r"},' \
+                ' {"id": 2, "sentiment": "POSITIVE"}, {"id": 3, "sentiment": "MEH"}, "junk"]'
+        results = llm.parse_batch_reply(reply, 3)
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1]["sentiment"], "NEGATIVE")
+        self.assertIsNone(results[2])
+        self.assertEqual(llm.parse_batch_reply("not json", 2), [None, None])
+
+    def test_only_failed_items_fall_back(self):
+        fallback = mock.Mock(side_effect=lambda text: {"sentiment": "NEUTRAL", "source": "rules"})
+        batcher = llm.LLMBatcher("m", fallback, max_items=3)
+        answer = {"sentiment": "POSITIVE", "source": "llm"}
+        with mock.patch.object(llm, "complete_many", return_value=[answer, None, answer]):
+            results = batcher.send(["a", "b", "c"])
+        fallback.assert_called_once_with("b")
+        self.assertEqual([r["source"] for r in results], ["llm", "rules", "llm"])
+
+        with mock.patch.object(llm, "complete_many", side_effect=RuntimeError("boom")):
+            batcher.send(["a", "b"])
+        self.assertEqual(fallback.call_count, 3)
+
+    def test_batch_deadline_bounds_the_fallbacks(self):
+        guard = Guard("t", CircuitBreaker("t", failure_threshold=5, cooldown=60), deadline=0.2)
+        fallback = mock.Mock(side_effect=lambda text: time.sleep(1 if text == "slow" else 0) or {"source": "llm"})
+        rules = mock.Mock(side_effect=lambda text: {"source": "rules"})
+        batcher = llm.LLMBatcher("m", fallback, max_items=3, guard=guard, rules=rules)
+
+        with mock.patch.object(llm, "complete_many", side_effect=lambda *a, **k: time.sleep(0.5)):
+            results = batcher.send(["a", "b"])
+        fallback.assert_not_called()
+        self.assertEqual([r["source"] for r in results], ["rules", "rules"])
+
+        started = time.monotonic()
+        with mock.patch.object(llm, "complete_many", return_value=[None, None, {"source": "llm"}]):
+            results = batcher.send(["slow", "quick", "c"])
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual([r["source"] for r in results], ["rules", "llm", "llm"])
+        self.assertEqual(batcher.stats()["late"], 3)
+
+    @mock.patch.dict(os.environ, {"OPENROUTER_API_KEY": "x"})
+    def test_single_feedbacks_share_prompts(self):
+        requests = []
+
+        def complete_many(model, texts, timeout=None):
+            requests.append(texts)
+            return [{"sentiment": "POSITIVE", "confidence": 0.8, "reasoning": "fake", "source": "llm"}] * len(texts)
+
+        texts = [f"The staff was there on day {i}" for i in range(10)]
+        with override_settings(LLM_BATCH={"MAX_ITEMS": 10, "MAX_WAIT_MS": 500}), \
+                mock.patch("core.utils._analyzer", EnhancedFeedbackAnalyzer()), \
+                mock.patch("core.utils._router", TieredRouter(["rules", "llm"])), \
+                mock.patch.object(llm, "complete_many", side_effect=complete_many), \
+                mock.patch.object(llm, "complete", side_effect=AssertionError("one request per feedback")):
+            with ThreadPoolExecutor(max_workers=10) as pool:
+                results = list(pool.map(lambda text: analyze_feedback_sentiment(text, use_llm=True), texts))
+        self.assertEqual([r["tier"] for r in results], ["llm"] * 10)
+        self.assertEqual(len(requests), 1)
+        self.assertCountEqual(requests[0], texts)
+
+    def test_concurrent_submits_share_one_request(self):
+        batcher = llm.LLMBatcher("m", mock.Mock(), max_items=4, max_wait=5)
+        with mock.patch.object(llm, "complete_many",
+                               side_effect=lambda model, texts: [{"text": t} for t in texts]) as many:
+            futures = [batcher.submit(text) for text in "wxyz"]
+            self.assertEqual([f.result(timeout=5)["text"] for f in futures], list("wxyz"))
+        many.assert_called_once_with("m", list("wxyz"))
+
+
+class FakeBackend:
+    def __init__(self, answers, source=None):
+        self.answers = answers
+        self.source = source
+        self.seen = []
+
+    def available(self):
+        return True
+
+    def analyze_batch(self, texts):
+        self.seen += texts
+        return [dict(self.answers[text], **({"source": self.source} if self.source else {})) for text in texts]
+
+
+class TieredRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.rules = FakeBackend({
+            "love it": {"sentiment": "POSITIVE", "confidence": 0.9},
+            "meh": {"sentiment": "NEUTRAL", "confidence": 0.9},
+            "hmm": {"sentiment": "NEGATIVE", "confidence": 0.4},
+        })
+        self.llm = FakeBackend({
+            "meh": {"sentiment": "POSITIVE", "confidence": 0.8},
+            "hmm": {"sentiment": "NEGATIVE", "confidence": 0.95},
+        }, source="fake-llm")
+        register_backend("fake-rules", self.rules)
+        register_backend("fake-llm", self.llm)
+        self.router = TieredRouter(["fake-rules", "fake-llm"], threshold=0.7)
+
+    def test_only_uncertain_rows_escalate(self):
+        results = self.router.analyze_batch(["love it", "meh", "hmm"])
+        self.assertEqual(self.llm.seen, ["meh", "hmm"])
+        self.assertEqual([r["tier"] for r in results], ["fake-rules", "fake-llm", "fake-llm"])
+        self.assertEqual(results[1]["sentiment"], "POSITIVE")
+        self.assertAlmostEqual(self.router.stats()["escalation_rate"], 2 / 3)
+
+    def test_first_tier_only(self):
+        results = self.router.analyze_batch(["meh"], max_tier=1)
+        self.assertEqual(self.llm.seen, [])
+        self.assertEqual(results[0]["tier"], "fake-rules")
+
+    def test_fallback_answer_keeps_earlier_verdict(self):
+        self.llm.source = "rules"
+        result = self.router.analyze("hmm")
+        self.assertEqual((result["tier"], result["confidence"]), ("fake-rules", 0.4))
+
+    def test_no_available_tier_falls_back_to_rules(self):
+        self.rules.available = self.llm.available = lambda: False
+        result = self.router.analyze("I love this store!")
+        self.assertEqual((result["tier"], result["sentiment"]), ("rules", "POSITIVE"))
+        self.assertEqual(self.rules.seen + self.llm.seen, [])
+
+    def test_default_path_is_rules_tier(self):
+        result = analyze_feedback_sentiment("I love this store!")
+        self.assertEqual(result["tier"], "rules")
+
+
+class ResilienceTests(SimpleTestCase):
+    def test_breaker_opens_then_probes(self):
+        breaker = CircuitBreaker("t", failure_threshold=2, cooldown=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()["state"], "open")
+
+        breaker.cooldown = 0
+        self.assertTrue(breaker.allow())   # the one half-open probe
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.stats()["state"], "closed")
+
+    def test_deadline_falls_back_and_trips_breaker(self):
+        guard = Guard("t", CircuitBreaker("t", failure_threshold=1), deadline=0.05)
+        result = guard.run(lambda: time.sleep(1) or "llm", lambda: "rules")
+        self.assertEqual(result, "rules")
+        self.assertEqual(guard.stats()["timeouts"], 1)
+        self.assertEqual(guard.breaker.stats()["state"], "open")
+
+        primary = mock.Mock(return_value="llm")
+        self.assertEqual(guard.run(primary, lambda: "rules"), "rules")
+        primary.assert_not_called()
+
+    def fast_history(self, guard):
+        for _ in range(20):
+            guard.latency.record(0.01)
+        return guard
+
+    def test_hedges_fire_after_recent_p95(self):
+        guard = Guard("t", CircuitBreaker("t"), deadline=2, hedge="fallback", hedge_min_delay=0.01)
+        self.assertEqual(guard.hedge_delay(), 1)   # no history yet: half the budget
+        self.fast_history(guard)
+        self.assertEqual(guard.run(lambda: time.sleep(0.5) or "llm", lambda: "rules"), "rules")
+
+        calls = iter([0.5, 0])
+        guard = self.fast_history(Guard("t", CircuitBreaker("t"), deadline=2, hedge="request", hedge_min_delay=0.01))
+        result = guard.run(lambda: time.sleep(next(calls)) or "llm", lambda: "rules")
+        self.assertEqual(result, "llm")
+        self.assertEqual((guard.stats()["hedges"], guard.stats()["hedge_win_rate"]), (1, 1.0))
+
+    def test_hung_primary_still_counts_when_the_fallback_hedge_wins(self):
+        guard = self.fast_history(Guard("t", CircuitBreaker("t", failure_threshold=2), deadline=0.1,
+                                        hedge="fallback", hedge_min_delay=0.01))
+        for _ in range(2):
+            self.assertEqual(guard.run(lambda: time.sleep(0.3) or "llm", lambda: "rules"), "rules")
+        time.sleep(0.15)
+        self.assertEqual(guard.breaker.stats()["state"], "open")
+
+    def test_probe_lost_to_the_hedge_is_released(self):
+        breaker = CircuitBreaker("t", failure_threshold=1, cooldown=0)
+        guard = self.fast_history(Guard("t", breaker, deadline=0.1, hedge="fallback", hedge_min_delay=0.01))
+        breaker.record_failure()
+        self.assertEqual(guard.run(lambda: time.sleep(0.3) or "llm", lambda: "rules"), "rules")
+        time.sleep(0.15)
+        # The probe timed out: re-opened, and after the cool-down the next call probes again
+        self.assertEqual(guard.run(lambda: "llm", lambda: "rules"), "llm")
+        self.assertEqual(breaker.stats()["state"], "closed")
+
+
+class SentimentRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("tindera", "t@example.com", "pw")
+        self.other = User.objects.create_user("suki", "s@example.com", "pw")
+
+    def analyze(self, feedback, sentiment, confidence):
+        feedback.sentiment, feedback.confidence = sentiment, confidence
+        save_sentiment_results([feedback], SENTIMENT_FIELDS)
+
+    def buckets(self, user=None):
+        return {
+            (row.sentiment, row.count, round(row.confidence_sum, 2))
+            for row in SentimentRollup.objects.filter(user=user) if row.count
+        }
+
+    def test_reanalysis_moves_bucket_and_rebuild_agrees(self):
+        first = Feedback.objects.create(user=self.user, message="good")
+        second = Feedback.objects.create(user=self.other, message="bad")
+        self.analyze(first, "POSITIVE", 0.8)
+        self.analyze(second, "NEGATIVE", 0.9)
+        self.analyze(first, "NEGATIVE", 0.6)   # reanalysis
+        mark_sentiment_error([second.id], "boom")
+
+        self.assertEqual(self.buckets(), {("NEGATIVE", 1, 0.6)})
+        self.assertEqual(self.buckets(self.user), {("NEGATIVE", 1, 0.6)})
+        self.assertEqual(self.buckets(self.other), set())
+
+        incremental = self.buckets()
+        call_command("rebuild_sentiment_rollups", stdout=io.StringIO())
+        self.assertEqual(self.buckets(), incremental)
+
+    def test_stats_endpoint_reads_rollups(self):
+        feedback = Feedback.objects.create(user=self.user, message="good")
+        self.analyze(feedback, "POSITIVE", 0.8)
+        Feedback.objects.create(user=self.other, message="pending")
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = client.get("/api/stats/sentiment/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["totals"]["POSITIVE"], {"count": 1, "avg_confidence": 0.8})
+        self.assertEqual(response.data["days"][0]["day"], timezone.localdate().isoformat())
+
+        client.force_authenticate(self.other)
+        self.assertEqual(client.get("/api/stats/sentiment/").data["totals"]["POSITIVE"]["count"], 0)
+        self.assertEqual(client.get("/api/stats/sentiment/?since=nope").status_code, 400)
+
+    def test_deleting_feedback_leaves_its_buckets(self):
+        kept = Feedback.objects.create(user=self.user, message="good")
+        gone = Feedback.objects.create(user=self.user, message="great")
+        other = Feedback.objects.create(user=self.other, message="bad")
+        self.analyze(kept, "POSITIVE", 0.8)
+        self.analyze(gone, "POSITIVE", 0.6)
+        self.analyze(other, "NEGATIVE", 0.9)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get("/api/stats/sentiment/").data["totals"]["POSITIVE"]["count"], 2)
+        # Loaded before a reanalysis: the stored verdict is what leaves its bucket
+        stale = Feedback.objects.get(id=gone.id)
+        self.analyze(gone, "NEGATIVE", 0.7)
+        stale.delete()
+        totals = client.get("/api/stats/sentiment/").data["totals"]
+        self.assertEqual((totals["POSITIVE"], totals["NEGATIVE"]["count"]), ({"count": 1, "avg_confidence": 0.8}, 0))
+
+        Feedback.objects.filter(id=kept.id).delete()
+        self.assertEqual(self.buckets(self.user), set())
+        self.other.delete()
+        self.assertEqual(self.buckets(), set())
+        self.assertFalse(SentimentRollup.objects.filter(count__lt=0).exists())
+
+
+class FeedbackAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("owner", "owner@example.com", "pw")
+        self.client.force_login(self.admin)
+        self.url = "/admin/core/feedback/"
+
+    def add_feedback(self, count):
+        start = User.objects.count()
+        users = [User.objects.create_user(f"suki{start + i}") for i in range(count)]
+        Feedback.objects.bulk_create([Feedback(user=user, message=f"msg {i}") for i, user in enumerate(users)])
+
+    def changelist_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_stays_flat(self):
+        self.add_feedback(3)
+        small = self.changelist_queries()
+        self.add_feedback(30)
+        self.assertEqual(self.changelist_queries(), small)
+
+    def test_user_filter_and_reanalyze_action(self):
+        self.add_feedback(2)
+        username = Feedback.objects.first().user.username
+        response = self.client.get(self.url, {"user": username})
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+        ids = list(Feedback.objects.values_list("id", flat=True))
+        with mock.patch("core.tasks.get_analysis_pool") as get_pool:
+            get_pool.return_value.submit.return_value = True
+            response = self.client.post(self.url, {"action": "reanalyze_selected", "_selected_action": ids},
+                                        follow=True)
+            get_pool.return_value.submit.assert_called_once()
+            self.assertCountEqual(get_pool.return_value.submit.call_args[0][0], ids)
+            self.assertEqual([m.level_tag for m in response.context["messages"]], ["success"])
+
+            # The "pending" full policy drops the chunk: say so instead of reporting success
+            get_pool.return_value.submit.return_value = False
+            response = self.client.post(self.url, {"action": "reanalyze_selected", "_selected_action": ids},
+                                        follow=True)
+        [message] = response.context["messages"]
+        self.assertEqual(message.level_tag, "warning")
+        self.assertIn("2 feedback(s) were not queued", str(message))
+
+
+@override_settings(FEEDBACK_PAGE_SIZE=2)
+class FeedbackSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("aling", "a@example.com", "pw")
+        other = User.objects.create_user("mang", "m@example.com", "pw")
+        Feedback.objects.bulk_create(
+            [Feedback(user=self.user, message=f"Masarap ang pandesal {i}") for i in range(3)]
+            + [Feedback(user=self.user, message="Mabagal ang sukli"),
+               Feedback(user=other, message="Masarap ang pandesal nila")]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_matches_all_terms_in_own_feedback_with_pages(self):
+        first = self.client.get("/api/feedback/search/", {"q": "pandesal masarap"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data["results"]), 2)
+        self.assertIn("rank", first.data["results"][0])
+        second = self.client.get(first.data["next"])
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertIsNone(second.data["next"])
+
+        messages = {r["message"] for r in first.data["results"] + second.data["results"]}
+        self.assertEqual(messages, {f"Masarap ang pandesal {i}" for i in range(3)})
+
+    def test_rejects_empty_query_and_deep_pages(self):
+        self.assertEqual(self.client.get("/api/feedback/search/").status_code, 400)
+        self.assertEqual(self.client.get("/api/feedback/search/", {"q": "x", "page": 999}).status_code, 404)
+
+
+class ProductCatalogTests(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        self.client = APIClient()
+
+    def test_seeded_catalog_filtered_by_category(self):
+        response = self.client.get("/api/products/", {"category": "drinks"})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body["category"], "drinks")
+        self.assertTrue(body["products"])
+        self.assertEqual({p["category"] for p in body["products"]}, {"drinks"})
+        self.assertEqual(len(json.loads(self.client.get("/api/products/").content)["products"]),
+                         Product.objects.filter(is_active=True).count())
+        self.assertEqual(self.client.get("/api/products/", {"category": "guns"}).status_code, 400)
+
+    def test_cached_until_a_product_is_saved(self):
+        first = self.client.get("/api/products/", {"category": "meals"})
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/products/", {"category": "meals"})
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        Product.objects.create(name="Pancit Canton", category="meals", price="₱20")
+        updated = self.client.get("/api/products/", {"category": "meals"})
+        self.assertNotEqual(updated["ETag"], first["ETag"])
+        self.assertIn("Pancit Canton", [p["name"] for p in json.loads(updated.content)["products"]])
+
+    def test_strong_etag_and_gzip(self):
+        plain = self.client.get("/api/products/")
+        self.assertFalse(plain["ETag"].startswith("W/"))
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        gzipped = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip;q=1, br;q=0")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertNotEqual(gzipped["ETag"], plain["ETag"])
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+
+        cached = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzipped["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], gzipped["ETag"])
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user("tindera", "t@example.com", "pw", is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_warm_requests_run_no_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/metrics/").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.data["token_auth_cache"]["hits"], 1)
+
+    def test_password_change_deactivation_and_token_delete_evict(self):
+        self.client.get("/api/metrics/")
+        self.user.set_password("new-pw")
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.client.get("/api/metrics/")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get("/api/metrics/")
+        self.token.delete()
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 401)
+
+    def test_shared_tier_warms_other_workers(self):
+        first, second = TokenCache(shared_alias="default"), TokenCache(shared_alias="default")
+        first.set(self.token.key, Token.objects.select_related("user").get(key=self.token.key))
+        with self.assertNumQueries(0):
+            self.assertEqual(second.get(self.token.key).user.username, "tindera")
+        self.assertEqual(second.stats()["shared_hits"], 1)
+        first.delete(self.token.key)
+        self.assertIsNone(TokenCache(shared_alias="default").get(self.token.key))
+
+
+class ThrottlingTests(TestCase):
+    RATES = {"auth_ip": "3/min", "auth_user": "100/min", "feedback_user": "2/min", "feedback_ip": "100/min"}
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(TokenBucketThrottle, "THROTTLE_RATES", self.RATES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def login(self, ip):
+        return self.client.post("/api/login/", {"username": "nobody", "password": "x"}, format="json",
+                                REMOTE_ADDR=ip)
+
+    def test_auth_burst_per_ip_gets_429_with_retry_after(self):
+        throttled_before = metrics.snapshot()["counters"].get("throttle.auth_ip", 0)
+        for _ in range(3):
+            self.assertEqual(self.login("10.0.0.1").status_code, 401)
+        refused = self.login("10.0.0.1")
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused["Retry-After"], "20")
+        # Another client is unaffected
+        self.assertEqual(self.login("10.0.0.2").status_code, 401)
+        self.assertEqual(metrics.snapshot()["counters"]["throttle.auth_ip"], throttled_before + 1)
+
+    def test_bucket_refills_at_the_average_rate(self):
+        for _ in range(3):
+            self.login("10.0.0.1")
+        now = time.time()
+        with mock.patch.object(TokenBucketThrottle, "timer", return_value=now + 21):
+            self.assertEqual(self.login("10.0.0.1").status_code, 401)
+            self.assertEqual(self.login("10.0.0.1").status_code, 429)
+
+    def test_feedback_posts_throttled_per_user_but_not_polling(self):
+        user = User.objects.create_user("suki", "s@example.com", "pw")
+        self.client.force_authenticate(user)
+        with mock.patch("core.views.analyze_sentiment_background"):
+            codes = [self.client.post("/api/feedback/", {"message": "Sulit"}, format="json").status_code
+                     for _ in range(3)]
+        self.assertEqual(codes, [201, 201, 429])
+        self.assertEqual(self.client.get("/api/feedback/").status_code, 200)
+
+    def test_bulk_upload_is_charged_per_item(self):
+        user = User.objects.create_user("suki", "s@example.com", "pw")
+        self.client.force_authenticate(user)
+
+        def upload(count):
+            return self.client.post("/api/feedback/bulk/", [{"message": f"Sulit {i}"} for i in range(count)],
+                                    format="json")
+
+        with mock.patch("core.views.analyze_sentiment_batch_background"):
+            self.assertEqual(upload(1).status_code, 201)
+            refused = upload(2)
+            self.assertEqual((refused.status_code, refused["Retry-After"]), (429, "30"))
+            self.assertEqual(upload(1).status_code, 201)
+            # Bigger than the bucket: allowed from a full one, and it empties it
+            with mock.patch.object(TokenBucketThrottle, "timer", return_value=time.time() + 60):
+                self.assertEqual(upload(5).status_code, 201)
+                self.assertEqual(upload(1).status_code, 429)
+        self.assertEqual(Feedback.objects.filter(user=user).count(), 7)
+
+
+class FeedbackListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("nena", "n@example.com", "pw")
+        self.feedback = Feedback.objects.create(user=self.user, message="Fresh pandesal")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeat_poll_runs_no_queries(self):
+        first = self.client.get("/api/feedback/")
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/feedback/")
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_new_feedback_and_sentiment_saves_invalidate(self):
+        self.client.get("/api/feedback/")
+        with mock.patch("core.views.analyze_sentiment_batch_background"):
+            self.client.post("/api/feedback/bulk/", [{"message": "Bulk one"}], format="json")
+        self.assertEqual(len(self.client.get("/api/feedback/").data["results"]), 2)
+
+        before = self.client.get("/api/feedback/")["Last-Modified"]
+        self.feedback.sentiment, self.feedback.confidence = "POSITIVE", 0.9
+        self.feedback.analyzed_at = timezone.now() + timedelta(days=1)
+        save_sentiment_results([self.feedback], ["sentiment", "confidence", "analyzed_at"])
+        self.assertNotEqual(self.client.get("/api/feedback/")["Last-Modified"], before)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_token_cache().clear()
+        self.factory = AsyncRequestFactory()
+
+    def post(self, view, data, **extra):
+        request = self.factory.post("/api/", json.dumps(data), content_type="application/json", **extra)
+        return view.as_view()(request)
+
+    async def test_register_login_and_submit_feedback(self):
+        response = await self.post(AsyncRegisterView, {"username": "ising", "email": "i@example.com",
+                                                        "password": "pw-ising-1"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((await self.post(AsyncRegisterView, {"username": "ising", "email": "x@example.com",
+                                                              "password": "pw"})).status_code, 400)
+
+        self.assertEqual((await self.post(AsyncLoginView, {"username": "ising", "password": "nope"})).status_code, 401)
+        login = await self.post(AsyncLoginView, {"username": "ising", "password": "pw-ising-1"})
+        self.assertEqual(login.status_code, 200)
+        auth = {"headers": {"Authorization": f"Token {json.loads(login.content)['token']}"}}
+
+        with override_settings(SENTIMENT_QUEUE_BACKEND="thread", SENTIMENT_TIERS={"TIERS": ["rules"]}):
+            created = await self.post(AsyncFeedbackView, {"message": "Excellent service, I love it!"}, **auth)
+            self.assertEqual(created.status_code, 201)
+            await asyncio.gather(*tasks._loop_tasks)
+        feedback = await Feedback.objects.aget(id=json.loads(created.content)["id"])
+        self.assertEqual((feedback.sentiment, feedback.analysis_tier), ("POSITIVE", "rules"))
+
+        listing = await AsyncFeedbackView.as_view()(self.factory.get("/api/feedback/", **auth))
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual([item["id"] for item in json.loads(listing.content)["results"]], [feedback.id])
+
+    async def test_requires_token_and_rejects_bad_cursor(self):
+        response = await AsyncFeedbackView.as_view()(self.factory.get("/api/feedback/"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+        user = await User.objects.acreate(username="caloy")
+        token = await Token.objects.acreate(user=user)
+        request = self.factory.get("/api/feedback/", {"cursor": "nope"},
+                                   headers={"Authorization": f"Token {token.key}"})
+        self.assertEqual((await AsyncFeedbackView.as_view()(request)).status_code, 404)
+
+
+@override_settings(FEEDBACK_EVENTS={"BROKER": "inprocess", "HEARTBEAT_SECONDS": 0.05, "MAX_STREAM_SECONDS": 5})
+class FeedbackEventsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("lorna", password="pw")
+        self.other = User.objects.create_user("fe", password="pw")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def analyze(self, feedback, sentiment="POSITIVE", minutes=0):
+        feedback.sentiment, feedback.confidence = sentiment, 0.9
+        feedback.analyzed_at = timezone.now() + timedelta(minutes=minutes)
+        with self.captureOnCommitCallbacks(execute=True):
+            save_sentiment_results([feedback], SENTIMENT_FIELDS)
+
+    @staticmethod
+    def data(chunk):
+        return json.loads(chunk.split("data: ", 1)[1])
+
+    def test_pushes_own_results_and_heartbeats(self):
+        mine = Feedback.objects.create(user=self.user, message="Mabilis ang serbisyo")
+        theirs = Feedback.objects.create(user=self.other, message="Ok lang")
+        stream = events.stream(self.user.id)
+        self.assertEqual(next(stream), "retry: 3000\n\n")
+        self.assertEqual(next(stream), ": heartbeat\n\n")
+
+        self.analyze(theirs)
+        self.analyze(mine)
+        chunk = next(stream)
+        self.assertEqual(self.data(chunk)["feedback"], mine.id)
+        self.assertEqual(self.data(chunk)["state"], "ANALYZED")
+        self.assertIn(f"id: {events.encode_cursor(mine.analyzed_at, mine.id)}\n", chunk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_sentiment_error([mine.id], "boom")
+        self.assertEqual(self.data(next(stream))["state"], "ERROR")
+        stream.close()
+        self.assertEqual(events.get_broker().stats()["streams"], 0)
+
+    def test_last_event_id_replays_missed_results(self):
+        first, second, third = [Feedback.objects.create(user=self.user, message=f"m{i}") for i in range(3)]
+        self.analyze(first, minutes=1)
+        self.analyze(second, minutes=2)
+        self.analyze(third, minutes=3)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        response = self.client.get("/api/feedback/events/", HTTP_ACCEPT="text/event-stream",
+                                   HTTP_LAST_EVENT_ID=events.encode_cursor(first.analyzed_at, first.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = iter(response.streaming_content)
+        next(body)
+        self.assertEqual([self.data(next(body).decode())["feedback"] for _ in range(2)], [second.id, third.id])
+        self.assertEqual(next(body), b": heartbeat\n\n")
+        response.close()
+
+    def test_token_in_query_string_for_event_source(self):
+        self.assertEqual(self.client.get("/api/feedback/events/", HTTP_ACCEPT="text/event-stream").status_code, 401)
+        response = self.client.get(f"/api/feedback/events/?token={self.token.key}", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    async def test_async_view_streams_from_the_event_loop(self):
+        feedback = await Feedback.objects.acreate(user=self.user, message="Salamat po")
+        request = AsyncRequestFactory().get("/api/feedback/events/", {"token": self.token.key})
+        response = await AsyncFeedbackEventsView.as_view()(request)
+        body = aiter(response.streaming_content)
+        await anext(body)
+        self.assertEqual(await anext(body), b": heartbeat\n\n")
+
+        events.get_broker().deliver({self.user.id: [events.result_event(feedback.id, timezone.now())]})
+        chunk = await anext(body)
+        while chunk == b": heartbeat\n\n":
+            chunk = await anext(body)
+        self.assertEqual(self.data(chunk.decode())["feedback"], feedback.id)
+        await body.aclose()
+
+
+# Verdicts of the LangGraph workflow before the steps were split out of its nodes
+GOLDEN_VERDICTS = [
+    ("I love this store!", "POSITIVE", 0.85, "Keyword analysis: positive score=0.90, negative score=0.00"),
+    ("Not bad at all", "POSITIVE", 0.85, r"Matched negation pattern: '\bnot\s+(?:that\s+)?bad\b'"),
+    ("not good", "NEGATIVE", 0.95, r"Matched negation pattern: '\bnot\s+(?:so\s+)?good\b'"),
+    ("The goods are terrible", "NEGATIVE", 0.9, r"Matched negative phrase: '\bterrible\b'"),
+    ("excellent " * 200, "POSITIVE", 0.9, r"Matched positive phrase: '\bexcellent\b'"),
+    ("Salamat po, ang ganda ng products", "NEUTRAL", 0.5, "Keyword analysis: positive score=0.00, negative score=0.00"),
+    ("great price but broken", "NEUTRAL", 0.5, "Keyword analysis: positive score=0.80, negative score=0.80"),
+    ("not the product I wanted, fine", "NEGATIVE", 0.83, "Keyword analysis: positive score=0.50, negative score=0.00"),
+    ("  worst   service\n\never  ", "NEGATIVE", 0.85, "Keyword analysis: positive score=0.00, negative score=0.95"),
+    ("", "NEUTRAL", 0.5, "Keyword analysis: positive score=0.00, negative score=0.00"),
+    (None, "NEUTRAL", 0.5, "Analysis failed: Preprocessing error: 'NoneType' object has no attribute 'strip'"),
+]
+# sha256 of json.dumps([[sentiment, confidence, reasoning], ...]) for random_corpus(2000, seed=25), same workflow
+GOLDEN_CORPUS_DIGEST = "c71b8ca68d76ea678698fed9ea6b6f0024f52f406eb6988c928a55d659020674"
+
+
+class FastEngineTests(SimpleTestCase):
+    def setUp(self):
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.graph = EnhancedFeedbackAnalyzer(engine="langgraph")
+        self.fast = EnhancedFeedbackAnalyzer(engine="fast")
+
+    def test_both_engines_keep_the_pinned_verdicts(self):
+        for analyzer in (self.fast, self.graph):
+            for text, sentiment, confidence, reasoning in GOLDEN_VERDICTS:
+                result = analyzer.run_workflow(text)
+                self.assertEqual((result["sentiment"], result["confidence"], result["reasoning"]),
+                                 (sentiment, confidence, reasoning), (analyzer.engine, text))
+                self.assertEqual(result["success"], text is not None)
+            rows = [[result["sentiment"], result["confidence"], result["reasoning"]]
+                    for result in map(analyzer.run_workflow, random_corpus(2000, seed=25))]
+            digest = hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+            self.assertEqual(digest, GOLDEN_CORPUS_DIGEST, analyzer.engine)
+
+    def test_matches_langgraph_on_a_large_corpus(self):
+        self.assertIsNotNone(self.graph.app)
+        self.assertIsNone(self.fast.app)
+        edge_cases = ["", "   ", "not", "Not bad!", "hindi masarap pero not bad", "love it " * 300, None, 42]
+        for text in random_corpus(5000, seed=25) + edge_cases:
+            # Whole final state, matches included, not just the verdict
+            expected = self.graph.app.invoke(AnalysisState(text).as_dict())
+            self.assertEqual(self.fast.run_steps(text).as_dict(), expected, text)
+        for text in edge_cases:
+            self.assertEqual(self.fast.run_workflow(text), self.graph.run_workflow(text), text)
+
+    def test_engine_follows_the_setting(self):
+        with override_settings(SENTIMENT_ENGINE="langgraph"):
+            self.assertEqual(EnhancedFeedbackAnalyzer().engine, "langgraph")
+        with override_settings(SENTIMENT_ENGINE="turbo"), self.assertRaises(ValueError):
+            EnhancedFeedbackAnalyzer()
+
+
+class ColdStartTests(SimpleTestCase):
+    def test_django_setup_does_not_import_langgraph(self):
+        # migrate/collectstatic/create_admin run on every deploy: they must not pay for langgraph
+        code = "import sys, django; django.setup(); import main.urls; print('langgraph' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_async_mode_falls_back_to_gthread_without_uvicorn_worker(self):
+        code = ("import os, runpy, sys; sys.modules['uvicorn_worker'] = None; c = runpy.run_path('gunicorn.conf.py'); "
+                "print(c['worker_class'], c['wsgi_app'], os.environ['ASYNC_API'], bool(c['fallback_warning']))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                env=dict(os.environ, ASYNC_API="true"))
+        self.assertEqual(result.stdout.split(), ["gthread", "main.wsgi:application", "false", "True"])
@@ -0,0 +1,118 @@
+# main/core/throttling.py - TOKEN BUCKET THROTTLES
+"""
+Per-IP and per-user token buckets for the endpoints that cost real CPU:
+login/register (PBKDF2 hashing) and feedback submission (starts analysis).
+
+A scope's rate in ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` reads as
+"<burst>/<period>". A bucket holds up to <burst> tokens and refills at
+<burst> per <period>. Each request takes one token, so a client can burst
+and then settles at the average rate. A view can charge more with a
+``throttle_cost(request)`` method (the bulk upload charges per item, at most
+a full bucket, so the largest upload is still possible from a full bucket). A throttled request costs one cache
+round trip and is refused before the view runs, so no password is hashed
+and no analysis starts. DRF adds ``Retry-After`` to its 429. Every
+refusal bumps a ``throttle.<scope>`` counter in core.metrics.
+
+Buckets are stored in the cache alias named by ``THROTTLE_CACHE``. Only a
+shared cache (Redis, database, ...) gives one limit across gunicorn
+workers. Two workers may refill the same bucket at the same instant. That
+race can let a request or two through, which is fine for abuse control.
+"""
+import hashlib
+import threading
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from .cache import get_setting
+from . import metrics
+
+# Serialises read-modify-write of buckets within this process
+_bucket_lock = threading.Lock()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    @property
+    def cache(self):
+        return caches[get_setting("THROTTLE_CACHE", "default")]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.cost = self.get_cost(request, view)
+        refill_per_second = self.num_requests / self.duration
+        with _bucket_lock:
+            self.now = self.timer()
+            tokens, updated_at = self.cache.get(self.key) or (self.num_requests, self.now)
+            tokens = min(self.num_requests, tokens + (self.now - updated_at) * refill_per_second)
+            allowed = tokens >= self.cost
+            if allowed:
+                tokens -= self.cost
+            # Untouched for a whole period, the bucket is full again: let the entry expire
+            self.cache.set(self.key, (tokens, self.now), self.duration)
+
+        self.tokens = tokens
+        if not allowed:
+            metrics.incr(f"throttle.{self.scope}")
+        return allowed
+
+    def get_cost(self, request, view) -> int:
+        """Tokens this request takes: the view's ``throttle_cost()``, capped at a full bucket, else 1"""
+        throttle_cost = getattr(view, "throttle_cost", None)
+        if throttle_cost is None:
+            return 1
+        return max(1, min(self.num_requests, throttle_cost(request)))
+
+    def wait(self):
+        """Seconds until the bucket holds enough tokens for this request"""
+        return max(0.0, (self.cost - self.tokens) * self.duration / self.num_requests)
+
+    def ident_key(self, ident) -> str:
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Login/register attempts per client IP"""
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.ident_key(self.get_ident(request))
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Login/register attempts per username, whatever IPs they come from"""
+    scope = "auth_user"
+
+    def get_cache_key(self, request, view):
+        try:
+            username = str(request.data.get("username") or "").strip().lower()
+        except AttributeError:
+            return None
+        if not username:
+            return None
+        # Hashed: arbitrary user input must not end up in a cache key verbatim
+        return self.ident_key(hashlib.sha256(username.encode("utf-8")).hexdigest()[:32])
+
+
+class FeedbackUserThrottle(TokenBucketThrottle):
+    """Feedback submissions per authenticated user"""
+    scope = "feedback_user"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.ident_key(request.user.pk)
+
+
+class FeedbackIPThrottle(TokenBucketThrottle):
+    """Feedback submissions per client IP (many accounts, one source)"""
+    scope = "feedback_ip"
+
+    def get_cache_key(self, request, view):
+        return self.ident_key(self.get_ident(request))
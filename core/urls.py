@@ -1,8 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from .views import LoginView, RegisterView, FeedbackView
+from .views import (
+    LoginView, RegisterView, FeedbackView, FeedbackBulkView, FeedbackEventsView, FeedbackSearchView, MetricsView,
+    ProductListView, SentimentStatsView,
+)
+
+if settings.ASYNC_API:
+    # Same URLs served by native async views (ASGI deployments, see core.async_views)
+    from .async_views import AsyncFeedbackEventsView, AsyncFeedbackView, AsyncLoginView, AsyncRegisterView
+    LoginView, RegisterView, FeedbackView = AsyncLoginView, AsyncRegisterView, AsyncFeedbackView
+    FeedbackEventsView = AsyncFeedbackEventsView
 
 urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
     path("register/", RegisterView.as_view(), name="register"),
     path("feedback/", FeedbackView.as_view(), name="feedback"),
+    path("feedback/events/", FeedbackEventsView.as_view(), name="feedback-events"),
+    path("feedback/bulk/", FeedbackBulkView.as_view(), name="feedback-bulk"),
+    path("feedback/search/", FeedbackSearchView.as_view(), name="feedback-search"),
+    path("products/", ProductListView.as_view(), name="products"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("stats/sentiment/", SentimentStatsView.as_view(), name="sentiment-stats"),
 ]
@@ -1,18 +1,47 @@
 # main/core/utils.py - SIMPLIFIED WORKING VERSION
+import asyncio
 import os
-import json
 import re
-from typing import TypedDict, List, Dict
-from langgraph.graph import StateGraph, END
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, TypedDict, List, Dict
 from dotenv import load_dotenv
 import logging
 
+from .cache import SentimentCache, get_setting
+from .matcher import (
+    LexiconMatcher, NEGATION, POSITIVE_PHRASE, NEGATIVE_PHRASE,
+    POSITIVE_KEYWORD, NEGATIVE_KEYWORD,
+)
+from . import llm, metrics
+from .backends import TieredRouter, get_backend, tier_setting
+
+if TYPE_CHECKING:
+    # langgraph (and the langchain_core/langsmith it pulls in) costs ~0.4s to import:
+    # it is loaded by create_workflow(), only when SENTIMENT_ENGINE = "langgraph", so
+    # migrate, collectstatic and the default fast engine never pay for it
+    from langgraph.graph import StateGraph
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump when the scoring logic changes; lexicon edits are fingerprinted automatically
+ANALYZER_VERSION = "rules-1"
+LLM_MODEL = "qwen/qwen-2.5-32b-instruct:free"
+# Distinct texts sent to the LLM concurrently by the batch API
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+
+
+def normalize_feedback_text(feedback_text: str) -> str:
+    """Whitespace-normalize and truncate feedback exactly as the preprocess node does"""
+    return re.sub(r'\s+', ' ', feedback_text.strip())[:1000]
+
+
 class SentimentState(TypedDict):
     feedback_text: str
     sentiment: str
@@ -20,11 +49,78 @@ class SentimentState(TypedDict):
     reasoning: str
     error: str
     analysis_complete: bool
+    matches: dict
+
+class AnalysisState:
+    """
+    SentimentState as one mutable object. The fast engine threads a single
+    instance through the steps instead of copying a dict at every node.
+    """
+    __slots__ = ("feedback_text", "sentiment", "confidence", "reasoning", "error", "analysis_complete", "matches")
+
+    def __init__(self, feedback_text: str = "", sentiment: str = "", confidence: float = 0.0, reasoning: str = "",
+                 error: str = "", analysis_complete: bool = False, matches: dict = None):
+        self.feedback_text = feedback_text
+        self.sentiment = sentiment
+        self.confidence = confidence
+        self.reasoning = reasoning
+        self.error = error
+        self.analysis_complete = analysis_complete
+        self.matches = matches
+
+    @classmethod
+    def from_mapping(cls, state) -> "AnalysisState":
+        return cls(**{name: state[name] for name in cls.__slots__ if name in state})
+
+    def as_dict(self) -> SentimentState:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+ENGINES = ("fast", "langgraph")
+
+
+def sentiment_engine(engine: str = None) -> str:
+    """SENTIMENT_ENGINE: "fast" (plain calls, the default) or "langgraph" (the compiled StateGraph)"""
+    engine = engine or get_setting("SENTIMENT_ENGINE", "fast")
+    if engine not in ENGINES:
+        raise ValueError(f"SENTIMENT_ENGINE must be one of {ENGINES}, got {engine!r}")
+    return engine
+
 
 class EnhancedFeedbackAnalyzer:
-    def __init__(self):
-        self.cache = {}
-        self.setup_negation_patterns()
+    def __init__(self, engine: str = None):
+        # None: follow SENTIMENT_ENGINE (re-read on every reload)
+        self.engine_override = engine
+        self.cache = SentimentCache.from_settings()
+        # One breaker for every LLM call path: a dead endpoint trips it for all of them
+        self.llm_breaker = llm.make_breaker()
+        self.llm_guard = llm.make_guard("llm", self.llm_breaker)
+        self.batcher = llm.LLMBatcher.from_settings(
+            LLM_MODEL, fallback=self.call_llm, guard=llm.make_guard("llm_batch", self.llm_breaker),
+            # Past the batch deadline there is no time left for an LLM call
+            rules=self.analyze_feedback,
+        )
+        self._lock = threading.Lock()
+        self.reload()
+    
+    def reload(self):
+        """Rebuild the pattern tables and the compiled workflow (e.g. after a lexicon change)"""
+        with self._lock:
+            self.setup_negation_patterns()
+            self.compile_patterns()
+            self.engine = sentiment_engine(self.engine_override)
+            # The fast engine runs the same steps without the graph (or the langgraph import)
+            self.app = self.create_workflow().compile() if self.engine == "langgraph" else None
+            self.version = self.lexicon_version()
+            self.cache.clear()
+    
+    def lexicon_version(self) -> str:
+        """Analyzer version plus a fingerprint of the lexicon, used to key cached results"""
+        lexicon = repr((
+            self.negation_patterns, self.positive_phrases, self.negative_phrases,
+            sorted(self.positive_keywords.items()), sorted(self.negative_keywords.items()),
+        ))
+        return f"{ANALYZER_VERSION}-{hashlib.sha1(lexicon.encode('utf-8')).hexdigest()[:8]}"
     
     def setup_negation_patterns(self):
         """Define negation patterns for sentiment analysis"""
@@ -53,120 +149,107 @@ class EnhancedFeedbackAnalyzer:
             'disappointed': 0.8, 'waste': 0.75, 'broken': 0.8,
             'awful': 0.9, 'terrible': 0.9, 'horrible': 0.9
         }
+        
+        # Very clear positive/negative phrases
+        self.positive_phrases = [
+            r'\blove\s+it\b', r'\bvery\s+good\b', r'\bexcellent\b', 
+            r'\bperfect\b', r'\bawesome\b'
+        ]
+        
+        self.negative_phrases = [
+            r'\bhate\s+it\b', r'\bvery\s+bad\b', r'\bterrible\b',
+            r'\bawful\b', r'\bhorrible\b'
+        ]
     
-    # ==================== LANGGRAPH NODES ====================
+    def compile_patterns(self):
+        """Build the single-pass matcher once instead of scanning per pattern on every analysis"""
+        # Swap a single object so concurrent readers never see a half-built table
+        self.matcher = LexiconMatcher(
+            self.negation_patterns,
+            self.positive_phrases,
+            self.negative_phrases,
+            self.positive_keywords,
+            self.negative_keywords,
+        )
     
-    def preprocess_node(self, state: SentimentState) -> SentimentState:
-        """Node 1: Preprocess the feedback text"""
+    # ==================== RULE STEPS ====================
+    
+    def preprocess(self, state: "AnalysisState"):
+        """Step 1: Preprocess the feedback text"""
         try:
-            text = state["feedback_text"].strip()
-            
-            # Basic cleaning
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = text[:1000]  # Limit length
-            
-            # Detect features
-            has_negation = bool(re.search(r'\bnot\s+\w+', text.lower()))
-            has_exclamation = '!' in text
-            has_question = '?' in text
+            # Basic cleaning: normalize whitespace, limit length
+            text = normalize_feedback_text(state.feedback_text)
             
             logger.info(f"Preprocessing: {text[:50]}...")
             
-            return {
-                **state,
-                "feedback_text": text,
-                "analysis_complete": False,
-                "error": ""
-            }
+            state.feedback_text = text
+            state.analysis_complete = False
+            state.error = ""
         except Exception as e:
-            return {
-                **state,
-                "error": f"Preprocessing error: {str(e)}"
-            }
+            state.error = f"Preprocessing error: {str(e)}"
     
-    def pattern_analysis_node(self, state: SentimentState) -> SentimentState:
-        """Node 2: Check for common patterns and negation"""
-        if state.get("error"):
-            return state
+    def pattern_analysis(self, state: "AnalysisState"):
+        """Step 2: Check for common patterns and negation"""
+        if state.error:
+            return
             
         try:
-            text = state["feedback_text"].lower()
-            
-            # First, check for strong negation patterns
-            for pattern, sentiment, confidence in self.negation_patterns:
-                if re.search(pattern, text):
-                    logger.info(f"Matched pattern: {pattern} → {sentiment}")
-                    return {
-                        **state,
-                        "sentiment": sentiment,
-                        "confidence": confidence,
-                        "reasoning": f"Matched negation pattern: '{pattern}'",
-                        "analysis_complete": True
-                    }
-            
-            # Check for very clear positive/negative phrases
-            positive_phrases = [
-                r'\blove\s+it\b', r'\bvery\s+good\b', r'\bexcellent\b', 
-                r'\bperfect\b', r'\bawesome\b'
-            ]
-            
-            negative_phrases = [
-                r'\bhate\s+it\b', r'\bvery\s+bad\b', r'\bterrible\b',
-                r'\bawful\b', r'\bhorrible\b'
-            ]
+            text = state.feedback_text.lower()
             
-            for phrase in positive_phrases:
-                if re.search(phrase, text):
-                    return {
-                        **state,
-                        "sentiment": "POSITIVE",
-                        "confidence": 0.9,
-                        "reasoning": f"Matched positive phrase: '{phrase}'",
-                        "analysis_complete": True
-                    }
+            # One pass over the text finds every lexicon hit; keep them for keyword analysis
+            matches = self.matcher.scan(text)
             
-            for phrase in negative_phrases:
-                if re.search(phrase, text):
-                    return {
-                        **state,
-                        "sentiment": "NEGATIVE",
-                        "confidence": 0.9,
-                        "reasoning": f"Matched negative phrase: '{phrase}'",
-                        "analysis_complete": True
-                    }
+            # First, check for strong negation patterns (earliest in the list wins)
+            if matches[NEGATION]:
+                pattern, sentiment, confidence = matches[NEGATION][0]
+                logger.info(f"Matched pattern: {pattern} → {sentiment}")
+                state.sentiment = sentiment
+                state.confidence = confidence
+                state.reasoning = f"Matched negation pattern: '{pattern}'"
+                state.analysis_complete = True
             
-            # If no strong patterns found, continue to next node
-            return state
+            # Check for very clear positive/negative phrases
+            elif matches[POSITIVE_PHRASE]:
+                state.sentiment = "POSITIVE"
+                state.confidence = 0.9
+                state.reasoning = f"Matched positive phrase: '{matches[POSITIVE_PHRASE][0]}'"
+                state.analysis_complete = True
+            
+            elif matches[NEGATIVE_PHRASE]:
+                state.sentiment = "NEGATIVE"
+                state.confidence = 0.9
+                state.reasoning = f"Matched negative phrase: '{matches[NEGATIVE_PHRASE][0]}'"
+                state.analysis_complete = True
+            
+            # If no strong patterns found, continue to next step
+            else:
+                state.matches = matches
             
         except Exception as e:
-            return {
-                **state,
-                "error": f"Pattern analysis error: {str(e)}"
-            }
+            state.error = f"Pattern analysis error: {str(e)}"
     
-    def keyword_analysis_node(self, state: SentimentState) -> SentimentState:
-        """Node 3: Perform keyword-based analysis"""
-        if state.get("error") or state.get("analysis_complete"):
-            return state
+    def keyword_analysis(self, state: "AnalysisState"):
+        """Step 3: Perform keyword-based analysis"""
+        if state.error or state.analysis_complete:
+            return
             
         try:
-            text = state["feedback_text"].lower()
+            text = state.feedback_text.lower()
+            matches = state.matches or self.matcher.scan(text)
             
             # Calculate weighted scores
             pos_score = 0
             neg_score = 0
             
-            # Check positive keywords
-            for keyword, weight in self.positive_keywords.items():
-                if re.search(rf'\b{keyword}\b', text):
-                    pos_score += weight
-                    logger.debug(f"Found positive: {keyword} (+{weight})")
+            # Sum positive keywords (lexicon order, as found by the matcher)
+            for keyword, weight in matches[POSITIVE_KEYWORD]:
+                pos_score += weight
+                logger.debug(f"Found positive: {keyword} (+{weight})")
             
-            # Check negative keywords
-            for keyword, weight in self.negative_keywords.items():
-                if re.search(rf'\b{keyword}\b', text):
-                    neg_score += weight
-                    logger.debug(f"Found negative: {keyword} (+{weight})")
+            # Sum negative keywords
+            for keyword, weight in matches[NEGATIVE_KEYWORD]:
+                neg_score += weight
+                logger.debug(f"Found negative: {keyword} (+{weight})")
             
             # Determine sentiment
             if pos_score > neg_score and pos_score > 0:
@@ -192,69 +275,82 @@ class EnhancedFeedbackAnalyzer:
             
             logger.info(f"Keyword analysis: {sentiment} ({confidence:.2f})")
             
-            return {
-                **state,
-                "sentiment": sentiment,
-                "confidence": round(confidence, 2),
-                "reasoning": reasoning,
-                "analysis_complete": True
-            }
+            state.sentiment = sentiment
+            state.confidence = round(confidence, 2)
+            state.reasoning = reasoning
+            state.analysis_complete = True
             
         except Exception as e:
-            return {
-                **state,
-                "error": f"Keyword analysis error: {str(e)}"
-            }
+            state.error = f"Keyword analysis error: {str(e)}"
     
-    def finalize_node(self, state: SentimentState) -> SentimentState:
-        """Node 4: Final validation and cleanup"""
+    def finalize(self, state: "AnalysisState"):
+        """Step 4: Final validation and cleanup"""
         try:
             # If there was an error, provide default response
-            if state.get("error"):
-                return {
-                    **state,
-                    "sentiment": "NEUTRAL",
-                    "confidence": 0.5,
-                    "reasoning": f"Analysis failed: {state['error']}",
-                    "analysis_complete": True
-                }
+            if state.error:
+                state.sentiment = "NEUTRAL"
+                state.confidence = 0.5
+                state.reasoning = f"Analysis failed: {state.error}"
             
             # Ensure we have a result
-            if not state.get("analysis_complete"):
-                return {
-                    **state,
-                    "sentiment": "NEUTRAL",
-                    "confidence": 0.5,
-                    "reasoning": "Analysis could not determine sentiment",
-                    "analysis_complete": True
-                }
+            elif not state.analysis_complete:
+                state.sentiment = "NEUTRAL"
+                state.confidence = 0.5
+                state.reasoning = "Analysis could not determine sentiment"
             
-            # Add timestamp and clean up
-            result = {
-                "sentiment": state["sentiment"],
-                "confidence": state["confidence"],
-                "reasoning": state["reasoning"],
-                "original_text": state["feedback_text"],
-                "analysis_complete": True,
-                "error": ""
-            }
-            
-            logger.info(f"Final result: {result['sentiment']} ({result['confidence']:.2f})")
-            return result
+            else:
+                state.error = ""
+                logger.info(f"Final result: {state.sentiment} ({state.confidence:.2f})")
+            state.analysis_complete = True
             
         except Exception as e:
-            return {
-                "sentiment": "NEUTRAL",
-                "confidence": 0.5,
-                "reasoning": f"Finalization error: {str(e)}",
-                "analysis_complete": True,
-                "error": str(e)
-            }
+            state.sentiment = "NEUTRAL"
+            state.confidence = 0.5
+            state.reasoning = f"Finalization error: {str(e)}"
+            state.analysis_complete = True
+            state.error = str(e)
+    
+    # LangGraph nodes: the steps above, on a copy of the graph's state dict
+    
+    def preprocess_node(self, state: SentimentState) -> SentimentState:
+        """Node 1: Preprocess the feedback text"""
+        return self._as_node(self.preprocess, state)
+    
+    def pattern_analysis_node(self, state: SentimentState) -> SentimentState:
+        """Node 2: Check for common patterns and negation"""
+        return self._as_node(self.pattern_analysis, state)
+    
+    def keyword_analysis_node(self, state: SentimentState) -> SentimentState:
+        """Node 3: Perform keyword-based analysis"""
+        return self._as_node(self.keyword_analysis, state)
+    
+    def finalize_node(self, state: SentimentState) -> SentimentState:
+        """Node 4: Final validation and cleanup"""
+        return self._as_node(self.finalize, state)
+    
+    @staticmethod
+    def _as_node(step, state: SentimentState) -> SentimentState:
+        run = AnalysisState.from_mapping(state)
+        step(run)
+        return run.as_dict()
+    
+    def run_steps(self, feedback_text: str) -> "AnalysisState":
+        """The workflow as plain calls on one mutable state (the "fast" engine)"""
+        state = AnalysisState(feedback_text)
+        self.preprocess(state)
+        self.pattern_analysis(state)
+        # Same branch as the graph's conditional edge
+        if not state.analysis_complete:
+            self.keyword_analysis(state)
+        self.finalize(state)
+        return state
     
     # ==================== WORKFLOW CREATION ====================
     
-    def create_workflow(self) -> StateGraph:
+    def create_workflow(self) -> "StateGraph":
         """Create the LangGraph workflow"""
+        from langgraph.graph import StateGraph, END
+
         # Define the workflow
         workflow = StateGraph(SentimentState)
         
@@ -284,25 +380,43 @@ class EnhancedFeedbackAnalyzer:
     
     def analyze_feedback(self, feedback_text: str) -> Dict:
         """Main analysis function"""
+        # Rule verdicts depend only on the normalized, lower-cased text
+        key = self.cache.make_key(self.version, "rules", normalize_feedback_text(feedback_text).lower())
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self.run_workflow(feedback_text)
+        if result["success"]:
+            self.cache.set(key, result, version=self.version)
+        return result
+    
+    def analyze_feedback_batch(self, texts: List[str]) -> List[Dict]:
+        """Rule-based analysis of many texts: each distinct text is looked up and scored once"""
+        version = self.version
+        keys = [self.cache.make_key(version, "rules", normalize_feedback_text(text).lower()) for text in texts]
+        results = {}
+        
+        for key, text in zip(keys, texts):
+            if key in results:
+                continue
+            result = self.cache.get(key)
+            if result is None:
+                result = self.run_workflow(text)
+                if result["success"]:
+                    self.cache.set(key, result, version=version)
+            results[key] = result
+        
+        return [dict(results[key]) for key in keys]
+    
+    def run_workflow(self, feedback_text: str) -> Dict:
+        """Run the rule-based workflow, bypassing the result cache"""
         try:
-            # Create workflow
-            workflow = self.create_workflow()
-            
-            # Compile
-            app = workflow.compile()
-            
-            # Initial state
-            initial_state = {
-                "feedback_text": feedback_text,
-                "sentiment": "",
-                "confidence": 0.0,
-                "reasoning": "",
-                "error": "",
-                "analysis_complete": False
-            }
-            
-            # Execute workflow
-            result = app.invoke(initial_state)
+            if self.app is None:
+                result = self.run_steps(feedback_text).as_dict()
+            else:
+                # Workflow is compiled once in reload(), not per call
+                result = self.app.invoke(AnalysisState(feedback_text).as_dict())
             
             # Return clean result
             return {
@@ -327,88 +441,216 @@ class EnhancedFeedbackAnalyzer:
     
     def analyze_with_llm(self, feedback_text: str) -> Dict:
         """Optional LLM-based analysis for complex cases"""
-        try:
-            from openai import OpenAI
-            
-            # Initialize client
-            client = OpenAI(
-                api_key=os.getenv("OPENROUTER_API_KEY"),
-                base_url="https://openrouter.ai/api/v1"
-            )
-            
-            prompt = f"""Analyze this feedback sentiment:
-
-"{feedback_text}"
-
-Return ONLY a JSON object with this exact format:
-{{
-    "sentiment": "POSITIVE", "NEGATIVE", or "NEUTRAL",
-    "confidence": 0.0 to 1.0,
-    "reasoning": "Brief explanation"
-}}"""
-
-            response = client.chat.completions.create(
-                model="qwen/qwen-2.5-32b-instruct:free",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=200
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(0)
-            
-            result = json.loads(content)
-            
-            return {
-                "sentiment": result.get("sentiment", "NEUTRAL").upper(),
-                "confidence": min(1.0, max(0.0, float(result.get("confidence", 0.5)))),
-                "reasoning": result.get("reasoning", "LLM analysis"),
-                "success": True,
-                "source": "llm"
-            }
-            
-        except Exception as e:
-            logger.error(f"LLM analysis failed: {e}")
-            # Fall back to regular analysis
-            return self.analyze_feedback(feedback_text)
+        key = self.cache.make_key(self.version, f"llm:{LLM_MODEL}", normalize_feedback_text(feedback_text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Concurrent callers (pool threads, workers) share micro-batched requests
+        result = self.batcher.analyze(feedback_text) if self.batcher.enabled else self.call_llm(feedback_text)
+        # Rule-based fallbacks are cached under their own key by analyze_feedback
+        if result.get("source") == "llm":
+            self.cache.set(key, result, version=self.version)
+        return result
+    
+    def analyze_with_llm_batch(self, texts: List[str]) -> List[Dict]:
+        """LLM analysis of many texts: cached and duplicate texts are never sent twice"""
+        version = self.version
+        source = f"llm:{LLM_MODEL}"
+        keys = [self.cache.make_key(version, source, normalize_feedback_text(text)) for text in texts]
+        results = {}
+        pending = {}
+        
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                pending[key] = text
+            else:
+                results[key] = cached
+        
+        if pending:
+            size = max(1, self.batcher.max_items)
+            texts = list(pending.values())
+            if self.batcher.enabled and len(texts) < size:
+                # Too few for a prompt of their own (e.g. one new feedback): share the collector's with other callers
+                answers = self.batcher.analyze_many(texts)
+            else:
+                # Several feedbacks per prompt; the prompts themselves go out concurrently
+                chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+                send = self.batcher.send if size > 1 else lambda chunk: [self.call_llm(chunk[0])]
+                with ThreadPoolExecutor(max_workers=min(LLM_BATCH_CONCURRENCY, len(chunks))) as pool:
+                    answers = [result for chunk_results in pool.map(send, chunks) for result in chunk_results]
+            for key, result in zip(pending, answers):
+                if result.get("source") == "llm":
+                    self.cache.set(key, result, version=version)
+                results[key] = result
+        
+        return [dict(results[key]) for key in keys]
+    
+    def call_llm(self, feedback_text: str) -> Dict:
+        """Ask the LLM for a verdict within the deadline budget, falling back to rule-based analysis"""
+        guard = self.llm_guard
+        return guard.run(
+            lambda: llm.complete(LLM_MODEL, feedback_text, timeout=guard.deadline),
+            # Fall back to regular analysis (also when the breaker is open or a rules hedge wins)
+            lambda: self.analyze_feedback(feedback_text),
+        )
+    
+    async def analyze_with_llm_async(self, feedback_text: str) -> Dict:
+        """analyze_with_llm for event loops: many feedbacks can await the LLM at once"""
+        key = self.cache.make_key(self.version, f"llm:{LLM_MODEL}", normalize_feedback_text(feedback_text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        guard = self.llm_guard
+        if guard.breaker.allow():
+            started = time.monotonic()
+            settled = False
+            try:
+                result = await asyncio.wait_for(
+                    llm.complete_async(LLM_MODEL, feedback_text, timeout=guard.deadline),
+                    timeout=guard.deadline,
+                )
+                guard.latency.record(time.monotonic() - started)
+                guard.breaker.record_success()
+                settled = True
+                self.cache.set(key, result, version=self.version)
+                return result
+            except Exception as e:
+                logger.error(f"LLM analysis failed: {e!r}")
+                guard.breaker.record_failure()
+                settled = True
+            finally:
+                # Cancelled (client gone, worker stopping): no verdict, but a half-open probe must be freed
+                if not settled:
+                    guard.breaker.release()
+        
+        # The rule-based workflow is CPU-bound: keep it off the event loop
+        return await asyncio.to_thread(self.analyze_feedback, feedback_text)
+
+
+# ==================== SHARED ANALYZER ====================
+
+_analyzer = None
+_router = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> EnhancedFeedbackAnalyzer:
+    """Return the process-wide analyzer, building it on first use"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = EnhancedFeedbackAnalyzer()
+                metrics.register("sentiment_cache", _analyzer.cache.stats)
+                metrics.register("llm_batcher", _analyzer.batcher.stats)
+                metrics.register("llm_guard", _analyzer.llm_guard.stats)
+                metrics.register("llm_batch_guard", _analyzer.batcher.guard.stats)
+    return _analyzer
+
+
+def get_router() -> TieredRouter:
+    """Return the process-wide tiered router"""
+    global _router
+    if _router is None:
+        with _analyzer_lock:
+            if _router is None:
+                _router = TieredRouter.from_settings()
+                metrics.register("sentiment_router", _router.stats)
+    return _router
+
+
+def warm_up() -> float:
+    """
+    Build the shared analyzer and run the workflow once (no cache, no LLM), so
+    the first real feedback doesn't pay for the imports and regex compilation.
+    Returns the seconds it took; called from gunicorn.conf.py.
+    """
+    started = time.perf_counter()
+    get_analyzer().run_workflow("Warm-up: the service was good")
+    return time.perf_counter() - started
+
+
+def reload_analyzer() -> EnhancedFeedbackAnalyzer:
+    """Rebuild the shared analyzer's tables and workflow in place"""
+    analyzer = get_analyzer()
+    analyzer.reload()
+    return analyzer
 
 
 # ==================== MAIN FUNCTION ====================
 
-def analyze_feedback_sentiment(feedback_text: str, use_llm: bool = False) -> dict:
+def analyze_feedback_sentiment(feedback_text: str, use_llm: bool = None) -> dict:
     """
     Main function to analyze feedback sentiment
     
     Args:
         feedback_text: The feedback text to analyze
-        use_llm: Whether to use LLM (OpenRouter) for analysis
+        use_llm: Escalate uncertain rule verdicts to the LLM (OpenRouter);
+            None follows SENTIMENT_TIERS["USE_LLM"]
     
     Returns:
-        Dictionary with sentiment analysis results
+        Dictionary with sentiment analysis results; "tier" names the backend that answered
     """
+    return analyze_feedback_sentiment_batch([feedback_text], use_llm)[0]
+
+
+async def analyze_feedback_sentiment_async(feedback_text: str, use_llm: bool = None) -> dict:
+    """
+    analyze_feedback_sentiment() for event loops (the async API views)
+    
+    The rule tier is CPU-bound and runs in a worker thread. An escalation to
+    the LLM tier is awaited on the loop, so waiting on OpenRouter ties up no
+    thread. Other tier setups run the whole router in a thread.
+    """
+    if use_llm is None:
+        use_llm = tier_setting("USE_LLM")
+    router = get_router()
+    if not use_llm or router.tiers[1:] != ["llm"]:
+        return await asyncio.to_thread(analyze_feedback_sentiment, feedback_text, use_llm)
+    
+    result = await asyncio.to_thread(analyze_feedback_sentiment, feedback_text, False)
+    if router.needs_escalation(result) and get_backend("llm").available():
+        answer = await get_analyzer().analyze_with_llm_async(feedback_text)
+        # Same rule as the router: a rules fallback from the LLM path is not an LLM verdict
+        if answer.get("source") == "llm":
+            result = dict(answer, tier="llm")
+    return result
+
+
+def analyze_feedback_sentiment_batch(texts: List[str], use_llm: bool = None) -> List[dict]:
+    """
+    Analyze many feedback texts in one call
+    
+    Args:
+        texts: The feedback texts to analyze
+        use_llm: Escalate uncertain rule verdicts to the LLM (OpenRouter);
+            None follows SENTIMENT_TIERS["USE_LLM"]
+    
+    Returns:
+        One result dictionary per input text, in the same order
+    """
+    texts = list(texts)
+    if use_llm is None:
+        use_llm = tier_setting("USE_LLM")
     try:
-        analyzer = EnhancedFeedbackAnalyzer()
-        
-        if use_llm and os.getenv("OPENROUTER_API_KEY"):
-            logger.info("Using LLM analysis")
-            return analyzer.analyze_with_llm(feedback_text)
-        else:
-            logger.info("Using rule-based analysis")
-            return analyzer.analyze_feedback(feedback_text)
+        router = get_router()
+        logger.info(f"Analyzing {len(texts)} feedback(s) ({'tiered' if use_llm else 'rules only'})")
+        return router.analyze_batch(texts, max_tier=None if use_llm else 1)
             
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
-        return {
+        return [{
             "sentiment": "NEUTRAL",
             "confidence": 0.5,
             "reasoning": f"Analysis failed: {str(e)}",
             "success": False,
             "error": str(e)
-        }
+        } for _ in texts]
 
 
 # ==================== QUICK TEST FUNCTION ====================
@@ -425,7 +667,7 @@ def test_analysis():
         "Waste of money, completely useless"
     ]
     
-    analyzer = EnhancedFeedbackAnalyzer()
+    analyzer = get_analyzer()
     
     print("🧪 Testing Sentiment Analysis\n")
     print("=" * 60)
@@ -1,22 +1,48 @@
 # main/core/views.py - CLEANED UP VERSION
+import hashlib
+import json
+from datetime import timedelta
+
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from rest_framework import status
 
+from .authentication import CachedTokenAuthentication, QueryStringTokenAuthentication
+from .catalog import CATEGORIES, get_page, page_response
+from . import events
+from .events import EventStreamRenderer
+from . import feedback_cache
 from .models import Feedback
 from .serializers import (
     RegisterSerializer,
     LoginSerializer,
     FeedbackSerializer
 )
-from .tasks import analyze_sentiment_background
+from .pagination import FeedbackCursorPagination, FeedbackSearchPagination
+from .parsers import NDJSONParser, TooManyItems, bulk_item_limit
+from .rollups import sentiment_stats
+from .search import search_feedback
+from .tasks import analyze_sentiment_background, analyze_sentiment_batch_background
+from .throttling import AuthIPThrottle, AuthUsernameThrottle, FeedbackIPThrottle, FeedbackUserThrottle
+from . import metrics
 
 # ✅ REGISTER
 class RegisterView(APIView):
     permission_classes = [AllowAny]
+    authentication_classes = []
+    # Checked before the view runs: a refused request never reaches password hashing
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -32,6 +58,9 @@ class RegisterView(APIView):
 # ✅ LOGIN
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    authentication_classes = []
+    # Checked before the view runs: a refused request never reaches password hashing
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -54,14 +83,21 @@ class LoginView(APIView):
 class FeedbackView(APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_throttles(self):
+        # Submissions start analysis work; polling the list is left alone
+        if self.request.method == "POST":
+            return [FeedbackUserThrottle(), FeedbackIPThrottle()]
+        return super().get_throttles()
+
     def post(self, request):
         serializer = FeedbackSerializer(data=request.data)
         if serializer.is_valid():
-            # Create feedback (sentiment defaults to 'PENDING')
-            feedback = serializer.save(user=request.user)
-            
-            # 🔥 Start LangGraph sentiment analysis in background
-            analyze_sentiment_background(feedback.id)
+            with transaction.atomic():
+                # Create feedback (sentiment defaults to 'PENDING')
+                feedback = serializer.save(user=request.user)
+                
+                # 🔥 Queue LangGraph sentiment analysis (runs once the row is committed)
+                analyze_sentiment_background(feedback.id)
             
             # Return normal response (frontend sees no changes)
             return Response(
@@ -71,7 +107,196 @@ class FeedbackView(APIView):
         return Response(serializer.errors, status=400)
 
     def get(self, request):
-        # Return normal feedback list (no sentiment data)
-        feedbacks = Feedback.objects.filter(user=request.user)
-        serializer = FeedbackSerializer(feedbacks, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        # Repeat polls are served from the per-user list cache (see core.feedback_cache)
+        key = feedback_cache.page_key(request.user.id, request.build_absolute_uri())
+        cached = feedback_cache.get_page(key)
+        if cached is not None:
+            data, last_modified = cached
+            return conditional_response(request, Response(data), last_modified)
+
+        # Newest-first page of the user's feedback (no sentiment data), keyed on (created_at, id)
+        paginator = FeedbackCursorPagination()
+        feedbacks = Feedback.objects.filter(user=request.user).only('id', 'message', 'created_at', 'analyzed_at')
+        page = paginator.paginate_queryset(feedbacks, request, view=self)
+        response = paginator.get_paginated_response(FeedbackSerializer(page, many=True).data)
+        
+        last_modified = max((f.analyzed_at or f.created_at for f in page), default=None)
+        feedback_cache.set_page(key, response.data, last_modified)
+        return conditional_response(request, response, last_modified)
+
+
+# ✅ FEEDBACK EVENTS - Server-Sent Events when analysis finishes (see core.events)
+class FeedbackEventsView(APIView):
+    permission_classes = [IsAuthenticated]
+    # EventSource can't set headers: ?token= is accepted here too
+    authentication_classes = [CachedTokenAuthentication, QueryStringTokenAuthentication]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get(self, request):
+        after = events.parse_last_event_id(request.headers.get("Last-Event-ID"))
+        return events.event_stream_response(events.stream(request.user.id, after))
+
+
+# ✅ FEEDBACK SEARCH (full-text index on Postgres, ranked)
+class FeedbackSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(query) > 200:
+            return Response({"error": "q is too long (max 200 characters)"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Customers search their own feedback; staff search everyone's
+        feedbacks = Feedback.objects.all() if request.user.is_staff else Feedback.objects.filter(user=request.user)
+        feedbacks = search_feedback(feedbacks.only('id', 'message', 'created_at'), query)
+
+        paginator = FeedbackSearchPagination()
+        page = paginator.paginate_queryset(feedbacks, request, view=self)
+        results = [
+            {**FeedbackSerializer(feedback).data, "rank": round(feedback.rank, 4)}
+            for feedback in page
+        ]
+        return paginator.get_paginated_response(results)
+
+
+def conditional_response(request, response, last_modified=None, data=None):
+    """Add ETag/Last-Modified to a JSON response and turn it into a 304 if the client is up to date"""
+    # ``data``: the payload of a plain (non-DRF) response
+    body = json.dumps(response.data if data is None else data, cls=JSONEncoder, sort_keys=True).encode("utf-8")
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if not_modified is not None:
+        response = not_modified
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    # Per-user data: browsers may keep it but must revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+# ✅ BULK FEEDBACK - offline kiosks / importers replay many items in one request
+class FeedbackBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def get_throttles(self):
+        # Same buckets as POST /api/feedback/: an upload can't outrun one-at-a-time submissions
+        return [FeedbackUserThrottle(), FeedbackIPThrottle()]
+
+    def throttle_cost(self, request):
+        # Every item starts an analysis
+        items = request.data
+        return len(items) if isinstance(items, list) else 1
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"error": "Expected a JSON array or NDJSON stream of feedback objects"},
+                            status=400)
+        if not items:
+            return Response({"error": "No feedback items to create"}, status=400)
+        if len(items) > bulk_item_limit():
+            raise TooManyItems(f"At most {bulk_item_limit()} items per request.")
+
+        # Validate everything up front; valid items are saved even if others fail
+        serializer = FeedbackSerializer(data=items, many=True)
+        if serializer.is_valid():
+            errors = {}
+            valid = list(enumerate(serializer.validated_data))
+        else:
+            # Older DRF reports a list aligned with the input, newer a {index: errors} dict
+            raw_errors = serializer.errors
+            if not isinstance(raw_errors, dict):
+                raw_errors = dict(enumerate(raw_errors))
+            errors = {index: error for index, error in raw_errors.items() if error}
+            valid = [(index, serializer.child.run_validation(item))
+                     for index, item in enumerate(items) if index not in errors]
+
+        with transaction.atomic():
+            created = Feedback.objects.bulk_create(
+                [Feedback(user=request.user, **data) for _, data in valid]
+            )
+            # 🔥 One analysis batch for the whole upload (runs once the rows are committed)
+            analyze_sentiment_batch_background([feedback.id for feedback in created])
+            # bulk_create sends no signals
+            feedback_cache.invalidate([request.user.id])
+
+        results = [{"index": index, "errors": error} for index, error in errors.items()]
+        results += [{"index": index, "id": feedback.id}
+                    for (index, _), feedback in zip(valid, created)]
+        results.sort(key=lambda item: item["index"])
+
+        return Response({
+            "created": len(created),
+            "failed": len(errors),
+            "results": results,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+
+# ✅ PRODUCTS - public catalog, one cached page per category (see core.catalog)
+class ProductListView(APIView):
+    permission_classes = [AllowAny]
+    # Public and identical for everyone: skip the token lookup
+    authentication_classes = []
+
+    def get(self, request):
+        category = request.query_params.get("category", "").strip().lower()
+        if category == "all":
+            category = ""
+        if category and category not in CATEGORIES:
+            return Response({"error": f"Unknown category {category!r}", "categories": sorted(CATEGORIES)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return page_response(request, get_page(category))
+
+
+# ✅ METRICS - process-local counters (cache hit ratios etc.), staff only
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+# ✅ SENTIMENT STATS (served from the rollup table only, never scans Feedback)
+class SentimentStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 366
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            until = self.parse_day(request.query_params.get("until"), today)
+            since = self.parse_day(request.query_params.get("since"), until - timedelta(days=self.DEFAULT_DAYS - 1))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if since > until:
+            return Response({"error": "since must not be after until"}, status=status.HTTP_400_BAD_REQUEST)
+        if (until - since).days >= self.MAX_DAYS:
+            return Response({"error": f"At most {self.MAX_DAYS} days per request"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Customers see their own feedback; staff see everyone, or one user with ?user=<id>
+        user_id = request.user.id
+        if request.user.is_staff:
+            user_id = request.query_params.get("user") or None
+            if user_id is not None and not user_id.isdigit():
+                return Response({"error": "user must be an id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        stats = sentiment_stats(user_id and int(user_id), since, until)
+        return Response({"since": since.isoformat(), "until": until.isoformat(), "user": user_id and int(user_id),
+                         **stats})
+
+    @staticmethod
+    def parse_day(value, default):
+        if not value:
+            return default
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+        return day
@@ -0,0 +1,102 @@
+# gunicorn.conf.py - WEB WORKER SETTINGS (Procfile / render.yaml: `gunicorn -c gunicorn.conf.py`)
+"""
+Every value can be overridden from the environment, so the free tier and a
+bigger plan run the same file:
+
+  WEB_CONCURRENCY            worker processes (default 2)
+  GUNICORN_WORKER_CLASS      sync, gthread (default) or uvicorn_worker.UvicornWorker (the
+                             default with ASYNC_API; if uvicorn-worker isn't installed
+                             the server falls back to gthread and main.wsgi, with a warning)
+  GUNICORN_THREADS           threads per gthread worker (default 4; 1 otherwise)
+  GUNICORN_PRELOAD           import the app once in the master (default true)
+  GUNICORN_MAX_REQUESTS      recycle a worker after this many requests (default 1000, 0 = never)
+  GUNICORN_MAX_REQUESTS_JITTER  random extra so workers don't all restart at once (default 100)
+  GUNICORN_TIMEOUT           seconds before a silent worker is killed (default 30)
+  GUNICORN_WARM_ANALYZER     build the sentiment analyzer before serving (default: only
+                             when SENTIMENT_QUEUE_BACKEND is "thread", i.e. the web
+                             workers run the analysis themselves)
+
+With preload_app the master imports Django and the views once, and also
+builds the analyzer if warming is on. Forked workers share those pages
+instead of each repeating the ~0.4s import (see
+benchmarks/bench_imports.py). Anything with threads or sockets (analysis
+pool, LLM clients, event listener) is started lazily per process, so it is
+safe to fork after preloading.
+"""
+import importlib.util
+import os
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == "true"
+
+
+ASYNC_API = env_bool("ASYNC_API", False)
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# Async mode needs an ASGI worker; gthread keeps a slow client (or an SSE stream) from holding a whole process
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker" if ASYNC_API else "gthread")
+
+fallback_warning = None
+if worker_class.startswith("uvicorn_worker.") and importlib.util.find_spec("uvicorn_worker") is None:
+    # Serve sync rather than fail to boot; the Django settings read ASYNC_API from the environment too
+    fallback_warning = f"⚠️ {worker_class} is not installed (pip install uvicorn-worker): serving main.wsgi with gthread"
+    worker_class = "gthread"
+    ASYNC_API = False
+    os.environ["ASYNC_API"] = "false"
+
+wsgi_app = "main.asgi:application" if ASYNC_API else "main.wsgi:application"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# gunicorn turns "sync" into gthread when threads > 1
+threads = int(os.environ.get("GUNICORN_THREADS", "4" if worker_class == "gthread" else "1"))
+
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = "-"
+
+
+def warm_analyzer_enabled():
+    if "GUNICORN_WARM_ANALYZER" in os.environ:
+        return env_bool("GUNICORN_WARM_ANALYZER", False)
+    from django.conf import settings
+    return getattr(settings, "SENTIMENT_QUEUE_BACKEND", "thread") == "thread"
+
+
+def warm(log, where):
+    if not warm_analyzer_enabled():
+        return
+    from core.utils import warm_up
+    try:
+        log.info(f"🔥 Sentiment analyzer warmed in {where} ({warm_up() * 1000:.0f} ms)")
+    except Exception as e:
+        # A cold analyzer is slower, not broken: serve anyway
+        log.warning(f"⚠️ Analyzer warm-up failed in {where}: {e}")
+
+
+def on_starting(server):
+    if fallback_warning:
+        server.log.warning(fallback_warning)
+
+
+def when_ready(server):
+    # Master, after preload_app loaded Django: build the analyzer once, before forking
+    if server.cfg.preload_app:
+        warm(server.log, "master")
+
+
+def pre_fork(server, worker):
+    # A database connection opened in the master must not be inherited by workers
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    # Workers forked from a warm master only re-run the workflow (a few ms); without
+    # preload this builds the analyzer here, before the first request
+    warm(worker.log, f"worker {worker.pid}")
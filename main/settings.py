@@ -36,7 +36,7 @@ INSTALLED_APPS = [
 # =========================
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # MUST be here
+    "core.middleware.AsyncWhiteNoiseMiddleware",  # MUST be here (WhiteNoise, async-capable for ASGI)
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -80,6 +80,28 @@ DATABASES = {
     )
 }
 
+# =========================
+# CACHES
+# =========================
+# "locmem" (per worker process, the default), "file" (shared by the workers on one
+# machine, CACHE_LOCATION is a directory) or "redis" (CACHE_LOCATION / REDIS_URL,
+# needs the redis package). Feedback lists, throttles and the shared token tier use it.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem").lower()
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "sarisari"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", "/tmp/sarisari-cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", os.environ.get("REDIS_URL", "redis://localhost:6379/0")),
+}
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.environ.get("CACHE_LOCATION") or CACHE_BACKENDS[CACHE_BACKEND][1],
+        "TIMEOUT": 300,
+        "KEY_PREFIX": "sarisari",
+        "OPTIONS": {"MAX_ENTRIES": 10000} if CACHE_BACKEND != "redis" else {},
+    }
+}
+
 # =========================
 # PASSWORD VALIDATION
 # =========================
@@ -123,11 +145,33 @@ ALLOWED_HOSTS = [
 # =========================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # TokenAuthentication with the token->user lookup cached (see core.authentication)
+        "core.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # Token buckets "<burst>/<period>" (see core.throttling), applied per view
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.environ.get("THROTTLE_AUTH_IP", "20/min"),
+        "auth_user": os.environ.get("THROTTLE_AUTH_USER", "10/min"),
+        "feedback_user": os.environ.get("THROTTLE_FEEDBACK_USER", "30/min"),
+        "feedback_ip": os.environ.get("THROTTLE_FEEDBACK_IP", "120/min"),
+    },
+    # Render puts one proxy in front of the app: the client IP is the last X-Forwarded-For hop
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "1")),
+}
+
+# Cache alias holding the throttle buckets (per process unless it's a shared backend)
+THROTTLE_CACHE = os.environ.get("THROTTLE_CACHE", "default")
+
+# Token cache: per-process LRU (TTL seconds bounds how long another worker may keep
+# a revoked token) plus an optional shared tier, SHARED_CACHE = an alias in CACHES
+TOKEN_AUTH_CACHE = {
+    "MAX_ENTRIES": int(os.environ.get("TOKEN_AUTH_CACHE_MAX_ENTRIES", "10000")),
+    "TTL": int(os.environ.get("TOKEN_AUTH_CACHE_TTL", "60")),
+    "SHARED_CACHE": os.environ.get("TOKEN_AUTH_SHARED_CACHE") or None,
+    "SHARED_TTL": int(os.environ.get("TOKEN_AUTH_SHARED_TTL", "300")),
 }
 
 # =========================
@@ -139,6 +183,128 @@ CORS_ALLOWED_ORIGINS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# =========================
+# FEEDBACK API
+# =========================
+# Native async login/register/feedback views (core.async_views); only turn this on
+# when serving main.asgi with uvicorn, see README "Async mode"
+ASYNC_API = os.environ.get("ASYNC_API", "False").lower() == "true"
+
+# Upper bound on items accepted by POST /api/feedback/bulk/ (keeps memory bounded)
+FEEDBACK_BULK_MAX_ITEMS = int(os.environ.get("FEEDBACK_BULK_MAX_ITEMS", "500"))
+
+# GET /api/feedback/ cursor pagination (?page_size= is capped at the maximum)
+FEEDBACK_PAGE_SIZE = int(os.environ.get("FEEDBACK_PAGE_SIZE", "20"))
+FEEDBACK_MAX_PAGE_SIZE = int(os.environ.get("FEEDBACK_MAX_PAGE_SIZE", "100"))
+
+# Cached GET /api/feedback/ pages (see core.feedback_cache); bounds staleness across
+# workers when CACHES is per process
+FEEDBACK_LIST_CACHE_TTL = int(os.environ.get("FEEDBACK_LIST_CACHE_TTL", "300"))
+
+# GET /api/feedback/events/ (Server-Sent Events, see core.events). BROKER "inprocess"
+# only reaches streams in the worker that ran the analysis; "postgres" uses
+# LISTEN/NOTIFY to reach every worker and run_sentiment_worker. Each open stream holds
+# a gunicorn thread (a whole process with GUNICORN_WORKER_CLASS=sync), so outside
+# async mode streams end before the 30s timeout and the browser reconnects with Last-Event-ID.
+FEEDBACK_EVENTS = {
+    "BROKER": os.environ.get("FEEDBACK_EVENTS_BROKER", "inprocess"),
+    "HEARTBEAT_SECONDS": int(os.environ.get("FEEDBACK_EVENTS_HEARTBEAT", "15")),
+    "MAX_STREAM_SECONDS": int(os.environ.get("FEEDBACK_EVENTS_MAX_STREAM", "300" if ASYNC_API else "25")),
+    "RETRY_MS": 3000,
+}
+
+# =========================
+# PRODUCT CATALOG
+# =========================
+# GET /api/products/ pages are cached per process for CACHE_TTL seconds (cleared
+# on save in the process that saved; other workers catch up on expiry) and may be
+# kept by browsers/CDNs for MAX_AGE seconds. Bodies under MIN_COMPRESS_BYTES go uncompressed.
+PRODUCT_CATALOG = {
+    "CACHE_TTL": int(os.environ.get("PRODUCT_CATALOG_CACHE_TTL", "300")),
+    "MAX_AGE": int(os.environ.get("PRODUCT_CATALOG_MAX_AGE", "60")),
+    "MIN_COMPRESS_BYTES": 512,
+}
+
+# =========================
+# SENTIMENT ANALYSIS
+# =========================
+SENTIMENT_CACHE = {
+    "MAX_ENTRIES": int(os.environ.get("SENTIMENT_CACHE_MAX_ENTRIES", "10000")),
+    "TTL": int(os.environ.get("SENTIMENT_CACHE_TTL", "86400")),
+    # Second tier in the database: survives restarts, shared by all workers
+    "PERSISTENT": os.environ.get("SENTIMENT_CACHE_PERSISTENT", "False").lower() == "true",
+    # Periodic purge on write: every PURGE_EVERY DB writes, the writer deletes rows older
+    # than TTL and rows of other analyzer versions (0 = never; call SentimentCache.purge())
+    "PURGE_EVERY": int(os.environ.get("SENTIMENT_CACHE_PURGE_EVERY", "1000")),
+}
+
+# How the rule workflow runs: "fast" (its four steps as plain calls on one mutable
+# state) or "langgraph" (the compiled StateGraph). Both give identical results.
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "fast")
+
+# Where analysis runs: "thread" (per-process pool below) or "database"
+# (durable SentimentJob rows processed by `manage.py run_sentiment_worker`)
+SENTIMENT_QUEUE_BACKEND = os.environ.get("SENTIMENT_QUEUE_BACKEND", "thread")
+
+SENTIMENT_JOBS = {
+    "MAX_ATTEMPTS": int(os.environ.get("SENTIMENT_JOB_MAX_ATTEMPTS", "5")),
+    "LEASE_SECONDS": int(os.environ.get("SENTIMENT_JOB_LEASE_SECONDS", "300")),
+    "BACKOFF_SECONDS": int(os.environ.get("SENTIMENT_JOB_BACKOFF_SECONDS", "10")),
+    "MAX_BACKOFF_SECONDS": int(os.environ.get("SENTIMENT_JOB_MAX_BACKOFF_SECONDS", "3600")),
+}
+
+# Per-process analysis pool: fixed threads, bounded queue
+SENTIMENT_WORKERS = {
+    "THREADS": int(os.environ.get("SENTIMENT_WORKER_THREADS", "2")),
+    "QUEUE_SIZE": int(os.environ.get("SENTIMENT_QUEUE_SIZE", "100")),
+    # What to do when the queue is full: "block", "pending" or "inline"
+    "FULL_POLICY": os.environ.get("SENTIMENT_QUEUE_FULL_POLICY", "pending"),
+    "BLOCK_TIMEOUT": float(os.environ.get("SENTIMENT_QUEUE_BLOCK_TIMEOUT", "5")),
+}
+
+# Tiered analysis: every row goes through the first tier; a row moves on to the
+# next tier (the LLM) only when its verdict is below the threshold or NEUTRAL
+SENTIMENT_TIERS = {
+    "TIERS": [t.strip() for t in os.environ.get("SENTIMENT_TIERS", "rules,llm").split(",") if t.strip()],
+    "CONFIDENCE_THRESHOLD": float(os.environ.get("SENTIMENT_CONFIDENCE_THRESHOLD", "0.7")),
+    "ESCALATE_NEUTRAL": os.environ.get("SENTIMENT_ESCALATE_NEUTRAL", "True").lower() == "true",
+    # Escalate at all (needs OPENROUTER_API_KEY); off = rules only
+    "USE_LLM": os.environ.get("SENTIMENT_USE_LLM", "False").lower() == "true",
+}
+
+# Shared OpenRouter client used by the LLM analysis path
+LLM_CLIENT = {
+    "BASE_URL": os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    "TIMEOUT": float(os.environ.get("LLM_TIMEOUT", "30")),
+    "CONNECT_TIMEOUT": float(os.environ.get("LLM_CONNECT_TIMEOUT", "5")),
+    # Keep-alive pool per process; CONCURRENCY caps requests in flight
+    "MAX_CONNECTIONS": int(os.environ.get("LLM_MAX_CONNECTIONS", "20")),
+    "MAX_KEEPALIVE": int(os.environ.get("LLM_MAX_KEEPALIVE", "10")),
+    "CONCURRENCY": int(os.environ.get("LLM_CONCURRENCY", "8")),
+    "MAX_RETRIES": int(os.environ.get("LLM_MAX_RETRIES", "1")),
+}
+
+# Bounds on LLM latency: each analysis gets DEADLINE_SECONDS before the rules
+# answer instead. HEDGE ("off", "request" or "fallback") fires a second request
+# or the rules after the recent HEDGE_PERCENTILE latency. The breaker skips the
+# LLM for BREAKER_COOLDOWN_SECONDS after BREAKER_FAILURES failures in a row.
+LLM_RESILIENCE = {
+    "DEADLINE_SECONDS": float(os.environ.get("LLM_DEADLINE_SECONDS", "8")),
+    "HEDGE": os.environ.get("LLM_HEDGE", "off"),
+    "HEDGE_PERCENTILE": float(os.environ.get("LLM_HEDGE_PERCENTILE", "95")),
+    "HEDGE_MIN_DELAY_MS": int(os.environ.get("LLM_HEDGE_MIN_DELAY_MS", "200")),
+    "BREAKER_FAILURES": int(os.environ.get("LLM_BREAKER_FAILURES", "5")),
+    "BREAKER_COOLDOWN_SECONDS": float(os.environ.get("LLM_BREAKER_COOLDOWN_SECONDS", "30")),
+}
+
+# Feedbacks sent per LLM prompt: a batch ships at MAX_ITEMS or MAX_WAIT_MS
+# after its first item, whichever comes first (MAX_ITEMS=1 disables batching)
+LLM_BATCH = {
+    "MAX_ITEMS": int(os.environ.get("LLM_BATCH_MAX_ITEMS", "10")),
+    "MAX_WAIT_MS": int(os.environ.get("LLM_BATCH_MAX_WAIT_MS", "50")),
+    "TOKENS_PER_ITEM": int(os.environ.get("LLM_BATCH_TOKENS_PER_ITEM", "80")),
+}
+
 # =========================
 # SUPERUSER CREATION (ADD ONLY THIS BLOCK)
 # =========================
@@ -280,205 +280,47 @@ function logout() {
 }
 
 /* =====================
-   PRODUCTS DATA WITH ANIMATED ICONS
+   PRODUCTS DATA (served by /api/products/, managed in Django admin)
 ===================== */
-const products = [
-    {
-        id: 1,
-        name: "Assorted Biscuits Pack",
-        category: "snacks",
-        price: "₱25",
-        description: "Mix of cream-filled, wafer, and cracker biscuits. Perfect for quick snacks between classes.",
-        icon: "fas fa-cookie-bite fa-bounce",
-        color: "#F59E0B",
-        tag: "Bestseller"
-    },
-    {
-        id: 2,
-        name: "Crispy Potato Chips",
-        category: "snacks",
-        price: "₱35",
-        description: "Crunchy potato chips in BBQ, Cheese, and Sour Cream flavors.",
-        icon: "fas fa-pizza-slice fa-shake",
-        color: "#DC2626",
-        tag: "Popular"
-    },
-    {
-        id: 3,
-        name: "Energy Drinks",
-        category: "drinks",
-        price: "₱50",
-        description: "Boost your energy for late-night studying. Red Bull, Monster, and local brands available.",
-        icon: "fas fa-battery-full fa-beat",
-        color: "#DC2626",
-        tag: "Energy Boost"
-    },
-    {
-        id: 4,
-        name: "Cold Refreshments",
-        category: "drinks",
-        price: "₱20-₱35",
-        description: "Soft drinks, juices, iced tea, and bottled water. Stay refreshed!",
-        icon: "fas fa-glass-whiskey fa-beat",
-        color: "#3B82F6",
-        tag: "Chilled"
-    },
-    {
-        id: 5,
-        name: "Premium Ballpens Set",
-        category: "stationery",
-        price: "₱25",
-        description: "Set of 3 smooth-writing ballpens in different colors for notes.",
-        icon: "fas fa-pen fa-fade",
-        color: "#10B981",
-        tag: "Study Essential"
-    },
-    {
-        id: 6,
-        name: "Pencils & Erasers",
-        category: "stationery",
-        price: "₱15",
-        description: "Wooden pencils with quality erasers. Essential for exams.",
-        icon: "fas fa-pencil-alt fa-beat-fade",
-        color: "#8B5CF6",
-        tag: "Must-have"
-    },
-    {
-        id: 7,
-        name: "Study Notebooks",
-        category: "stationery",
-        price: "₱40-₱60",
-        description: "Different sizes and types for all your academic needs.",
-        icon: "fas fa-book fa-flip",
-        color: "#EC4899",
-        tag: "Academic"
-    },
-    {
-        id: 8,
-        name: "Instant Noodles",
-        category: "meals",
-        price: "₱18",
-        description: "Quick and delicious meals for busy study sessions.",
-        icon: "fas fa-bowl-food fa-spin-pulse",
-        color: "#F97316",
-        tag: "Quick Meal"
-    },
-    {
-        id: 9,
-        name: "Bottled Water",
-        category: "drinks",
-        price: "₱15",
-        description: "Pure drinking water to keep you hydrated throughout the day.",
-        icon: "fas fa-bottle-water fa-beat",
-        color: "#06B6D4",
-        tag: "Hydration"
-    },
-    {
-        id: 10,
-        name: "Coffee & Hot Drinks",
-        category: "drinks",
-        price: "₱30-₱55",
-        description: "3-in-1 coffee sachets, hot chocolate, and instant cappuccino for those long study nights.",
-        icon: "fas fa-mug-saucer fa-bounce",
-        color: "#92400E",
-        tag: "Wake-Up Call"
-    },
-    {
-        id: 11,
-        name: "Highlighters Pack",
-        category: "stationery",
-        price: "₱30",
-        description: "Bright highlighters in different colors for effective studying.",
-        icon: "fas fa-highlighter fa-fade",
-        color: "#FBBF24",
-        tag: "Study Aid"
-    },
-    {
-        id: 12,
-        name: "Cup Noodles",
-        category: "meals",
-        price: "₱25",
-        description: "Ready-to-eat cup noodles, just add hot water!",
-        icon: "fas fa-mug-hot fa-beat-fade",
-        color: "#DC2626",
-        tag: "Instant"
-    },
-    {
-        id: 13,
-        name: "Sandwich & Burgers",
-        category: "meals",
-        price: "₱45-₱75",
-        description: "Freshly made sandwiches and burgers. Perfect lunch for busy students.",
-        icon: "fas fa-burger fa-shake",
-        color: "#F59E0B",
-        tag: "Fresh Meals"
-    },
-    {
-        id: 14,
-        name: "Hand Sanitizer & Wipes",
-        category: "hygiene",
-        price: "₱35-₱50",
-        description: "Keep your hands clean and germ-free. Alcohol-based sanitizers and antibacterial wipes.",
-        icon: "fas fa-pump-soap fa-beat",
-        color: "#10B981",
-        tag: "Stay Safe"
-    },
-    {
-        id: 15,
-        name: "Tissue Packs",
-        category: "hygiene",
-        price: "₱15",
-        description: "Pocket tissue packs and facial tissues. Essential for everyday use.",
-        icon: "fas fa-box-tissue fa-fade",
-        color: "#8B5CF6",
-        tag: "Daily Essential"
-    },
-    {
-        id: 16,
-        name: "Phone Charger Cables",
-        category: "accessories",
-        price: "₱80-₱150",
-        description: "USB-C, Lightning, and Micro-USB charging cables. Keep your devices powered up!",
-        icon: "fas fa-charging-station fa-beat-fade",
-        color: "#3B82F6",
-        tag: "Tech Essential"
-    },
-    {
-        id: 17,
-        name: "Earphones & Headphones",
-        category: "accessories",
-        price: "₱150-₱350",
-        description: "Quality earphones and headphones for music and online classes.",
-        icon: "fas fa-headphones fa-spin",
-        color: "#EC4899",
-        tag: "Audio Gear"
-    },
-    {
-        id: 18,
-        name: "Power Bank",
-        category: "accessories",
-        price: "₱400-₱800",
-        description: "Portable power banks 10,000mAh - 20,000mAh. Never run out of battery!",
-        icon: "fas fa-battery-three-quarters fa-bounce",
-        color: "#10B981",
-        tag: "Power Up"
-    }
-];
+// One request per category; revisiting a category reuses the response
+const productCache = new Map();
+let activeProductFilter = 'all';
+
+async function fetchProducts(category = 'all') {
+    if (productCache.has(category)) return productCache.get(category);
+    
+    const result = await safeFetch(`${API}/products/?category=${encodeURIComponent(category)}`);
+    if (!result.success) return null;
+    
+    productCache.set(category, result.data.products);
+    return result.data.products;
+}
 
 /* =====================
    LOAD PRODUCTS WITH ANIMATIONS
 ===================== */
-function loadProducts(filter = 'all') {
+async function loadProducts(filter = 'all') {
     const productsGrid = document.getElementById('products-grid');
     if (!productsGrid) return;
     
-    let filteredProducts = products;
-    if (filter !== 'all') {
-        filteredProducts = products.filter(p => p.category === filter);
-    }
+    activeProductFilter = filter;
+    const filteredProducts = await fetchProducts(filter);
+    // Another category was picked while this one was loading
+    if (filter !== activeProductFilter) return;
     
     productsGrid.innerHTML = '';
     
+    if (filteredProducts === null) {
+        productsGrid.innerHTML = `
+            <div class="no-products">
+                <i class="fas fa-exclamation-triangle"></i>
+                <h3>Could not load products</h3>
+                <p>Please refresh the page to try again</p>
+            </div>
+        `;
+        return;
+    }
+    
     if (filteredProducts.length === 0) {
         productsGrid.innerHTML = `
             <div class="no-products">
@@ -617,7 +459,7 @@ async function submitFeedback() {
 /* =====================
    LOAD FEEDBACKS WITH ANIMATIONS
 ===================== */
-async function loadFeedbacks() {
+async function loadFeedbacks(cursor = null) {
     const token = getToken();
     const feedbacksContainer = document.getElementById("feedback-list");
     
@@ -635,9 +477,11 @@ async function loadFeedbacks() {
     }
 
     try {
-        console.log(`📥 Loading feedbacks from: ${API}/feedback/`);
+        // The API returns one newest-first page at a time; "Load more" follows next_cursor
+        const url = cursor ? `${API}/feedback/?cursor=${encodeURIComponent(cursor)}` : `${API}/feedback/`;
+        console.log(`📥 Loading feedbacks from: ${url}`);
         
-        const result = await safeFetch(`${API}/feedback/`, {
+        const result = await safeFetch(url, {
             headers: { "Authorization": `Token ${token}` }
         });
 
@@ -645,10 +489,18 @@ async function loadFeedbacks() {
             throw new Error(result.error);
         }
 
-        const data = result.data;
-        feedbacksContainer.innerHTML = '';
+        const page = result.data;
+        const data = page.results;
+        if (!cursor) {
+            feedbacksContainer.innerHTML = '';
+        }
 
-        if (data.length === 0) {
+        const oldLoadMore = document.getElementById('feedback-load-more');
+        if (oldLoadMore) {
+            oldLoadMore.remove();
+        }
+
+        if (data.length === 0 && !cursor) {
             feedbacksContainer.innerHTML = `
                 <div class="no-feedback">
                     <i class="fas fa-comment-slash"></i>
@@ -664,9 +516,6 @@ async function loadFeedbacks() {
             return;
         }
 
-        // Sort by date (newest first)
-        data.sort((a, b) => new Date(b.created_at || b.date) - new Date(a.created_at || a.date));
-
         data.forEach((feedback, index) => {
             const feedbackDiv = document.createElement('div');
             feedbackDiv.className = 'feedback-item';
@@ -717,10 +566,19 @@ async function loadFeedbacks() {
             feedbacksContainer.appendChild(feedbackDiv);
         });
         
+        if (page.next_cursor) {
+            const loadMore = document.createElement('button');
+            loadMore.id = 'feedback-load-more';
+            loadMore.className = 'btn btn-secondary btn-block';
+            loadMore.innerHTML = '<i class="fas fa-chevron-down"></i> Load more';
+            loadMore.onclick = () => loadFeedbacks(page.next_cursor);
+            feedbacksContainer.appendChild(loadMore);
+        }
+        
         // Update feedback count with animation
         const feedbackCount = document.getElementById('feedback-count');
         if (feedbackCount) {
-            animateCounter(feedbackCount, data.length);
+            animateCounter(feedbackCount, feedbacksContainer.querySelectorAll('.feedback-item').length);
         }
 
     } catch (error) {